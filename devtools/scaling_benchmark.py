@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+"""
+Scaling benchmark of the surface commands across data sizes and worker counts.
+
+Each command runs on a synthetic model in a fresh process, one run per data
+size and number of workers, and records its throughput, speed-up over one
+worker, parallel efficiency and peak resident memory. Outputs are hashed to
+check that they do not depend on the number of workers.
+
+The table is written as CSV with a text report comparing the runs; with
+--check, the script exits with an error if a parallel run is less efficient
+than --min-efficiency or not deterministic.
+
+Usage: at the root of the project, in the environment of the package:
+> python devtools/scaling_benchmark.py --sizes 10000 100000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib.util import find_spec
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import BlockModel, Points, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.batch_smoothing import smooth_group
+from surface_apps.commands.distance import surface_distance
+from surface_apps.commands.drape import drape_objects
+from surface_apps.commands.faulted_horizon import faulted_horizon
+from surface_apps.commands.iso_surfaces import realization_surfaces
+from surface_apps.parallel import runtime_summary
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def grid_mesh(n_vertices: int, extent: float = 1000.0) -> tuple[np.ndarray, np.ndarray]:
+    """Undulating triangulated grid of about n vertices."""
+    n_side = max(int(np.sqrt(n_vertices)), 2)
+    axis = np.linspace(0.0, extent, n_side)
+    x_loc, y_loc = np.meshgrid(axis, axis)
+    z_loc = 20.0 * np.sin(x_loc / 97.0) * np.cos(y_loc / 131.0)
+    vertices = np.c_[x_loc.ravel(), y_loc.ravel(), z_loc.ravel()]
+    corner = (np.arange(n_side - 1)[:, None] * n_side + np.arange(n_side - 1)).ravel()
+    cells = np.r_[
+        np.c_[corner, corner + 1, corner + n_side + 1],
+        np.c_[corner, corner + n_side + 1, corner + n_side],
+    ]
+
+    return vertices, cells
+
+
+def _digest(arrays: Sequence[np.ndarray]) -> str:
+    """Hash of the exact bytes of output arrays."""
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class Case:
+    """
+    Synthetic benchmark of a command.
+
+    :param build: Create the inputs of a run of the given size in a
+        workspace.
+    :param run: Run the command on the inputs with a number of workers,
+        returning the arrays of its outputs.
+    :param parallel: Whether the command uses worker processes.
+    """
+
+    build: Callable[[Workspace, int], Any]
+    run: Callable[[Any, int], list[np.ndarray]]
+    parallel: bool = True
+
+
+def _build_smoothing(workspace: Workspace, size: int) -> ContainerGroup:
+    group = ContainerGroup.create(workspace, name="Surfaces")
+    for index in range(8):
+        vertices, cells = grid_mesh(size // 8)
+        vertices += np.random.default_rng(index).normal(0.0, 1.0, vertices.shape)
+        Surface.create(workspace, vertices=vertices, cells=cells, parent=group)
+
+    return group
+
+
+def _run_smoothing(group: ContainerGroup, workers: int) -> list[np.ndarray]:
+    return [copy.vertices for copy in smooth_group(group, workers=workers)]
+
+
+def _build_faulted_horizon(
+    workspace: Workspace, size: int
+) -> tuple[Points, list[Surface]]:
+    locations = np.random.default_rng(0).uniform(0.0, 1000.0, (size, 2))
+    block = np.floor(locations[:, 0] / 200.0)
+    points = Points.create(
+        workspace, vertices=np.c_[locations, 0.02 * locations[:, 0] - 15.0 * block]
+    )
+    faults = []
+    for position in (200.0, 400.0, 600.0, 800.0):
+        vertices, cells = grid_mesh(100, extent=1.0)
+        vertices = np.c_[
+            np.full(vertices.shape[0], position),
+            vertices[:, 0] * 1200.0 - 100.0,
+            vertices[:, 1] * 400.0 - 200.0,
+        ]
+        faults.append(Surface.create(workspace, vertices=vertices, cells=cells))
+
+    return points, faults
+
+
+def _run_faulted_horizon(
+    inputs: tuple[Points, list[Surface]], workers: int
+) -> list[np.ndarray]:
+    surface = faulted_horizon(*inputs, workers=workers)
+    return [surface.vertices, surface.cells]
+
+
+def _build_iso_surfaces(workspace: Workspace, size: int) -> BlockModel:
+    n_side = max(int(round((size / 8) ** (1 / 3))), 4)
+    delimiters = np.linspace(-10.0, 10.0, n_side + 1)
+    block_model = BlockModel.create(
+        workspace,
+        origin=[0.0, 0.0, 0.0],
+        u_cell_delimiters=delimiters,
+        v_cell_delimiters=delimiters,
+        z_cell_delimiters=delimiters - 10.0,
+    )
+    radius = np.linalg.norm(block_model.centroids, axis=1)
+    block_model.add_data(
+        {
+            f"realization_{index}": {
+                "values": 3.0 + 0.5 * index - radius,
+                "association": "CELL",
+            }
+            for index in range(8)
+        }
+    )
+
+    return block_model
+
+
+def _run_iso_surfaces(block_model: BlockModel, workers: int) -> list[np.ndarray]:
+    data = [
+        child for child in block_model.children if child.name.startswith("realization")
+    ]
+    surfaces = realization_surfaces(block_model, data, 0.0, workers=workers)
+
+    return [
+        array for surface in surfaces for array in (surface.vertices, surface.cells)
+    ]
+
+
+def _build_points_on_surface(workspace: Workspace, size: int) -> tuple[Points, Surface]:
+    vertices, cells = grid_mesh(max(size // 10, 100))
+    surface = Surface.create(workspace, vertices=vertices, cells=cells)
+    locations = np.random.default_rng(0).uniform(0.0, 1000.0, (size, 3))
+    points = Points.create(workspace, vertices=locations * [1.0, 1.0, 0.1])
+
+    return points, surface
+
+
+def _build_points_off_surface(
+    workspace: Workspace, size: int
+) -> tuple[Points, Surface]:
+    vertices, cells = grid_mesh(max(size // 10, 100))
+    surface = Surface.create(workspace, vertices=vertices, cells=cells)
+    locations = np.random.default_rng(0).uniform(0.0, 1000.0, (size, 3))
+    points = Points.create(
+        workspace, vertices=locations * [1.0, 1.0, 2.0] - [0, 0, 1000]
+    )
+
+    return points, surface
+
+
+def _run_distance(inputs: tuple[Points, Surface], workers: int) -> list[np.ndarray]:
+    del workers
+    return [datum.values for datum in surface_distance(*inputs, flag=False)]
+
+
+def _run_drape(inputs: tuple[Points, Surface], workers: int) -> list[np.ndarray]:
+    del workers
+    points, surface = inputs
+    return [copy.vertices for copy in drape_objects([points], surface)]
+
+
+CASES = {
+    "batch_smoothing": Case(_build_smoothing, _run_smoothing),
+    "faulted_horizon": Case(_build_faulted_horizon, _run_faulted_horizon),
+    "iso_surfaces": Case(_build_iso_surfaces, _run_iso_surfaces),
+    "distance": Case(_build_points_on_surface, _run_distance, parallel=False),
+    "distance_off_surface": Case(
+        _build_points_off_surface, _run_distance, parallel=False
+    ),
+    "drape": Case(_build_points_on_surface, _run_drape, parallel=False),
+}
+
+
+def _peak_rss() -> tuple[float, float]:
+    """Peak resident memory of this process and of its children, in MiB."""
+    if find_spec("resource") is not None:
+        import resource  # pylint: disable=import-outside-toplevel
+
+        # Kilobytes on Linux, bytes on macOS
+        unit = 1.0 if sys.platform == "darwin" else 1024.0
+        return tuple(  # type: ignore
+            resource.getrusage(who).ru_maxrss * unit / 1024**2
+            for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+        )
+
+    if find_spec("psutil") is not None:
+        import psutil  # pylint: disable=import-outside-toplevel
+
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / 1024**2, np.nan
+
+    return np.nan, np.nan
+
+
+def _run_case(name: str, size: int, workers: int, folder: str) -> dict[str, Any]:
+    """Build and run a case, in a fresh process to measure its peak memory."""
+    case = CASES[name]
+    path = Path(folder) / f"{name}_{size}_{workers}.geoh5"
+    with Workspace.create(path) as workspace:
+        inputs = case.build(workspace, size)
+        start = time.perf_counter()
+        outputs = case.run(inputs, workers)
+        seconds = time.perf_counter() - start
+
+    path.unlink()
+    rss, workers_rss = _peak_rss()
+
+    return {
+        "seconds": seconds,
+        "digest": _digest(outputs),
+        "peak_rss_mb": rss,
+        "workers_peak_rss_mb": workers_rss,
+    }
+
+
+def scaling_table(
+    names: Sequence[str], sizes: Sequence[int], workers: Sequence[int]
+) -> pd.DataFrame:
+    """
+    Run every command on every data size with every number of workers.
+
+    Commands without worker processes run once per size.
+
+    :param names: Names of the benchmarked commands, keys of CASES.
+    :param sizes: Number of items of the synthetic models, e.g. vertices.
+    :param workers: Numbers of worker processes.
+
+    :return: One row per run, with its time, throughput in items per
+        second, speed-up and efficiency relative to the run with the
+        fewest workers, peak memory and whether its outputs match.
+    """
+    rows = []
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as folder:
+        for name in names:
+            counts = sorted(set(workers)) if CASES[name].parallel else [1]
+            for size in sizes:
+                for count in counts:
+                    with ProcessPoolExecutor(1, mp_context=context) as executor:
+                        result = executor.submit(
+                            _run_case, name, size, count, folder
+                        ).result()
+                    summary = runtime_summary(count)
+                    rows.append(
+                        {
+                            "command": name,
+                            "size": size,
+                            "workers": count,
+                            "threads": summary["threads"],
+                            **result,
+                        }
+                    )
+                    print(
+                        f"{name:>16} size {size:>9} workers {count:>3}: "
+                        f"{result['seconds']:8.3f} s"
+                    )
+
+    table = pd.DataFrame(rows)
+    table["throughput"] = table["size"] / table["seconds"]
+    groups = table.groupby(["command", "size"])
+    baseline = groups["seconds"].transform("first")
+    base_workers = groups["workers"].transform("first")
+    table["speedup"] = baseline / table["seconds"]
+    table["efficiency"] = table["speedup"] * base_workers / table["workers"]
+    table["deterministic"] = table["digest"] == groups["digest"].transform("first")
+
+    return table
+
+
+def flagged_runs(
+    table: pd.DataFrame, min_efficiency: float = 0.7
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Runs of a scaling table failing the scaling checks.
+
+    :param table: Table of :func:`scaling_table`.
+    :param min_efficiency: Parallel efficiency below which runs are flagged.
+
+    :return: Runs with more workers than the baseline of their command and
+        size, the run with the fewest workers, and an efficiency below the
+        minimum; and runs whose outputs differ from the baseline.
+    """
+    parallel = table["workers"] > table.groupby(["command", "size"])[
+        "workers"
+    ].transform("first")
+    slow = table[parallel & (table["efficiency"] < min_efficiency)]
+    changed = table[~table["deterministic"]]
+
+    return slow, changed
+
+
+def render_report(table: pd.DataFrame, min_efficiency: float = 0.7) -> str:
+    """
+    Text report of a scaling table.
+
+    :param table: Table of :func:`scaling_table`.
+    :param min_efficiency: Parallel efficiency below which runs are flagged.
+
+    :return: Throughput, efficiency and memory pivots by command, size and
+        workers, followed by the flagged runs.
+    """
+    lines = ["Scaling benchmark", "=================", ""]
+    summary = runtime_summary()
+    lines.append(
+        f"{summary['cpu_count']} cores, thread pools: {summary['thread_pools']}"
+    )
+    for column, title in (
+        ("throughput", "Throughput (items/s)"),
+        ("efficiency", "Parallel efficiency"),
+        ("peak_rss_mb", "Peak RSS of the main process (MiB)"),
+        ("workers_peak_rss_mb", "Peak RSS of the child processes (MiB)"),
+    ):
+        pivot = table.pivot_table(
+            index=["command", "size"], columns="workers", values=column
+        )
+        lines += ["", title, "-" * len(title), pivot.to_string(float_format="%.3g")]
+
+    slow, changed = flagged_runs(table, min_efficiency)
+    lines += ["", f"Runs below {min_efficiency:.0%} efficiency: {len(slow)}"]
+    if len(slow):
+        lines.append(slow[["command", "size", "workers", "efficiency"]].to_string())
+    lines += [f"Runs with outputs depending on the workers: {len(changed)}"]
+    if len(changed):
+        lines.append(changed[["command", "size", "workers", "digest"]].to_string())
+
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--commands", nargs="+", choices=list(CASES), default=list(CASES)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--output", type=Path, default=_PROJECT_ROOT / "benchmarks")
+    parser.add_argument("--min-efficiency", type=float, default=0.7)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error on inefficient or non-deterministic runs",
+    )
+    args = parser.parse_args(argv)
+
+    table = scaling_table(args.commands, args.sizes, args.workers)
+    report = render_report(table, args.min_efficiency)
+    args.output.mkdir(parents=True, exist_ok=True)
+    table.to_csv(args.output / "scaling.csv", index=False)
+    (args.output / "scaling_report.txt").write_text(report, encoding="utf-8")
+    print(report)
+
+    slow, changed = flagged_runs(table, args.min_efficiency)
+
+    return int(args.check and bool(len(slow) or len(changed)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
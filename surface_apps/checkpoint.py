@@ -0,0 +1,154 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from geoh5py.shared import Entity
+from geoh5py.ui_json import InputFile
+from geoh5py.workspace import Workspace
+
+# ui.json members that do not change the result of a job
+IGNORED_KEYS = ("monitoring_directory", "workspace_geoh5", "conda_environment")
+
+
+def _serializable(value: Any) -> Any:
+    """Convert promoted ui.json values to a stable JSON representation."""
+    if isinstance(value, Entity):
+        return str(value.uid)
+    if isinstance(value, Workspace):
+        return str(Path(value.h5file).resolve())
+    if isinstance(value, (UUID, Path)):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    # A repr may hold memory addresses, which would change the key of a job
+    raise TypeError(f"Cannot identify a job by a value of type {type(value)}.")
+
+
+def job_key(ui_json: dict[str, Any]) -> str:
+    """
+    Hash of the ui.json parameters identifying a job.
+
+    :param ui_json: Dictionary of ui.json parameters.
+
+    :return: Short hexadecimal digest.
+    """
+    content = {key: value for key, value in ui_json.items() if key not in IGNORED_KEYS}
+    text = json.dumps(content, sort_keys=True, default=_serializable)
+
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class Checkpoint:
+    """
+    Sidecar store of completed work units (tiles, levels, realizations) of a
+    long-running job.
+
+    Each unit is saved as its own ``.npz`` file in a folder next to the geoh5,
+    written to a temporary file first and then renamed, so that an
+    interrupted write never leaves a corrupted unit behind.
+
+    :param path: Folder holding the checkpoint files.
+    """
+
+    suffix = ".checkpoint"
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+
+    @classmethod
+    def from_input_file(cls, ifile: InputFile) -> Checkpoint:
+        """
+        Checkpoint of the job described by an input file, stored next to
+        its geoh5.
+
+        :param ifile: Input file of the job.
+        """
+        if ifile.geoh5 is None or ifile.ui_json is None:
+            raise ValueError("Input file must have a 'geoh5' and a 'ui_json'.")
+
+        h5file = Path(ifile.geoh5.h5file)
+        key = job_key(ifile.ui_json)
+
+        return cls(h5file.parent / f"{h5file.stem}.{key}{cls.suffix}")
+
+    @property
+    def path(self) -> Path:
+        """Folder holding the checkpoint files."""
+        return self._path
+
+    @property
+    def completed(self) -> set[str]:
+        """Names of the units already saved."""
+        if not self.path.is_dir():
+            return set()
+
+        return {file.stem for file in self.path.glob("*.npz")}
+
+    def __contains__(self, unit: object) -> bool:
+        return self._unit_file(str(unit)).is_file()
+
+    def pending(self, units: Iterable[Any]) -> list[Any]:
+        """
+        Units left to process, in their original order.
+
+        :param units: All units of the job.
+        """
+        done = self.completed
+        return [unit for unit in units if str(unit) not in done]
+
+    def save(self, unit: Any, **arrays: np.ndarray):
+        """
+        Store the results of a completed unit.
+
+        :param unit: Unit identifier, converted to str.
+        :param arrays: Named result arrays.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        target = self._unit_file(str(unit))
+        temp = target.with_name(target.name + ".tmp")
+
+        with open(temp, "wb") as file:
+            np.savez(file, **arrays)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp, target)
+
+    def load(self, unit: Any) -> dict[str, np.ndarray]:
+        """
+        Results of a completed unit.
+
+        :param unit: Unit identifier, converted to str.
+        """
+        with np.load(self._unit_file(str(unit))) as content:
+            return {name: content[name] for name in content.files}
+
+    def clear(self):
+        """Delete the checkpoint once the job is written to the geoh5."""
+        if self.path.is_dir():
+            shutil.rmtree(self.path)
+
+    def _unit_file(self, unit: str) -> Path:
+        if not unit or any(char in unit for char in '/\\:*?"<>|'):
+            raise ValueError(f"Invalid checkpoint unit name '{unit}'.")
+
+        return self.path / f"{unit}.npz"
@@ -0,0 +1,130 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.data import Data
+from geoh5py.objects import Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.attributes import (
+    curvatures,
+    dip_and_direction,
+    face_normals,
+    vertex_normals,
+)
+from surface_apps.output import load_surface
+
+
+def _orientation(normals: np.ndarray, prefix: str) -> dict[str, np.ndarray]:
+    dip, direction = dip_and_direction(normals)
+    return {
+        f"{prefix}normal_x": normals[:, 0],
+        f"{prefix}normal_y": normals[:, 1],
+        f"{prefix}normal_z": normals[:, 2],
+        f"{prefix}dip": dip,
+        f"{prefix}dip_direction": direction,
+    }
+
+
+def surface_attributes(  # pylint: disable=too-many-arguments
+    surface: Surface,
+    cell_orientation: bool = True,
+    vertex_orientation: bool = True,
+    curvature: bool = True,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> list[Data]:
+    """
+    Compute geometric attributes of a surface and add them to it.
+
+    Triangle attributes are named 'normal_x', 'normal_y', 'normal_z', 'dip'
+    and 'dip_direction', vertex attributes get the 'vertex_' prefix and
+    curvatures are named 'mean_curvature' and 'gaussian_curvature'. All
+    attributes are written at once.
+
+    :param surface: Surface to attribute.
+    :param cell_orientation: Add the normals, dip and dip direction of the
+        triangles.
+    :param vertex_orientation: Add the area-weighted normals, dip and dip
+        direction at the vertices.
+    :param curvature: Add the mean and Gaussian curvatures at the vertices.
+    :param compact: Compute on float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: The new data.
+    """
+    _, vertices, cells = load_surface(surface, compact, tolerance)
+    normals, areas = face_normals(vertices, cells)
+
+    cell_values = _orientation(normals, "") if cell_orientation else {}
+    vertex_values = {}
+    if vertex_orientation or curvature:
+        vertex_normal = vertex_normals(vertices, cells, normals, areas)
+        if vertex_orientation:
+            vertex_values.update(_orientation(vertex_normal, "vertex_"))
+        if curvature:
+            mean, gaussian = curvatures(vertices, cells, vertex_normal, areas)
+            vertex_values.update(mean_curvature=mean, gaussian_curvature=gaussian)
+
+    if not cell_values and not vertex_values:
+        raise ValueError("At least one attribute must be selected.")
+
+    data = surface.add_data(
+        {
+            **{
+                name: {"values": values.astype(np.float64), "association": "CELL"}
+                for name, values in cell_values.items()
+            },
+            **{
+                name: {"values": values.astype(np.float64), "association": "VERTEX"}
+                for name, values in vertex_values.items()
+            },
+        }
+    )
+
+    return data if isinstance(data, list) else [data]
+
+
+@dataclass(slots=True, kw_only=True)
+class AttributesParams(BaseParams):
+    """Parameters of the surface attributes command."""
+
+    surface: Surface
+    cell_orientation: bool = True
+    vertex_orientation: bool = True
+    curvature: bool = True
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class AttributesDriver(BaseDriver):
+    """Attribute a surface from ui.json parameters."""
+
+    ui_json = "attributes"
+    params_class = AttributesParams
+    params: AttributesParams
+
+    def run(self) -> list[Data]:
+        return surface_attributes(
+            self.params.surface,
+            cell_orientation=self.params.cell_orientation,
+            vertex_orientation=self.params.vertex_orientation,
+            curvature=self.params.curvature,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    AttributesDriver.start(sys.argv[1])
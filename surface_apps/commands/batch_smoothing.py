@@ -0,0 +1,156 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import logging
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.smoothing import laplacian_smoothing, taubin_smoothing
+from surface_apps.output import load_surface
+from surface_apps.parallel import Prefetcher, ordered_map, runtime_summary
+
+logger = logging.getLogger(__name__)
+
+METHODS = {"Laplacian": laplacian_smoothing, "Taubin": taubin_smoothing}
+
+
+def _smooth_task(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    method: str,
+    iterations: int,
+    factor: float,
+    fix_boundary: bool,
+) -> np.ndarray:
+    """Smoothed vertices of one surface."""
+    return METHODS[method](
+        vertices,
+        cells,
+        iterations=iterations,
+        factor=factor,
+        fix_boundary=fix_boundary,
+    )
+
+
+def smooth_group(  # pylint: disable=too-many-arguments, too-many-locals
+    group: ContainerGroup,
+    method: str = "Taubin",
+    iterations: int = 10,
+    factor: float = 0.5,
+    fix_boundary: bool = True,
+    suffix: str = "_smoothed",
+    workers: int = 0,
+    threads: int = 0,
+    prefetch: int = 2,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> list[Surface]:
+    """
+    Create smoothed copies of every surface of a group.
+
+    The arrays of the next surfaces are read on a background thread while
+    the previous ones are smoothed by a pool of processes; copies are
+    written in the order of the surfaces, as they complete.
+
+    :param group: Group of the surfaces to smooth.
+    :param method: Smoothing method, 'Laplacian' or 'Taubin'.
+    :param iterations: Number of iterations.
+    :param factor: Step factor between 0 and 1.
+    :param fix_boundary: Keep vertices on open boundaries in place.
+    :param suffix: Suffix appended to the names of the copies.
+    :param workers: Number of processes, 0 for one per core.
+    :param threads: BLAS and OpenMP threads per process, 0 to share the cores.
+    :param prefetch: Number of surfaces read ahead.
+    :param compact: Smooth float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Smoothed copies, in the group, with the data of the surfaces.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Smoothing method must be one of {list(METHODS)}.")
+
+    surfaces = [child for child in group.children if isinstance(child, Surface)]
+    prefetcher = Prefetcher(
+        lambda surface: load_surface(surface, compact, tolerance), depth=prefetch
+    )
+    origins = []
+
+    def tasks():
+        for _, (origin, vertices, cells) in prefetcher(surfaces):
+            origins.append(origin)
+            yield vertices, cells, method, iterations, factor, fix_boundary
+
+    copies = []
+    for surface, vertices in zip(
+        surfaces, ordered_map(_smooth_task, tasks(), workers, threads=threads)
+    ):
+        with prefetcher.lock:
+            copies.append(
+                surface.copy(
+                    parent=group,
+                    vertices=origins.pop(0) + vertices.astype(np.float64),
+                    name=f"{surface.name}{suffix}",
+                )
+            )
+
+    return copies
+
+
+@dataclass(slots=True, kw_only=True)
+class BatchSmoothingParams(BaseParams):
+    """Parameters of the batch smoothing command."""
+
+    group: ContainerGroup
+    method: str = "Taubin"
+    iterations: int = 10
+    factor: float = 0.5
+    fix_boundary: bool = True
+    suffix: str = "_smoothed"
+    workers: int = 0
+    threads: int = 0
+    prefetch: int = 2
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class BatchSmoothingDriver(BaseDriver):
+    """Smooth every surface of a group from ui.json parameters."""
+
+    ui_json = "batch_smoothing"
+    params_class = BatchSmoothingParams
+    params: BatchSmoothingParams
+
+    def run(self) -> list[Surface]:
+        logger.info(
+            "Runtime: %s", runtime_summary(self.params.workers, self.params.threads)
+        )
+        return smooth_group(
+            self.params.group,
+            method=self.params.method,
+            iterations=self.params.iterations,
+            factor=self.params.factor,
+            fix_boundary=self.params.fix_boundary,
+            suffix=self.params.suffix,
+            workers=self.params.workers,
+            threads=self.params.threads,
+            prefetch=self.params.prefetch,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    BatchSmoothingDriver.start(sys.argv[1])
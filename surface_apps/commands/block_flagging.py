@@ -0,0 +1,170 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.data import ReferencedData
+from geoh5py.objects import BlockModel, Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.inside import inside_grid
+
+
+def local_centers(block_model: BlockModel) -> list[np.ndarray]:
+    """
+    Cell centers of a block model along its u, v and z axes, relative to
+    its origin, computed as for :attr:`BlockModel.centroids`.
+
+    :param block_model: Block model.
+    """
+    return [
+        np.cumsum(widths) - widths / 2.0
+        for widths in (block_model.u_cells, block_model.v_cells, block_model.z_cells)
+    ]
+
+
+def _frame(block_model: BlockModel) -> tuple[np.ndarray, np.ndarray]:
+    """Origin and rotation matrix of a block model."""
+    origin = np.r_[[block_model.origin[axis] for axis in "xyz"]]
+    angle = np.deg2rad(block_model.rotation)
+    rotation = np.array(
+        [
+            [np.cos(angle), -np.sin(angle), 0.0],
+            [np.sin(angle), np.cos(angle), 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+    return origin, rotation
+
+
+def to_local(block_model: BlockModel, locations: np.ndarray) -> np.ndarray:
+    """
+    Convert world coordinates to the rotated frame of a block model.
+
+    :param block_model: Block model.
+    :param locations: Array of coordinates, shape (n, 3).
+    """
+    origin, rotation = _frame(block_model)
+
+    return (locations - origin) @ rotation
+
+
+def to_world(block_model: BlockModel, locations: np.ndarray) -> np.ndarray:
+    """
+    Convert coordinates in the rotated frame of a block model to world
+    coordinates.
+
+    :param block_model: Block model.
+    :param locations: Array of local coordinates, shape (n, 3).
+    """
+    origin, rotation = _frame(block_model)
+
+    return locations @ rotation.T + origin
+
+
+def inside_block_model(block_model: BlockModel, surface: Surface) -> np.ndarray:
+    """
+    Flag the cells of a block model whose center lies inside a closed surface.
+
+    :param block_model: Block model to flag.
+    :param surface: Closed surface.
+
+    :return: Boolean array of shape (n_cells,), in the order of the
+        block model centroids.
+    """
+    if surface.vertices is None or surface.cells is None:
+        raise ValueError(f"Surface '{surface.name}' has no vertices or cells.")
+
+    u_centers, v_centers, z_centers = local_centers(block_model)
+    u_order, v_order = np.argsort(u_centers), np.argsort(v_centers)
+    inside = inside_grid(
+        to_local(block_model, surface.vertices),
+        surface.cells,
+        u_centers[u_order],
+        v_centers[v_order],
+        z_centers,
+    ).reshape((v_centers.shape[0], u_centers.shape[0], -1))
+
+    result = np.empty_like(inside)
+    result[np.ix_(v_order, u_order)] = inside
+
+    return result.ravel()
+
+
+def flag_block_model(
+    block_model: BlockModel, surfaces: list[Surface], name: str = "domain"
+) -> ReferencedData:
+    """
+    Code the cells of a block model by the closed surface containing them.
+
+    Surfaces are listed by priority: where they overlap, a cell gets the
+    code of the first surface containing it.
+
+    :param block_model: Block model to flag.
+    :param surfaces: Closed surfaces, e.g. geology wireframes.
+    :param name: Name of the output data.
+
+    :return: Referenced data, 0 ('Unknown') outside all surfaces and the
+        surface rank (starting at 1) otherwise.
+    """
+    if not surfaces:
+        raise ValueError("At least one surface must be provided.")
+
+    domain = np.zeros(block_model.n_cells, dtype=np.int32)
+    for code, surface in reversed(list(enumerate(surfaces, start=1))):
+        domain[inside_block_model(block_model, surface)] = code
+
+    value_map = {0: "Unknown"}
+    value_map.update(
+        {code: surface.name for code, surface in enumerate(surfaces, start=1)}
+    )
+
+    return block_model.add_data(
+        {
+            name: {
+                "values": domain,
+                "association": "CELL",
+                "type": "referenced",
+                "value_map": value_map,
+            }
+        }
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class BlockFlaggingParams(BaseParams):
+    """Parameters of the block model domains command."""
+
+    block_model: BlockModel
+    surfaces: list[Surface]
+    export_as: str = "domain"
+
+
+class BlockFlaggingDriver(BaseDriver):
+    """Code block model domains from ui.json parameters."""
+
+    ui_json = "block_flagging"
+    params_class = BlockFlaggingParams
+    params: BlockFlaggingParams
+
+    def run(self) -> ReferencedData:
+        return flag_block_model(
+            self.params.block_model,
+            self.params.surfaces,
+            name=self.params.export_as,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    BlockFlaggingDriver.start(sys.argv[1])
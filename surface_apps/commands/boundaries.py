@@ -0,0 +1,188 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import Curve, Surface
+from geoh5py.shared import Entity
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.mesh.holes import fill_holes
+from surface_apps.output import create_surface, load_surface
+
+
+def boundary_curve(
+    surfaces: Sequence[Surface],
+    vertices: Sequence[np.ndarray],
+    loops: Sequence[list[np.ndarray]],
+    name: str = "Boundaries",
+    parent: Entity | None = None,
+) -> Curve | None:
+    """
+    Write the boundary loops of surfaces as a single curve.
+
+    :param surfaces: Surfaces the loops belong to.
+    :param vertices: Vertices of each surface.
+    :param loops: Vertex indices of the loops of each surface.
+    :param name: Name of the curve.
+    :param parent: Parent group of the curve.
+
+    :return: Curve with the surface and the loop number of each segment,
+        None if all surfaces are closed.
+    """
+    parts = [
+        (rank, number, points[loop])
+        for rank, (points, surface_loops) in enumerate(zip(vertices, loops), start=1)
+        for number, loop in enumerate(surface_loops, start=1)
+    ]
+    if not parts:
+        return None
+
+    sizes = np.array([part[2].shape[0] for part in parts])
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    index = np.arange(sizes.sum())
+    segments = np.c_[index, starts + (index - starts + 1) % np.repeat(sizes, sizes)]
+
+    curve = Curve.create(
+        surfaces[0].workspace,
+        vertices=np.vstack([part[2] for part in parts]),
+        cells=segments,
+        name=name,
+        parent=parent,
+    )
+    curve.add_data(
+        {
+            "surface": {
+                "values": np.repeat([part[0] for part in parts], sizes),
+                "association": "CELL",
+                "type": "referenced",
+                "value_map": {
+                    rank: surface.name for rank, surface in enumerate(surfaces, start=1)
+                },
+            },
+            "loop": {
+                "values": np.repeat([part[1] for part in parts], sizes),
+                "association": "CELL",
+            },
+        }
+    )
+
+    return curve
+
+
+def surface_boundaries(  # pylint: disable=too-many-arguments
+    surfaces: Sequence[Surface],
+    fill: bool = False,
+    max_edges: int = 50,
+    method: str = "Fan",
+    suffix: str = "_filled",
+    name: str = "Boundaries",
+    parent: Entity | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> tuple[Curve | None, list[Surface]]:
+    """
+    Find the open boundaries of surfaces and optionally fill their holes.
+
+    :param surfaces: Surfaces to check.
+    :param fill: Fill the holes of up to ``max_edges`` edges.
+    :param max_edges: Maximum number of edges of the holes filled.
+    :param method: Filling method, 'Fan' or 'Ear clipping'.
+    :param suffix: Suffix appended to the names of the filled surfaces.
+    :param name: Name of the boundary curve.
+    :param parent: Parent group of the boundary curve.
+    :param compact: Compute on float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Curve of the boundaries left open, None if there are none, and
+        the filled copies of the surfaces that had holes.
+    """
+    if not surfaces:
+        raise ValueError("At least one surface must be provided.")
+
+    all_vertices, all_loops, filled = [], [], []
+    for surface in surfaces:
+        origin, vertices, cells = load_surface(surface, compact, tolerance)
+        topology = MeshTopology(cells, vertices.shape[0])
+        if fill:
+            vertices, new_cells, loops = fill_holes(
+                vertices, cells, max_edges, method=method, topology=topology
+            )
+            if new_cells.shape[0] > cells.shape[0]:
+                filled.append(
+                    create_surface(
+                        surface.workspace,
+                        origin + vertices.astype(np.float64),
+                        new_cells,
+                        compact=compact,
+                        tolerance=tolerance,
+                        name=f"{surface.name}{suffix}",
+                        parent=surface.parent,
+                    )
+                )
+        else:
+            loops = topology.boundary_loops()
+
+        all_vertices.append(origin + vertices.astype(np.float64))
+        all_loops.append(loops)
+
+    curve = boundary_curve(surfaces, all_vertices, all_loops, name, parent)
+
+    return curve, filled
+
+
+@dataclass(slots=True, kw_only=True)
+class BoundariesParams(BaseParams):
+    """Parameters of the surface boundaries command."""
+
+    group: ContainerGroup
+    fill: bool = False
+    max_edges: int = 50
+    method: str = "Fan"
+    suffix: str = "_filled"
+    export_as: str = "Boundaries"
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class BoundariesDriver(BaseDriver):
+    """Extract boundaries and fill holes of surfaces from ui.json parameters."""
+
+    ui_json = "boundaries"
+    params_class = BoundariesParams
+    params: BoundariesParams
+
+    def run(self) -> tuple[Curve | None, list[Surface]]:
+        params = self.params
+        surfaces = [
+            child for child in params.group.children if isinstance(child, Surface)
+        ]
+
+        return surface_boundaries(
+            surfaces,
+            fill=params.fill,
+            max_edges=params.max_edges,
+            method=params.method,
+            suffix=params.suffix,
+            name=params.export_as,
+            parent=params.group,
+            compact=params.compact,
+            tolerance=params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    BoundariesDriver.start(sys.argv[1])
@@ -0,0 +1,114 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.objects import Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.components import (
+    component_statistics,
+    filter_components,
+    remove_unused_vertices,
+)
+from surface_apps.output import create_surface, load_surface
+
+
+def remove_small_bodies(
+    surface: Surface,
+    min_volume: float = 0.0,
+    min_cells: int = 0,
+    name: str | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> Surface:
+    """
+    Create a copy of a surface without its small disconnected bodies.
+
+    The output cells carry the label, triangle count and volume of the
+    component they belong to.
+
+    :param surface: Surface to filter.
+    :param min_volume: Minimum enclosed volume of a body.
+    :param min_cells: Minimum number of triangles of a body.
+    :param name: Name of the output surface.
+    :param compact: Compute on float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Filtered surface.
+    """
+    origin, vertices, cells = load_surface(surface, compact, tolerance)
+    keep, labels = filter_components(
+        vertices, cells, min_volume=min_volume, min_cells=min_cells
+    )
+    if not np.any(keep):
+        raise ValueError(
+            f"All bodies of surface '{surface.name}' are below the thresholds."
+        )
+
+    vertices, cells, _ = remove_unused_vertices(vertices, cells[keep])
+    _, labels = np.unique(labels[keep], return_inverse=True)
+    stats = component_statistics(vertices, cells, labels)
+
+    output = create_surface(
+        surface.workspace,
+        origin + vertices.astype(np.float64),
+        cells,
+        compact=compact,
+        tolerance=tolerance,
+        name=name or f"{surface.name}_filtered",
+        parent=surface.parent,
+    )
+    output.add_data(
+        {
+            "component": {"values": labels.astype(np.int32) + 1},
+            "n_cells": {"values": stats["n_cells"][labels].astype(np.int32)},
+            "volume": {"values": stats["volume"][labels]},
+        }
+    )
+
+    return output
+
+
+@dataclass(slots=True, kw_only=True)
+class ComponentsParams(BaseParams):
+    """Parameters of the small bodies removal command."""
+
+    surface: Surface
+    min_volume: float = 0.0
+    min_cells: int = 0
+    export_as: str = "Filtered"
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class ComponentsDriver(BaseDriver):
+    """Remove the small bodies of a surface from ui.json parameters."""
+
+    ui_json = "components"
+    params_class = ComponentsParams
+    params: ComponentsParams
+
+    def run(self) -> Surface:
+        return remove_small_bodies(
+            self.params.surface,
+            min_volume=self.params.min_volume,
+            min_cells=self.params.min_cells,
+            name=self.params.export_as,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    ComponentsDriver.start(sys.argv[1])
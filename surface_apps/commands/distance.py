@@ -0,0 +1,121 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.data import Data
+from geoh5py.objects import ObjectBase, Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.memory import MemoryBudget
+from surface_apps.mesh.distance import TriangleTree
+from surface_apps.output import load_surface
+
+
+def get_locations(entity: ObjectBase) -> tuple[np.ndarray, str]:
+    """
+    Locations of an object used for distance queries: cell centroids of
+    grids and block models, vertices otherwise.
+
+    :param entity: Object to get locations from.
+
+    :return: Array of locations, shape (n, 3), and the data association.
+    """
+    centroids = getattr(entity, "centroids", None)
+    if centroids is not None:
+        return centroids, "CELL"
+
+    if getattr(entity, "vertices", None) is not None:
+        return entity.vertices, "VERTEX"
+
+    raise ValueError(f"Object '{entity.name}' has no vertices or centroids.")
+
+
+def surface_distance(  # pylint: disable=too-many-arguments
+    entity: ObjectBase,
+    surface: Surface,
+    name: str = "distance",
+    flag: bool = True,
+    memory_limit: float = 0.0,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> list[Data]:
+    """
+    Compute the signed distance of an object's locations to a surface.
+
+    Distances are positive on the side the surface normals point to, i.e.
+    above an upward-facing topography or outside a closed shell.
+
+    :param entity: Points, curve, drillhole, grid or block model to tag.
+    :param surface: Reference surface.
+    :param name: Name of the output data.
+    :param flag: Also write an integer flag, 1 on the negative side.
+    :param memory_limit: Cap on the memory of the batches of locations, in
+        GiB, 0 for half the available memory.
+    :param compact: Index float32 offsets of the surface from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Created data.
+    """
+    origin, vertices, cells = load_surface(surface, compact, tolerance)
+    locations, association = get_locations(entity)
+    distance = TriangleTree(vertices, cells).signed_distance(
+        locations - origin, budget=MemoryBudget(memory_limit)
+    )
+
+    data = {name: {"values": distance, "association": association}}
+    if flag:
+        data[f"{name}_flag"] = {
+            "values": (distance < 0).astype(np.int32),
+            "association": association,
+        }
+
+    output = entity.add_data(data)
+
+    return output if isinstance(output, list) else [output]
+
+
+@dataclass(slots=True, kw_only=True)
+class DistanceParams(BaseParams):
+    """Parameters of the signed distance command."""
+
+    objects: ObjectBase
+    surface: Surface
+    flag: bool = True
+    export_as: str = "distance"
+    memory_limit: float = 0.0
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class DistanceDriver(BaseDriver):
+    """Compute signed distances to a surface from ui.json parameters."""
+
+    ui_json = "distance"
+    params_class = DistanceParams
+    params: DistanceParams
+
+    def run(self) -> list[Data]:
+        return surface_distance(
+            self.params.objects,
+            self.params.surface,
+            name=self.params.export_as,
+            flag=self.params.flag,
+            memory_limit=self.params.memory_limit,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    DistanceDriver.start(sys.argv[1])
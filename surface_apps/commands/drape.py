@@ -0,0 +1,118 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from geoh5py.objects import Curve, Points, Surface
+
+from surface_apps.desurvey import directions
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.memory import MemoryBudget
+from surface_apps.mesh.drape import TriangleGrid
+from surface_apps.output import load_surface
+
+
+def drape_objects(  # pylint: disable=too-many-arguments
+    objects: Sequence[Points | Curve],
+    surface: Surface,
+    azimuth: float = 0.0,
+    dip: float = -90.0,
+    offset: float = 0.0,
+    suffix: str = "_draped",
+    memory_limit: float = 0.0,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> list[Points | Curve]:
+    """
+    Project the vertices of points and curves onto a surface.
+
+    The surface is indexed once and the vertices of each object are
+    located on it in batches. Copies of the objects are written next to
+    them, with their data and a boolean 'draped' flag, False for vertices
+    whose projection misses the surface and that are left in place.
+
+    :param objects: Points or curves to drape.
+    :param surface: Surface projected onto, e.g. a topography.
+    :param azimuth: Azimuth of the projection, clockwise from north, in
+        degrees.
+    :param dip: Dip of the projection from horizontal, in degrees,
+        negative downward; -90 projects vertically.
+    :param offset: Distance kept from the surface, against the direction of
+        projection, e.g. the clearance of a flight line.
+    :param suffix: Suffix added to the names of the copies.
+    :param memory_limit: Cap on the memory of the batches of vertices, in
+        GiB, 0 for half the available memory.
+    :param compact: Index float32 offsets of the surface from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Draped copies of the objects.
+    """
+    origin, vertices, cells = load_surface(surface, compact, tolerance)
+    direction = directions(azimuth, dip)[0]
+    grid = TriangleGrid(vertices, cells, direction=direction)
+    budget = MemoryBudget(memory_limit)
+
+    draped = []
+    for entity in objects:
+        if getattr(entity, "vertices", None) is None:
+            raise ValueError(f"Object '{entity.name}' has no vertices.")
+
+        projected, hit = grid.project(entity.vertices - origin, budget=budget)
+        projected[hit] -= offset * direction
+        copy = entity.copy(name=entity.name + suffix, vertices=projected + origin)
+        copy.add_data(
+            {"draped": {"values": hit, "type": "boolean", "association": "VERTEX"}}
+        )
+        draped.append(copy)
+
+    return draped
+
+
+@dataclass(slots=True, kw_only=True)
+class DrapeParams(BaseParams):
+    """Parameters of the drape command."""
+
+    objects: list[Points | Curve]
+    surface: Surface
+    azimuth: float = 0.0
+    dip: float = -90.0
+    offset: float = 0.0
+    suffix: str = "_draped"
+    memory_limit: float = 0.0
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class DrapeDriver(BaseDriver):
+    """Drape points and curves on a surface from ui.json parameters."""
+
+    ui_json = "drape"
+    params_class = DrapeParams
+    params: DrapeParams
+
+    def run(self) -> list[Points | Curve]:
+        return drape_objects(
+            self.params.objects,
+            self.params.surface,
+            azimuth=self.params.azimuth,
+            dip=self.params.dip,
+            offset=self.params.offset,
+            suffix=self.params.suffix,
+            memory_limit=self.params.memory_limit,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    DrapeDriver.start(sys.argv[1])
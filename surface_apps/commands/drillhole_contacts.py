@@ -0,0 +1,297 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.data import Data, NumericData, ReferencedData
+from geoh5py.groups import DrillholeGroup
+from geoh5py.objects import Drillhole, Surface
+from geoh5py.shared.concatenation import Concatenator
+
+from surface_apps.desurvey import concatenated_column, desurvey_group
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.faults import delaunay_2d
+from surface_apps.output import create_surface
+
+
+def _unit_codes(datum: Data, unit: str) -> np.ndarray:
+    """Values of interval data matching a unit name or value."""
+    if isinstance(datum, ReferencedData):
+        return np.array(
+            [code for code, label in datum.value_map.map.items() if label == unit]
+        )
+
+    if not isinstance(datum, NumericData):
+        raise ValueError(
+            f"Data '{datum.name}' must be referenced or numeric to select units."
+        )
+    try:
+        return np.array([float(unit)])
+    except ValueError as error:
+        raise ValueError(
+            f"Data '{datum.name}' is not referenced, unit '{unit}' must be "
+            "one of its values."
+        ) from error
+
+
+def interval_contacts(  # pylint: disable=too-many-arguments
+    offsets: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    inside: np.ndarray,
+    contact: str = "Top",
+    tolerance: float = 1e-3,
+) -> np.ndarray:
+    """
+    Depths of the top or the bottom of the first run of intervals of a unit
+    down drillholes.
+
+    Intervals of all drillholes are concatenated, with ``offsets`` marking
+    the first interval of each, so that all contacts are found at once.
+
+    :param offsets: Index of the first interval of each drillhole, followed
+        by the total number of intervals, shape (n_holes + 1,).
+    :param starts: Depths of the tops of the intervals.
+    :param ends: Depths of the bottoms of the intervals.
+    :param inside: Whether each interval belongs to the unit.
+    :param contact: 'Top' or 'Bottom'.
+    :param tolerance: Maximum gap between consecutive intervals of a run.
+
+    :return: Contact depth of each drillhole, nan where the unit is not
+        intersected.
+    """
+    counts = np.diff(offsets)
+    holes = np.repeat(np.arange(counts.shape[0]), counts)
+    order = np.lexsort((starts, holes))
+    starts, ends, inside = starts[order], ends[order], inside[order]
+    stops = offsets[1:]
+    depths = np.full(counts.shape[0], np.nan)
+
+    # First interval of the unit in each drillhole, past its end if none
+    first = np.array(stops)
+    if inside.size:
+        first[counts > 0] = np.minimum.reduceat(
+            np.where(inside, np.arange(inside.shape[0]), inside.shape[0]),
+            offsets[:-1][counts > 0],
+        )
+    found = first < stops
+    if contact == "Top":
+        depths[found] = starts[first[found]]
+        return depths
+
+    # Runs break on intervals out of the unit, on gaps and between holes
+    breaks = ~inside
+    breaks[1:] |= starts[1:] > ends[:-1] + tolerance
+    breaks[offsets[:-1][counts > 0]] = True
+    positions = np.r_[np.flatnonzero(breaks), inside.shape[0]]
+    following = positions[np.searchsorted(positions, first[found], side="right")]
+    depths[found] = ends[np.minimum(following, stops[found]) - 1]
+
+    return depths
+
+
+def _hole_intervals(
+    holes: Sequence[Drillhole], data_name: str
+) -> Iterator[tuple[int, Data, np.ndarray, np.ndarray, np.ndarray]]:
+    """Interval data of drillholes, read one drillhole at a time."""
+    for index, hole in enumerate(holes):
+        data = hole.get_data(data_name)
+        table = getattr(data[0], "property_group", None) if data else None
+        if table is None or getattr(table, "from_", None) is None:
+            continue
+
+        yield index, data[0], data[0].values, table.from_.values, table.to_.values
+
+
+def _group_intervals(
+    group: Concatenator, holes: Sequence[Drillhole], data_name: str
+) -> Iterator[tuple[int, Data, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Interval data of the drillholes of a concatenated group, read once for
+    the group, with the interval table of the first drillhole holding the
+    data. Drillholes whose data belong to another table are read alone.
+    """
+    values, slices = concatenated_column(group, data_name)
+    keys = [f"{{{hole.uid}}}".encode() for hole in holes]
+    first = next((index for index, key in enumerate(keys) if key in slices), None)
+    if first is None:
+        return
+
+    datum = holes[first].get_data(data_name)[0]
+    table = getattr(datum, "property_group", None)
+    if table is None or getattr(table, "from_", None) is None:
+        return
+
+    starts, start_slices = concatenated_column(group, table.from_.name)
+    ends, end_slices = concatenated_column(group, table.to_.name)
+    for index, key in enumerate(keys):
+        if key not in slices:
+            continue
+        pieces = [column.get(key) for column in (slices, start_slices, end_slices)]
+        if None not in pieces and len({part.stop - part.start for part in pieces}) == 1:
+            yield (
+                index,
+                datum,
+                values[pieces[0]],
+                starts[pieces[1]],
+                ends[pieces[2]],
+            )
+        else:
+            for _, *other in _hole_intervals(holes[index : index + 1], data_name):
+                yield index, *other
+
+
+def contact_depths(
+    holes: Sequence[Drillhole], data_name: str, unit: str, contact: str = "Top"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Contact depths of a unit along drillholes.
+
+    The interval data of drillholes of a concatenated group are read once
+    for the whole group, then the contacts of all drillholes are found in
+    one vectorized pass.
+
+    :param holes: Drillholes.
+    :param data_name: Name of the interval data, e.g. lithology codes.
+    :param unit: Name of the unit in the value map of referenced data, or
+        its value otherwise.
+    :param contact: 'Top' or 'Bottom' of the unit.
+
+    :return: Index of the drillholes intersecting the unit and the depth
+        of their contact.
+    """
+    if contact not in ("Top", "Bottom"):
+        raise ValueError(f"Contact must be 'Top' or 'Bottom'. {contact}")
+
+    parent = holes[0].parent if holes else None
+    if isinstance(parent, Concatenator) and all(
+        hole.parent is parent for hole in holes
+    ):
+        intervals = _group_intervals(parent, holes, data_name)
+    else:
+        intervals = _hole_intervals(holes, data_name)
+
+    # Codes of the unit, validated once per data type
+    codes: dict = {}
+    indices, inside, starts, ends = [], [], [], []
+    for index, datum, values, hole_starts, hole_ends in intervals:
+        if datum.entity_type.uid not in codes:
+            codes[datum.entity_type.uid] = _unit_codes(datum, unit)
+        indices.append(index)
+        inside.append(np.isin(values, codes[datum.entity_type.uid]))
+        starts.append(hole_starts)
+        ends.append(hole_ends)
+
+    if not indices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    depths = interval_contacts(
+        np.r_[0, np.cumsum([values.shape[0] for values in inside])],
+        np.hstack(starts).astype(np.float64),
+        np.hstack(ends).astype(np.float64),
+        np.hstack(inside),
+        contact=contact,
+    )
+    found = ~np.isnan(depths)
+
+    return np.array(indices, dtype=np.int64)[found], depths[found]
+
+
+def contact_surface(  # pylint: disable=too-many-arguments
+    group: DrillholeGroup,
+    data_name: str,
+    unit: str,
+    contact: str = "Top",
+    name: str = "Contact surface",
+    cache: bool = True,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> Surface:
+    """
+    Triangulate the contacts of a unit intersected by drillholes.
+
+    All drillholes are desurveyed at once by minimum curvature, reusing the
+    paths cached by a previous run if their surveys are unchanged, and the
+    contacts are triangulated in plan view.
+
+    :param group: Drillhole group.
+    :param data_name: Name of the interval data, e.g. lithology codes.
+    :param unit: Name of the unit in the value map of referenced data, or
+        its value otherwise.
+    :param contact: 'Top' or 'Bottom' of the unit.
+    :param name: Name of the output surface.
+    :param cache: Read and write the cache of drillhole paths.
+    :param compact: Round the vertices to float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Contact surface, with the depth of the contact at its vertices.
+    """
+    holes, paths = desurvey_group(group, cache=cache)
+    indices, depths = contact_depths(holes, data_name, unit, contact=contact)
+    if indices.shape[0] < 3:
+        raise ValueError(
+            f"Unit '{unit}' is intersected by {indices.shape[0]} drillholes; "
+            "at least 3 are needed."
+        )
+
+    points = paths.locations(indices, depths)
+    surface = create_surface(
+        group.workspace,
+        points,
+        delaunay_2d(points),
+        compact=compact,
+        tolerance=tolerance,
+        name=name,
+    )
+    surface.add_data({"depth": {"values": depths, "association": "VERTEX"}})
+
+    return surface
+
+
+@dataclass(slots=True, kw_only=True)
+class DrillholeContactsParams(BaseParams):
+    """Parameters of the drillhole contacts command."""
+
+    group: DrillholeGroup
+    data_name: str
+    unit: str
+    contact: str = "Top"
+    export_as: str = "Contact surface"
+    cache: bool = True
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class DrillholeContactsDriver(BaseDriver):
+    """Triangulate drillhole contacts from ui.json parameters."""
+
+    ui_json = "drillhole_contacts"
+    params_class = DrillholeContactsParams
+    params: DrillholeContactsParams
+
+    def run(self) -> Surface:
+        return contact_surface(
+            self.params.group,
+            self.params.data_name,
+            self.params.unit,
+            contact=self.params.contact,
+            name=self.params.export_as,
+            cache=self.params.cache,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    DrillholeContactsDriver.start(sys.argv[1])
@@ -0,0 +1,182 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.objects import Points, Surface
+from scipy.spatial import QhullError
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.distance import TriangleTree
+from surface_apps.mesh.faults import fault_blocks, triangulate_block
+from surface_apps.output import create_surface, parse_lod
+from surface_apps.parallel import merge_meshes, ordered_map, runtime_summary
+
+logger = logging.getLogger(__name__)
+
+_FAULTS: list[TriangleTree] = []
+
+
+def _init_worker(faults: list[TriangleTree]):
+    """Share the fault indexes with a worker process, once for all blocks."""
+    global _FAULTS  # pylint: disable=global-statement
+    _FAULTS = faults
+
+
+def _triangulate_task(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Surface of one fault block, empty if its points are collinear."""
+    try:
+        return triangulate_block(points, _FAULTS)
+    except QhullError:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32)
+
+
+def faulted_horizon(  # pylint: disable=too-many-arguments, too-many-locals
+    points: Points,
+    faults: list[Surface],
+    min_points: int = 3,
+    workers: int = 1,
+    threads: int = 0,
+    name: str = "Faulted horizon",
+    compact: bool = False,
+    tolerance: float = 1e-3,
+    lod: Sequence[float] = (),
+) -> Surface:
+    """
+    Triangulate horizon points split by fault surfaces.
+
+    Points are partitioned into fault blocks, each block is triangulated
+    in plan view by a pool of processes and clipped against the faults.
+    The block label of each point is written to the points.
+
+    :param points: Horizon points.
+    :param faults: Fault surfaces.
+    :param min_points: Minimum number of points of a triangulated block.
+    :param workers: Number of processes, 0 for one per core.
+    :param threads: BLAS and OpenMP threads per process, 0 to share the cores.
+    :param name: Name of the output surface.
+    :param compact: Round the vertices to float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+    :param lod: Fractions of the triangles kept by decimated levels of
+        detail, grouped with the surface.
+
+    :return: Surface of all blocks, with the block label of each cell.
+    """
+    if points.vertices is None or points.n_vertices < 3:
+        raise ValueError(f"Points '{points.name}' must have at least 3 vertices.")
+
+    trees = []
+    for fault in faults:
+        if fault.vertices is None or fault.cells is None:
+            raise ValueError(f"Fault '{fault.name}' has no vertices or cells.")
+        trees.append(TriangleTree(fault.vertices, fault.cells))
+
+    n_blocks, labels = fault_blocks(points.vertices, trees)
+    points.add_data(
+        {
+            "fault_block": {
+                "values": labels.astype(np.int32) + 1,
+                "association": "VERTEX",
+            }
+        }
+    )
+
+    blocks = [
+        block
+        for block in range(n_blocks)
+        if np.count_nonzero(labels == block) >= max(min_points, 3)
+    ]
+    tasks = [points.vertices[labels == block] for block in blocks]
+
+    # Blocks are merged in label order, whichever process triangulated them
+    results = list(
+        ordered_map(
+            _triangulate_task,
+            ((task,) for task in tasks),
+            workers=workers,
+            initializer=_init_worker,
+            initargs=(trees,),
+            threads=threads,
+        )
+    )
+    vertices, cells = merge_meshes(results)
+    if cells.shape[0] == 0:
+        raise ValueError("No fault block could be triangulated.")
+
+    surface = create_surface(
+        points.workspace,
+        vertices,
+        cells,
+        compact=compact,
+        tolerance=tolerance,
+        lod=lod,
+        name=name,
+    )
+    surface.add_data(
+        {
+            "fault_block": {
+                "values": np.repeat(
+                    np.array(blocks, dtype=np.int32) + 1,
+                    [cells.shape[0] for _, cells in results],
+                ),
+                "association": "CELL",
+            }
+        }
+    )
+
+    return surface
+
+
+@dataclass(slots=True, kw_only=True)
+class FaultedHorizonParams(BaseParams):
+    """Parameters of the faulted horizon command."""
+
+    points: Points
+    faults: list[Surface]
+    min_points: int = 3
+    workers: int = 0
+    threads: int = 0
+    compact: bool = False
+    tolerance: float = 1e-3
+    lod_levels: str | None = None
+    export_as: str = "Faulted horizon"
+
+
+class FaultedHorizonDriver(BaseDriver):
+    """Triangulate a faulted horizon from ui.json parameters."""
+
+    ui_json = "faulted_horizon"
+    params_class = FaultedHorizonParams
+    params: FaultedHorizonParams
+
+    def run(self) -> Surface:
+        logger.info(
+            "Runtime: %s", runtime_summary(self.params.workers, self.params.threads)
+        )
+        return faulted_horizon(
+            self.params.points,
+            self.params.faults,
+            min_points=self.params.min_points,
+            workers=self.params.workers,
+            threads=self.params.threads,
+            name=self.params.export_as,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+            lod=parse_lod(self.params.lod_levels),
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    FaultedHorizonDriver.start(sys.argv[1])
@@ -9,30 +9,53 @@
 from __future__ import annotations
 
 import sys
-import tkinter as tk
+from dataclasses import dataclass
 
-from geoh5py.ui_json import InputFile
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.progress import ProgressReporter, run_with_progress
 
 
-def hello(name: str) -> None:
+def greet(reporter: ProgressReporter, name: str) -> str:
+    """
+    Compute stage of the greeting, run in a worker thread.
+    """
+    message = f"Hello, {name} !"
+    reporter.check()
+    reporter.advance(message=message)
+
+    return message
+
+
+def hello(name: str) -> str:
     """
     Pops up a greeting dialog box with the given message.
     """
+    return run_with_progress(greet, name, title=name, keep_open=True)
 
-    root = tk.Tk()
-    root.title(name)
-    root.geometry("300x200")
-    root.resizable(False, False)
 
-    label = tk.Label(root, text=f"Hello, {name} !")
-    label.pack()
+@dataclass(slots=True, kw_only=True)
+class HelloParams(BaseParams):
+    """Parameters of the greeting command."""
 
-    root.mainloop()
+    name: str = "World"
 
 
-if __name__ == "__main__":
+class HelloDriver(BaseDriver):
+    """Greet from ui.json parameters."""
+
+    ui_json = "hello"
+    params_class = HelloParams
+    params: HelloParams
+
+    def run(self) -> str:
+        return hello(self.params.name)
+
+
+def main():
+    """Script entry point."""
     assert len(sys.argv) > 1, "No input file provided"
+    HelloDriver.start(sys.argv[1])
+
 
-    ifile = InputFile.read_ui_json(sys.argv[1])
-    params = ifile.data
-    hello(params["name"])
+if __name__ == "__main__":
+    main()
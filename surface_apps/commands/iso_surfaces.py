@@ -0,0 +1,484 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from geoh5py.data import FloatData
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import BlockModel, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.checkpoint import Checkpoint
+from surface_apps.commands.block_flagging import local_centers, to_world
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.memory import MemoryBudget
+from surface_apps.mesh.iso_surface import (
+    GridTopology,
+    RangePyramid,
+    contour,
+    contour_batch,
+)
+from surface_apps.output import create_surface, parse_lod
+from surface_apps.parallel import ordered_map, resolve_workers, runtime_summary
+
+logger = logging.getLogger(__name__)
+
+# Peak memory per grid node of a realization being contoured, and of a
+# realization being counted for probabilities
+CONTOUR_BYTES = 64
+COUNT_BYTES = 16
+
+
+@dataclass(slots=True)
+class BlockGrid:
+    """
+    Grid of the cell centers of a block model, shared by all its data.
+
+    :param topology: Topology of the grid of centers.
+    :param axes: Increasing cell centers along u, v and z, in the frame of
+        the block model.
+    :param index: Block model cell at each grid node.
+    """
+
+    topology: GridTopology
+    axes: list[np.ndarray]
+    index: np.ndarray
+
+    @classmethod
+    def from_block_model(cls, block_model: BlockModel) -> BlockGrid:
+        """
+        Grid of the cell centers of a block model.
+
+        :param block_model: Block model.
+        """
+        centers = local_centers(block_model)
+        orders = [np.argsort(axis) for axis in centers]
+        u_order, v_order, z_order = orders
+        index = np.arange(block_model.n_cells).reshape(
+            (centers[1].shape[0], centers[0].shape[0], centers[2].shape[0])
+        )
+        index = index[np.ix_(v_order, u_order, z_order)].transpose((1, 0, 2))
+
+        return cls(
+            GridTopology(index.shape),
+            [axis[order] for axis, order in zip(centers, orders)],
+            index.ravel(),
+        )
+
+    def values(self, data: Sequence[FloatData]) -> np.ndarray:
+        """
+        Values of block model data at the grid nodes.
+
+        :param data: Cell data of the block model.
+
+        :return: Values, shape (n_nodes, n_data).
+        """
+        columns = []
+        for datum in data:
+            if datum.values is None or datum.values.shape[0] != self.index.shape[0]:
+                raise ValueError(f"Data '{datum.name}' is not on the block model.")
+            columns.append(datum.values[self.index])
+
+        return np.column_stack(columns)
+
+
+_GRID: BlockGrid | None = None
+
+
+def _init_worker(grid: BlockGrid):
+    """Share the grid with a worker process, once for all its tasks."""
+    global _GRID  # pylint: disable=global-statement
+    _GRID = grid
+
+
+def _contour_task(
+    values: np.ndarray, threshold: float, macro_block: int
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Iso-surfaces of a batch of realizations on the shared grid."""
+    assert _GRID is not None, "Worker grid is not initialized."
+    return contour_batch(
+        _GRID.topology, values, _GRID.axes, threshold, block_size=macro_block
+    )
+
+
+def _shell_task(
+    probability: np.ndarray, level: float, cubes: np.ndarray | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Shell of a probability level on the shared grid."""
+    assert _GRID is not None, "Worker grid is not initialized."
+    return contour(_GRID.topology, probability, _GRID.axes, level, cubes=cubes)
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _batch_size(
+    batch_size: int, n_data: int, realization_bytes: float, memory_limit: float
+) -> int:
+    """Realizations per batch, sized by the memory budget if 0."""
+    if batch_size < 0:
+        raise ValueError(f"Batch size must be positive. {batch_size} provided.")
+
+    return batch_size or MemoryBudget(memory_limit).chunk_size(
+        realization_bytes, maximum=max(n_data, 1)
+    )
+
+
+def realization_surfaces(  # pylint: disable=too-many-arguments
+    block_model: BlockModel,
+    data: Sequence[FloatData],
+    threshold: float,
+    workers: int = 1,
+    threads: int = 0,
+    batch_size: int = 0,
+    macro_block: int = 8,
+    memory_limit: float = 0.0,
+    checkpoint: Checkpoint | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+    **kwargs,
+) -> list[Surface]:
+    """
+    Iso-surface every realization of a block model.
+
+    The grid topology is computed once, realizations are classified by
+    batches and batches are spread across a pool of processes.
+
+    :param block_model: Block model holding the realizations.
+    :param data: Realizations, as cell data of the block model.
+    :param threshold: Iso-value; surfaces wrap the cells at or above it.
+    :param workers: Number of processes, 0 for one per core.
+    :param threads: BLAS and OpenMP threads per process, 0 to share the cores.
+    :param batch_size: Number of realizations classified together, 0 to
+        fit the batches in flight on all workers within the memory budget.
+    :param macro_block: Size of the blocks of cubes skipped where the
+        realization does not cross the threshold, 0 to classify all cubes.
+    :param memory_limit: Cap on the memory of the batches, in GiB, 0 for
+        half the available memory.
+    :param checkpoint: Store of completed realizations and of the surfaces
+        written, to resume an interrupted job.
+    :param compact: Round the vertices to float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+    :param kwargs: Additional attributes of the surfaces, e.g. parent.
+
+    :return: One surface per realization crossing the threshold, named
+        after its data.
+    """
+    grid = BlockGrid.from_block_model(block_model)
+    units = list(range(len(data)))
+    pending = units if checkpoint is None else checkpoint.pending(units)
+    meshes = {}
+    # Up to two batches per worker are in flight
+    batch_size = _batch_size(
+        batch_size,
+        len(pending),
+        grid.index.shape[0] * CONTOUR_BYTES * 2 * resolve_workers(workers),
+        memory_limit,
+    )
+
+    tasks = (
+        (grid.values([data[unit] for unit in batch]), threshold, macro_block)
+        for batch in _chunks(pending, batch_size)
+    )
+    results = ordered_map(
+        _contour_task,
+        tasks,
+        workers=workers,
+        initializer=_init_worker,
+        initargs=(grid,),
+        threads=threads,
+    )
+    for unit, (vertices, cells) in zip(pending, chain.from_iterable(results)):
+        if checkpoint is None:
+            meshes[unit] = (vertices, cells)
+        else:
+            checkpoint.save(unit, vertices=vertices, cells=cells)
+
+    surfaces = []
+    for unit in units:
+        written = _written_surface(block_model.workspace, checkpoint, f"surface-{unit}")
+        if written is not None:
+            surfaces.append(written)
+            continue
+
+        if unit in meshes:
+            vertices, cells = meshes.pop(unit)
+        else:
+            mesh = checkpoint.load(unit)  # type: ignore
+            vertices, cells = mesh["vertices"], mesh["cells"]
+
+        if cells.shape[0] == 0:
+            continue
+
+        surface = create_surface(
+            block_model.workspace,
+            to_world(block_model, vertices),
+            cells,
+            compact=compact,
+            tolerance=tolerance,
+            name=data[unit].name,
+            **kwargs,
+        )
+        _record_written(checkpoint, f"surface-{unit}", surface)
+        surfaces.append(surface)
+
+    if checkpoint is not None:
+        checkpoint.clear()
+
+    return surfaces
+
+
+def probability_shells(  # pylint: disable=too-many-arguments
+    block_model: BlockModel,
+    data: Sequence[FloatData],
+    threshold: float,
+    probabilities: Sequence[float],
+    workers: int = 1,
+    threads: int = 0,
+    batch_size: int = 0,
+    macro_block: int = 8,
+    memory_limit: float = 0.0,
+    checkpoint: Checkpoint | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+    **kwargs,
+) -> list[Surface]:
+    """
+    Shells of the probability for the realizations to exceed a threshold.
+
+    Realizations are read and counted by batches in this process, as the
+    counting is bound by reading the data; the shells of the levels are
+    spread across a pool of processes.
+
+    :param block_model: Block model holding the realizations.
+    :param data: Realizations, as cell data of the block model.
+    :param threshold: Value to exceed.
+    :param probabilities: Probability levels of the shells, in (0, 1].
+    :param workers: Number of processes contouring the levels, 0 for one
+        per core.
+    :param threads: BLAS and OpenMP threads per process, 0 to share the cores.
+    :param batch_size: Number of realizations loaded together, 0 to fit
+        the batches within the memory budget.
+    :param macro_block: Size of the blocks of cubes skipped where the
+        probability does not cross a level, 0 to classify all cubes. The
+        ranges of the blocks are computed once for all levels.
+    :param memory_limit: Cap on the memory of the batches, in GiB, 0 for
+        half the available memory.
+    :param checkpoint: Store of the counts after each batch and of the
+        shells written, to resume an interrupted job.
+    :param compact: Round the vertices to float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+    :param kwargs: Additional attributes of the surfaces, e.g. parent.
+
+    :return: One surface per probability level reached.
+    """
+    if not data:
+        raise ValueError("At least one realization must be provided.")
+    if any(not 0.0 < level <= 1.0 for level in probabilities):
+        raise ValueError("Probability levels must be between 0 and 1.")
+
+    grid = BlockGrid.from_block_model(block_model)
+    # Integer counts keep the probabilities exact, whatever the batches, and
+    # are saved with the number of realizations counted so far, so that a
+    # resumed job may use other batches
+    counts = np.zeros(grid.index.shape[0], dtype=np.int64)
+    start = 0
+    if checkpoint is not None and "counts" in checkpoint:
+        saved = checkpoint.load("counts")
+        counts, start = saved["counts"], int(saved["start"])
+
+    batch_size = _batch_size(
+        batch_size, len(data) - start, grid.index.shape[0] * COUNT_BYTES, memory_limit
+    )
+    for batch in _chunks(data[start:], batch_size):
+        counts += np.count_nonzero(grid.values(batch) >= threshold, axis=1)
+        start += len(batch)
+        if checkpoint is not None:
+            checkpoint.save("counts", counts=counts, start=np.array(start))
+
+    # Shells written before an interruption are not contoured again
+    written = [
+        _written_surface(block_model.workspace, checkpoint, f"surface-P{level:g}")
+        for level in probabilities
+    ]
+    pending = [index for index, surface in enumerate(written) if surface is None]
+    probability = counts / len(data)
+    pyramid = (
+        RangePyramid(grid.topology, probability, macro_block) if macro_block else None
+    )
+    tasks = (
+        (
+            probability,
+            level,
+            None if pyramid is None else pyramid.active_cubes(level),
+        )
+        for level in (probabilities[index] for index in pending)
+    )
+    results = ordered_map(
+        _shell_task,
+        tasks,
+        workers=workers,
+        initializer=_init_worker,
+        initargs=(grid,),
+        threads=threads,
+    )
+
+    for index, (vertices, cells) in zip(pending, results):
+        if cells.shape[0] == 0:
+            continue
+
+        level = probabilities[index]
+        written[index] = create_surface(
+            block_model.workspace,
+            to_world(block_model, vertices),
+            cells,
+            compact=compact,
+            tolerance=tolerance,
+            name=f"P{level:g}",
+            **kwargs,
+        )
+        _record_written(checkpoint, f"surface-P{level:g}", written[index])
+
+    if checkpoint is not None:
+        checkpoint.clear()
+
+    return [surface for surface in written if surface is not None]
+
+
+def _written_surface(
+    workspace: Workspace, checkpoint: Checkpoint | None, unit: str
+) -> Surface | None:
+    """Surface recorded in the checkpoint as written by an interrupted job."""
+    if checkpoint is None or unit not in checkpoint:
+        return None
+
+    surface = workspace.get_entity(UUID(str(checkpoint.load(unit)["uid"])))[0]
+
+    return surface if isinstance(surface, Surface) else None
+
+
+def _record_written(checkpoint: Checkpoint | None, unit: str, surface: Surface):
+    """Record in the checkpoint a surface once written to the workspace."""
+    if checkpoint is not None:
+        checkpoint.save(unit, uid=np.array(str(surface.uid)))
+
+
+def output_group(
+    workspace: Workspace, name: str, checkpoint: Checkpoint | None = None
+) -> ContainerGroup:
+    """
+    Group receiving the surfaces of a job.
+
+    The group is recorded in the checkpoint, so that a resumed job writes
+    to the group created by the interrupted one rather than a new one.
+
+    :param workspace: Workspace of the block model.
+    :param name: Name of the group.
+    :param checkpoint: Store of the job, None to always create the group.
+    """
+    if checkpoint is not None and "group" in checkpoint:
+        uid = UUID(str(checkpoint.load("group")["uid"]))
+        group = workspace.get_entity(uid)[0]
+        if isinstance(group, ContainerGroup):
+            return group
+
+    group = ContainerGroup.create(workspace, name=name)
+    if checkpoint is not None:
+        checkpoint.save("group", uid=np.array(str(group.uid)))
+
+    return group
+
+
+@dataclass(slots=True, kw_only=True)
+class IsoSurfacesParams(BaseParams):
+    """Parameters of the realization iso-surfaces command."""
+
+    block_model: BlockModel
+    data: list[FloatData]
+    threshold: float = 0.0
+    output: str = "Realizations"
+    probabilities: str = "0.1, 0.5, 0.9"
+    workers: int = 0
+    threads: int = 0
+    batch_size: int = 0
+    macro_block: int = 8
+    memory_limit: float = 0.0
+    compact: bool = False
+    tolerance: float = 1e-3
+    lod_levels: str | None = None
+    export_as: str = "Iso-surfaces"
+
+
+class IsoSurfacesDriver(BaseDriver):
+    """Iso-surface block model realizations from ui.json parameters."""
+
+    ui_json = "iso_surfaces"
+    params_class = IsoSurfacesParams
+    params: IsoSurfacesParams
+
+    def run(self) -> list[Surface]:
+        logger.info(
+            "Runtime: %s", runtime_summary(self.params.workers, self.params.threads)
+        )
+        params = self.params
+        checkpoint = (
+            None
+            if self.input_file is None
+            else Checkpoint.from_input_file(self.input_file)
+        )
+        group = output_group(params.block_model.workspace, params.export_as, checkpoint)
+
+        if params.output == "Probability shells":
+            return probability_shells(
+                params.block_model,
+                params.data,
+                params.threshold,
+                [float(level) for level in params.probabilities.split(",")],
+                workers=params.workers,
+                threads=params.threads,
+                batch_size=params.batch_size,
+                macro_block=params.macro_block,
+                memory_limit=params.memory_limit,
+                checkpoint=checkpoint,
+                compact=params.compact,
+                tolerance=params.tolerance,
+                lod=parse_lod(params.lod_levels),
+                parent=group,
+            )
+
+        return realization_surfaces(
+            params.block_model,
+            params.data,
+            params.threshold,
+            workers=params.workers,
+            threads=params.threads,
+            batch_size=params.batch_size,
+            macro_block=params.macro_block,
+            memory_limit=params.memory_limit,
+            checkpoint=checkpoint,
+            compact=params.compact,
+            tolerance=params.tolerance,
+            lod=parse_lod(params.lod_levels),
+            parent=group,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    IsoSurfacesDriver.start(sys.argv[1])
@@ -0,0 +1,100 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.objects import Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.adjacency import edge_table
+from surface_apps.mesh.remeshing import remesh
+from surface_apps.output import create_surface, load_surface
+
+
+def remesh_surface(  # pylint: disable=too-many-arguments
+    surface: Surface,
+    target_length: float = 0.0,
+    iterations: int = 10,
+    name: str | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> Surface:
+    """
+    Create an isotropic remesh of a surface.
+
+    Data are not transferred, the vertices and triangles of the remeshed
+    surface being new.
+
+    :param surface: Surface to remesh.
+    :param target_length: Target edge length, 0 for the mean edge length of
+        the input surface.
+    :param iterations: Number of remeshing iterations.
+    :param name: Name of the output surface.
+    :param compact: Remesh float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Remeshed surface.
+    """
+    origin, vertices, cells = load_surface(surface, compact, tolerance)
+    vertices = vertices.astype(np.float64)
+    if target_length <= 0:
+        edges, _, _ = edge_table(cells)
+        target_length = float(
+            np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1).mean()
+        )
+
+    vertices, cells = remesh(vertices, cells, target_length, iterations=iterations)
+
+    return create_surface(
+        surface.workspace,
+        origin + vertices,
+        cells,
+        compact=compact,
+        tolerance=tolerance,
+        name=name or f"{surface.name}_remeshed",
+        parent=surface.parent,
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class RemeshingParams(BaseParams):
+    """Parameters of the surface remeshing command."""
+
+    surface: Surface
+    target_length: float = 0.0
+    iterations: int = 10
+    export_as: str = "Remeshed"
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class RemeshingDriver(BaseDriver):
+    """Remesh a surface from ui.json parameters."""
+
+    ui_json = "remeshing"
+    params_class = RemeshingParams
+    params: RemeshingParams
+
+    def run(self) -> Surface:
+        return remesh_surface(
+            self.params.surface,
+            target_length=self.params.target_length,
+            iterations=self.params.iterations,
+            name=self.params.export_as,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    RemeshingDriver.start(sys.argv[1])
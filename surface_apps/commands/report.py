@@ -0,0 +1,290 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+import warnings
+from collections.abc import Sequence
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from geoh5py.data import FilenameData, FloatData
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import BlockModel, Surface
+
+from surface_apps.commands.block_flagging import inside_block_model
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.mesh.attributes import face_normals, triangle_quality
+from surface_apps.mesh.components import label_components
+from surface_apps.parallel import merge_meshes, tree_sum
+
+QUALITY_BINS = np.linspace(0.0, 1.0, 6)
+
+
+def _quality_columns() -> list[str]:
+    return [
+        f"quality_{low:.1f}_{high:.1f}"
+        for low, high in zip(QUALITY_BINS[:-1], QUALITY_BINS[1:])
+    ]
+
+
+def triangle_table(surfaces: Sequence[Surface]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Metrics of every triangle and vertex of a set of surfaces.
+
+    Surfaces are read once and merged into a single mesh, so that all
+    metrics are computed in one vectorized pass.
+
+    :param surfaces: Surfaces to measure.
+
+    :return: Triangle table with the surface, component, area, signed
+        volume, quality and open boundary edges of each triangle, and
+        vertex table with the surface and coordinates of each vertex.
+    """
+    meshes = []
+    for surface in surfaces:
+        if surface.vertices is None or surface.cells is None:
+            raise ValueError(f"Surface '{surface.name}' has no vertices or cells.")
+        meshes.append((surface.vertices, surface.cells))
+
+    vertices, cells = merge_meshes(meshes)
+    vertex_surface = np.repeat(
+        np.arange(len(meshes)), [mesh[0].shape[0] for mesh in meshes]
+    )
+    # Volumes are invariant by translation, center them for precision
+    centered = vertices - vertices.mean(axis=0)
+    normals, areas = face_normals(centered, cells)
+    signed = np.einsum("ij,ij->i", centered[cells[:, 0]], normals) * 2.0 * areas / 6.0
+
+    # Components never span two surfaces, their vertices are disjoint
+    topology = MeshTopology(cells, vertices.shape[0])
+    _, components = label_components(cells, topology)
+    boundary = (topology.counts != 2)[topology.cell_edges].sum(axis=1)
+
+    triangles = pd.DataFrame(
+        {
+            "surface": vertex_surface[cells[:, 0]],
+            "component": components,
+            "area": areas,
+            "volume": signed,
+            "quality": triangle_quality(vertices, cells),
+            "boundary_edges": boundary,
+        }
+    )
+    points = pd.DataFrame(
+        {
+            "surface": vertex_surface,
+            "x": vertices[:, 0],
+            "y": vertices[:, 1],
+            "z": vertices[:, 2],
+        }
+    )
+
+    return triangles, points
+
+
+def _summarize(triangles: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Sums, volume and quality histogram of triangles grouped by a key."""
+    groups = triangles.groupby(key, sort=True)
+    table = groups.agg(
+        n_cells=("area", "size"),
+        area=("area", "sum"),
+        volume=("volume", "sum"),
+        min_quality=("quality", "min"),
+        boundary_edges=("boundary_edges", "sum"),
+    )
+    # Sums in a fixed pairwise order, reproducible and accurate on large meshes
+    keys = triangles[key].to_numpy()
+    for column in ("area", "volume"):
+        table[column] = tree_sum(triangles[column].to_numpy(), keys)[table.index]
+    table["closed"] = table["boundary_edges"] == 0
+    table["volume"] = table["volume"].abs().where(table["closed"])
+
+    bins = np.digitize(triangles["quality"], QUALITY_BINS[1:-1])
+    histogram = pd.crosstab(triangles[key], bins).reindex(
+        columns=range(len(QUALITY_BINS) - 1), fill_value=0
+    )
+    histogram.columns = _quality_columns()
+
+    return table.drop(columns="boundary_edges").join(histogram)
+
+
+def enclosed_statistics(
+    surfaces: Sequence[Surface],
+    closed: np.ndarray,
+    block_model: BlockModel,
+    data: Sequence[FloatData],
+) -> pd.DataFrame:
+    """
+    Statistics of block model data within closed surfaces.
+
+    :param surfaces: Surfaces to measure.
+    :param closed: Whether each surface is closed; open surfaces get no
+        statistics.
+    :param block_model: Block model holding the data.
+    :param data: Cell data of the block model.
+
+    :return: Number of blocks and count, mean, minimum, maximum and sum of
+        each data within each surface.
+    """
+    values = np.zeros((block_model.n_cells, len(data)))
+    for index, datum in enumerate(data):
+        if datum.values is None or datum.values.shape[0] != block_model.n_cells:
+            raise ValueError(f"Data '{datum.name}' is not on the block model.")
+        values[:, index] = datum.values
+
+    rows = []
+    for surface, is_closed in zip(surfaces, closed):
+        row: dict[str, float] = {"blocks": np.nan}
+        if is_closed:
+            inside = values[inside_block_model(block_model, surface)]
+            row["blocks"] = inside.shape[0]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                for datum, column in zip(data, inside.T):
+                    row.update(
+                        {
+                            f"{datum.name}_count": np.count_nonzero(~np.isnan(column)),
+                            f"{datum.name}_mean": np.nanmean(column),
+                            f"{datum.name}_min": np.nanmin(column, initial=np.inf),
+                            f"{datum.name}_max": np.nanmax(column, initial=-np.inf),
+                            f"{datum.name}_sum": np.nansum(column),
+                        }
+                    )
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def surface_report(
+    surfaces: Sequence[Surface],
+    block_model: BlockModel | None = None,
+    data: Sequence[FloatData] = (),
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Tables of metrics of surfaces and of their connected components.
+
+    Volumes are only reported for closed surfaces and components.
+
+    :param surfaces: Surfaces to measure.
+    :param block_model: Block model to compute statistics of enclosed
+        blocks on.
+    :param data: Cell data of the block model.
+
+    :return: Surface table, one row per surface, and component table, one
+        row per connected component.
+    """
+    if not surfaces:
+        raise ValueError("At least one surface must be provided.")
+
+    triangles, points = triangle_table(surfaces)
+    names = pd.DataFrame(
+        {"name": [surface.name for surface in surfaces]},
+        index=pd.RangeIndex(len(surfaces), name="surface"),
+    )
+    names["uid"] = [str(surface.uid) for surface in surfaces]
+    extent = points.groupby("surface").agg(
+        x_min=("x", "min"),
+        y_min=("y", "min"),
+        z_min=("z", "min"),
+        x_max=("x", "max"),
+        y_max=("y", "max"),
+        z_max=("z", "max"),
+    )
+    table = names.join(_summarize(triangles, "surface")).join(extent)
+    table["n_components"] = triangles.groupby("surface")["component"].nunique()
+
+    if block_model is not None:
+        statistics = enclosed_statistics(
+            surfaces, table["closed"].to_numpy(), block_model, data
+        )
+        table = table.join(statistics.set_index(table.index))
+
+    components = _summarize(triangles, "component")
+    components.insert(0, "surface", triangles.groupby("component")["surface"].first())
+    components.insert(1, "name", names["name"].to_numpy()[components["surface"]])
+    components.index = pd.Index(
+        components.groupby("surface").cumcount().to_numpy(), name="component"
+    )
+
+    return table.reset_index(), components.reset_index()
+
+
+def write_table(table: pd.DataFrame, path: Path, output_format: str = "CSV") -> Path:
+    """
+    Write a table to file.
+
+    Parquet requires pyarrow; tables are written as CSV if it is missing.
+
+    :param table: Table to write.
+    :param path: Output path, without extension.
+    :param output_format: 'CSV' or 'Parquet'.
+
+    :return: Path of the file written.
+    """
+    if output_format not in ("CSV", "Parquet"):
+        raise ValueError(f"Output format must be 'CSV' or 'Parquet'. {output_format}")
+
+    if output_format == "Parquet":
+        if find_spec("pyarrow") is not None:
+            table.to_parquet(path.with_suffix(".parquet"), index=False)
+            return path.with_suffix(".parquet")
+        warnings.warn("Parquet output requires pyarrow; writing CSV instead.")
+
+    table.to_csv(path.with_suffix(".csv"), index=False)
+    return path.with_suffix(".csv")
+
+
+@dataclass(slots=True, kw_only=True)
+class ReportParams(BaseParams):
+    """Parameters of the surface report command."""
+
+    group: ContainerGroup
+    block_model: BlockModel | None = None
+    data: list[FloatData] | None = None
+    output_format: str = "CSV"
+    export_as: str = "Surface report"
+
+
+class ReportDriver(BaseDriver):
+    """Report surface metrics from ui.json parameters."""
+
+    ui_json = "report"
+    params_class = ReportParams
+    params: ReportParams
+
+    def run(self) -> list[FilenameData]:
+        params = self.params
+        surfaces = [
+            child for child in params.group.children if isinstance(child, Surface)
+        ]
+        tables = surface_report(
+            surfaces,
+            block_model=params.block_model,
+            data=params.data or [],
+        )
+
+        folder = Path(params.group.workspace.h5file).parent
+        files = []
+        for table, suffix in zip(tables, ("surfaces", "components")):
+            path = write_table(
+                table, folder / f"{params.export_as}_{suffix}", params.output_format
+            )
+            files.append(params.group.add_file(path))
+
+        return files
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    ReportDriver.start(sys.argv[1])
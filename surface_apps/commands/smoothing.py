@@ -0,0 +1,108 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from geoh5py.data import FloatData
+from geoh5py.objects import Surface
+
+from surface_apps.driver import BaseDriver, BaseParams
+from surface_apps.mesh.smoothing import laplacian_smoothing, taubin_smoothing
+from surface_apps.output import load_surface
+
+
+def smooth_surface(  # pylint: disable=too-many-arguments
+    surface: Surface,
+    method: str = "Taubin",
+    iterations: int = 10,
+    factor: float = 0.5,
+    weights: FloatData | None = None,
+    fix_boundary: bool = True,
+    name: str | None = None,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+) -> Surface:
+    """
+    Create a smoothed copy of a surface.
+
+    :param surface: Surface to smooth.
+    :param method: Smoothing method, 'Laplacian' or 'Taubin'.
+    :param iterations: Number of iterations.
+    :param factor: Step factor between 0 and 1.
+    :param weights: Vertex data of feature-preserving weights, between 0
+        (fixed) and 1 (free).
+    :param fix_boundary: Keep vertices on open boundaries in place.
+    :param name: Name of the output surface.
+    :param compact: Smooth float32 offsets from a local origin.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Smoothed copy of the surface, with its data.
+    """
+    methods = {"Laplacian": laplacian_smoothing, "Taubin": taubin_smoothing}
+    if method not in methods:
+        raise ValueError(f"Smoothing method must be one of {list(methods)}.")
+
+    origin, vertices, cells = load_surface(surface, compact, tolerance)
+    vertices = methods[method](
+        vertices,
+        cells,
+        iterations=iterations,
+        factor=factor,
+        weights=None if weights is None else weights.values,
+        fix_boundary=fix_boundary,
+    )
+
+    return surface.copy(
+        vertices=origin + vertices.astype(np.float64),
+        name=name or f"{surface.name}_smoothed",
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class SmoothingParams(BaseParams):
+    """Parameters of the surface smoothing command."""
+
+    surface: Surface
+    method: str = "Taubin"
+    iterations: int = 10
+    factor: float = 0.5
+    weights: FloatData | None = None
+    fix_boundary: bool = True
+    export_as: str = "Smoothed"
+    compact: bool = False
+    tolerance: float = 1e-3
+
+
+class SmoothingDriver(BaseDriver):
+    """Smooth a surface from ui.json parameters."""
+
+    ui_json = "smoothing"
+    params_class = SmoothingParams
+    params: SmoothingParams
+
+    def run(self) -> Surface:
+        return smooth_surface(
+            self.params.surface,
+            method=self.params.method,
+            iterations=self.params.iterations,
+            factor=self.params.factor,
+            weights=self.params.weights,
+            fix_boundary=self.params.fix_boundary,
+            name=self.params.export_as,
+            compact=self.params.compact,
+            tolerance=self.params.tolerance,
+        )
+
+
+if __name__ == "__main__":
+    assert len(sys.argv) > 1, "No input file provided"
+    SmoothingDriver.start(sys.argv[1])
@@ -0,0 +1,315 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from geoh5py.groups import DrillholeGroup
+from geoh5py.objects import Drillhole
+from geoh5py.shared.concatenation import Concatenator
+
+from surface_apps.checkpoint import Checkpoint
+
+
+def directions(azimuths: np.ndarray, dips: np.ndarray) -> np.ndarray:
+    """
+    Unit vectors along drillholes.
+
+    :param azimuths: Azimuths clockwise from north, in degrees.
+    :param dips: Dips from horizontal, in degrees, negative downward.
+
+    :return: Directions, shape (n, 3).
+    """
+    azimuths, dips = np.radians(azimuths), np.radians(dips)
+
+    return np.c_[
+        np.cos(dips) * np.sin(azimuths), np.cos(dips) * np.cos(azimuths), np.sin(dips)
+    ]
+
+
+def _arc_offsets(
+    starts: np.ndarray, ends: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Chords of circular arcs between unit directions, with their doglegs.
+    """
+    cosine = np.clip(np.einsum("ij,ij->i", starts, ends), -1.0, 1.0)
+    dogleg = np.arccos(cosine)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(dogleg > 1e-9, 2.0 / dogleg * np.tan(dogleg / 2.0), 1.0)
+
+    return lengths[:, None] / 2.0 * (starts + ends) * ratio[:, None], dogleg
+
+
+class Desurvey:
+    """
+    Minimum-curvature paths of many drillholes, stored as flat arrays.
+
+    Stations of all holes are concatenated, with ``offsets`` marking the
+    first station of each hole, so that locations of any number of depths
+    on any holes are computed in one vectorized pass.
+
+    :param collars: Collar locations, shape (n_holes, 3).
+    :param offsets: Index of the first station of each hole, followed by
+        the total number of stations, shape (n_holes + 1,).
+    :param depths: Measured depths of the stations, increasing per hole,
+        starting at 0.
+    :param tangents: Unit directions at the stations, shape (n_stations, 3).
+    :param positions: Locations of the stations, shape (n_stations, 3).
+    """
+
+    def __init__(
+        self,
+        collars: np.ndarray,
+        offsets: np.ndarray,
+        depths: np.ndarray,
+        tangents: np.ndarray,
+        positions: np.ndarray,
+    ):
+        self.collars = collars
+        self.offsets = offsets
+        self.depths = depths
+        self.tangents = tangents
+        self.positions = positions
+
+    @classmethod
+    def from_surveys(
+        cls, collars: np.ndarray, surveys: Sequence[np.ndarray]
+    ) -> Desurvey:
+        """
+        Desurvey drillholes by the minimum curvature method.
+
+        A station at depth 0 is added to holes whose first survey is deeper,
+        with the orientation of that survey.
+
+        :param collars: Collar locations, shape (n_holes, 3).
+        :param surveys: Depth, azimuth and dip of the surveys of each hole,
+            shape (n_surveys, 3).
+        """
+        surveys = [
+            np.r_[survey[:1] * [0.0, 1.0, 1.0], survey] if survey[0, 0] > 0 else survey
+            for survey in surveys
+        ]
+        counts = np.array([survey.shape[0] for survey in surveys])
+        offsets = np.r_[0, np.cumsum(counts)]
+        stations = np.vstack(surveys).astype(np.float64)
+        tangents = directions(stations[:, 1], stations[:, 2])
+
+        # Chords from each station to the next, zero at the first of each hole
+        chords = np.zeros_like(tangents)
+        chords[1:], _ = _arc_offsets(
+            tangents[:-1], tangents[1:], np.diff(stations[:, 0])
+        )
+        chords[offsets[:-1]] = 0.0
+        cumulative = np.cumsum(chords, axis=0)
+        positions = np.repeat(collars, counts, axis=0) + (
+            cumulative - np.repeat(cumulative[offsets[:-1]], counts, axis=0)
+        )
+
+        return cls(collars, offsets, stations[:, 0], tangents, positions)
+
+    @property
+    def n_holes(self) -> int:
+        """Number of drillholes."""
+        return self.collars.shape[0]
+
+    def locations(self, holes: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        """
+        Locations at measured depths along drillholes.
+
+        Depths between two stations are placed on the circular arc joining
+        them, and depths beyond the last station are extended along its
+        direction.
+
+        :param holes: Index of the drillhole of each depth.
+        :param depths: Measured depths.
+
+        :return: Locations, shape (n_depths, 3).
+        """
+        holes = np.asarray(holes, dtype=np.int64)
+        depths = np.asarray(depths, dtype=np.float64)
+        # Deepest station at or above each depth, within its hole
+        first, last = self.offsets[holes], self.offsets[holes + 1] - 1
+        station = first + _count_below(self.depths, self.offsets, holes, depths) - 1
+        station = np.clip(station, first, last)
+        following = np.minimum(station + 1, last)
+
+        start, end = self.depths[station], self.depths[following]
+        beyond = following == station
+        span = np.where(beyond, 1.0, end - start)
+        fraction = np.clip((depths - start) / span, 0.0, None)
+        _, dogleg = _arc_offsets(
+            self.tangents[station], self.tangents[following], np.ones_like(start)
+        )
+
+        # Direction at the depth, spherically interpolated along the arc
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sine = np.sin(dogleg)
+            weight_start = np.where(
+                sine > 1e-9, np.sin((1.0 - fraction) * dogleg) / sine, 1.0 - fraction
+            )
+            weight_end = np.where(
+                sine > 1e-9, np.sin(fraction * dogleg) / sine, fraction
+            )
+        tangent = np.where(
+            beyond[:, None],
+            self.tangents[station],
+            weight_start[:, None] * self.tangents[station]
+            + weight_end[:, None] * self.tangents[following],
+        )
+        tangent /= np.linalg.norm(tangent, axis=1)[:, None]
+        chord, _ = _arc_offsets(self.tangents[station], tangent, depths - start)
+
+        return self.positions[station] + chord
+
+
+def _count_below(
+    station_depths: np.ndarray,
+    offsets: np.ndarray,
+    holes: np.ndarray,
+    depths: np.ndarray,
+) -> np.ndarray:
+    """Number of stations of each hole at or above each depth."""
+    # Shift each hole by a multiple of the deepest depth to search all at once
+    shift = max(
+        float(np.abs(station_depths).max(initial=0.0)),
+        float(np.abs(depths).max(initial=0.0)),
+    )
+    shift = 2.0 * shift + 1.0
+    hole_of_station = np.repeat(np.arange(offsets.shape[0] - 1), np.diff(offsets))
+    keys = station_depths + hole_of_station * shift
+    position = np.searchsorted(keys, depths + holes * shift, side="right")
+
+    return position - offsets[holes]
+
+
+def concatenated_column(
+    group: Concatenator, field: str
+) -> tuple[np.ndarray, dict[bytes, slice]]:
+    """
+    Values of a field of all drillholes of a concatenated group.
+
+    The field is read from the geoh5 in one call, without loading the other
+    fields of the group, and sliced per drillhole with the group index.
+
+    :param group: Drillhole group storing the data of its drillholes.
+    :param field: Name of the field, e.g. 'Surveys' or a data name.
+
+    :return: Concatenated values, empty if the field does not exist, and
+        the slice of each drillhole, by its identifier as stored in the
+        index, e.g. b'{...}'.
+    """
+    fetched = group.workspace.fetch_concatenated_values(group, field)
+    if fetched is None:
+        return np.zeros(0), {}
+
+    values, index = fetched
+    return values, {
+        uid: slice(start, start + size)
+        for start, size, uid in zip(
+            index["Start index"], index["Size"], index["Object ID"]
+        )
+    }
+
+
+def group_surveys(group: DrillholeGroup, holes: Sequence[Drillhole]) -> list:
+    """
+    Surveys of the drillholes of a group, read at once when the group
+    concatenates them.
+
+    :param group: Drillhole group.
+    :param holes: Drillholes of the group.
+
+    :return: Depth, azimuth and dip of the surveys of each hole, shape
+        (n_surveys, 3).
+    """
+    if not isinstance(group, Concatenator):
+        return [hole.surveys for hole in holes]
+
+    values, slices = concatenated_column(group, "Surveys")
+    if values.size:
+        values = np.c_[values["Depth"], values["Azimuth"], values["Dip"]]
+    values = values.astype(np.float64)
+
+    # Holes without surveys are vertical, as in geoh5py
+    return [
+        values[slices[key]] if key in slices else np.c_[0.0, 0.0, -90.0]
+        for key in (f"{{{hole.uid}}}".encode() for hole in holes)
+    ]
+
+
+def survey_key(
+    holes: Sequence[Drillhole], collars: np.ndarray, surveys: Sequence[np.ndarray]
+) -> str:
+    """
+    Hash of the identifiers, collars and surveys of drillholes.
+
+    :param holes: Drillholes, in order.
+    :param collars: Collar locations, shape (n_holes, 3).
+    :param surveys: Surveys of each hole, shape (n_surveys, 3).
+
+    :return: Short hexadecimal digest.
+    """
+    digest = hashlib.sha1()
+    for hole, collar, survey in zip(holes, collars, surveys):
+        digest.update(hole.uid.bytes)
+        digest.update(np.ascontiguousarray(collar, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(survey, dtype=np.float64).tobytes())
+
+    return digest.hexdigest()[:16]
+
+
+def desurvey_group(
+    group: DrillholeGroup, cache: bool = True
+) -> tuple[list[Drillhole], Desurvey]:
+    """
+    Desurvey all drillholes of a group, reusing the result of a previous
+    run while their collars and surveys are unchanged.
+
+    The surveys of all holes are read in one call and hashed, and the paths
+    are cached in a :class:`~surface_apps.checkpoint.Checkpoint` folder
+    next to the geoh5, one unit per group, keyed by the hash. On a miss the
+    same surveys are desurveyed, without reading them again.
+
+    :param group: Drillhole group.
+    :param cache: Read and write the cache.
+
+    :return: Drillholes of the group and their paths, in the same order.
+    """
+    holes = [child for child in group.children if isinstance(child, Drillhole)]
+    if not holes:
+        raise ValueError(f"Group '{group.name}' has no drillholes.")
+
+    collars = np.array([hole.collar.tolist() for hole in holes], dtype=np.float64)
+    surveys = group_surveys(group, holes)
+    h5file = Path(group.workspace.h5file)
+    store = Checkpoint(h5file.parent / f"{h5file.stem}.desurvey{Checkpoint.suffix}")
+    unit = f"{group.uid}_{survey_key(holes, collars, surveys)}"
+    if cache and unit in store:
+        content = store.load(unit)
+        return holes, Desurvey(**content)
+
+    paths = Desurvey.from_surveys(collars, surveys)
+    if cache:
+        for stale in store.completed:
+            if stale.startswith(str(group.uid)):
+                (store.path / f"{stale}.npz").unlink()
+        store.save(
+            unit,
+            collars=paths.collars,
+            offsets=paths.offsets,
+            depths=paths.depths,
+            tangents=paths.tangents,
+            positions=paths.positions,
+        )
+
+    return holes, paths
@@ -0,0 +1,281 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import json
+import sys
+import types
+import typing
+from abc import ABC, abstractmethod
+from copy import deepcopy
+from dataclasses import MISSING, dataclass, fields
+from functools import lru_cache
+from importlib import import_module
+from pathlib import Path
+from typing import Any, ClassVar
+
+from geoh5py.ui_json import InputFile
+from geoh5py.workspace import Workspace
+
+from surface_apps import assets_path
+from surface_apps.schema import read_ui_json, template_path
+
+
+@lru_cache
+def ui_json_template(name: str) -> dict[str, Any]:
+    """
+    Parsed ui.json template from the assets, read once per process.
+
+    Callers get the shared dictionary and must copy it before modifying.
+
+    :param name: Template name, without the '.ui.json' extension.
+    """
+    with open(template_path(name), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def template_names() -> list[str]:
+    """Names of the ui.json templates shipped in the assets."""
+    return sorted(
+        path.name.removesuffix(".ui.json")
+        for path in (assets_path() / "uijson").glob("*.ui.json")
+    )
+
+
+def _options(annotation: Any) -> tuple[Any, ...]:
+    """Members of a union annotation, or the annotation itself."""
+    if (
+        isinstance(annotation, types.UnionType)
+        or typing.get_origin(annotation) is typing.Union
+    ):
+        return typing.get_args(annotation)
+
+    return (annotation,)
+
+
+def _check_type(name: str, value: Any, annotation: Any) -> Any:
+    """
+    Validate a value against a type annotation, promoting int to float.
+
+    Elements of lists are validated against the type of ``list[...]``
+    annotations.
+    """
+    options = _options(annotation)
+    error = None
+    for option in options:
+        if option is Any:
+            return value
+
+        if not isinstance(value, typing.get_origin(option) or option):
+            continue
+
+        items = typing.get_args(option)
+        if typing.get_origin(option) is not list or not items:
+            return value
+
+        try:
+            return [
+                _check_type(f"{name}[{index}]", item, items[0])
+                for index, item in enumerate(value)
+            ]
+        except TypeError as exception:
+            error = exception
+
+    if error is not None:
+        raise error
+
+    classes = tuple(typing.get_origin(option) or option for option in options)
+    if float in classes and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+
+    raise TypeError(
+        f"Parameter '{name}' must be of type "
+        f"{' | '.join(getattr(cls, '__name__', str(cls)) for cls in classes)}. "
+        f"Value of type {type(value).__name__} provided."
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class BaseParams:
+    """
+    Typed parameters of a command, validated from ui.json data.
+
+    Sub-classes declare one field per ui.json parameter used by the
+    command; other ui.json members are ignored.
+    """
+
+    geoh5: Workspace | None = None
+    title: str = ""
+    run_command: str = ""
+
+    @classmethod
+    def build(cls, data: dict[str, Any]) -> BaseParams:
+        """
+        Validate ui.json data into a parameters object.
+
+        Parameters set to None, e.g. by a disabled optional form, keep
+        their default unless their annotation allows None.
+
+        :param data: Flat dictionary of promoted ui.json values.
+
+        :raises ValueError: If a required parameter is missing.
+        :raises TypeError: If a parameter has the wrong type.
+        """
+        hints = typing.get_type_hints(cls)
+        kwargs = {}
+        for field in fields(cls):
+            if field.name not in data:
+                continue
+
+            value = data[field.name]
+            if value is None and field.name in cls.required():
+                raise ValueError(f"Parameter '{field.name}' is required.")
+
+            # Disabled optional parameters are None, keep the default unless
+            # None is a valid value
+            if value is None and type(None) not in _options(hints[field.name]):
+                continue
+
+            kwargs[field.name] = _check_type(field.name, value, hints[field.name])
+
+        missing = set(cls.required()) - set(kwargs)
+        if missing:
+            raise ValueError(f"Missing required parameters: {sorted(missing)}.")
+
+        return cls(**kwargs)
+
+    @classmethod
+    def required(cls) -> tuple[str, ...]:
+        """Names of the parameters without default value."""
+        return tuple(
+            field.name
+            for field in fields(cls)
+            if field.default is MISSING and field.default_factory is MISSING
+        )
+
+
+class BaseDriver(ABC):
+    """
+    Base class of the commands driven by a ui.json file.
+
+    Concrete drivers register themselves under the name of their ui.json
+    template in the assets, and are run with :meth:`start`.
+
+    :param params: Validated parameters of the command.
+    :param input_file: Input file the parameters were read from, if any.
+    """
+
+    registry: ClassVar[dict[str, type[BaseDriver]]] = {}
+    params_class: ClassVar[type[BaseParams]] = BaseParams
+    ui_json: ClassVar[str]
+    """Name of the ui.json template of the command in the assets."""
+
+    def __init__(self, params: BaseParams, input_file: InputFile | None = None):
+        if not isinstance(params, self.params_class):
+            raise TypeError(f"Parameters must be of type {self.params_class.__name__}.")
+        self.params = params
+        self.input_file = input_file
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Drivers of a module run as a script are not registered, so that the
+        # registry always refers to the importable classes
+        if getattr(cls, "ui_json", None) is not None and cls.__module__ != "__main__":
+            BaseDriver.registry[cls.ui_json] = cls
+
+    @abstractmethod
+    def run(self) -> Any:
+        """Run the command."""
+
+    @classmethod
+    def template(cls) -> dict[str, Any]:
+        """Copy of the ui.json template of the command."""
+        return deepcopy(ui_json_template(cls.ui_json))
+
+    @classmethod
+    def start(cls, file_path: str | Path) -> Any:
+        """
+        Parse a ui.json file once, with the compiled schema of the template
+        of the command, validate its parameters and run the
+        command with the workspace open for writing.
+
+        :param file_path: Path to the ui.json file.
+
+        :return: Output of :meth:`run`.
+        """
+        ifile = read_ui_json(file_path, cls.ui_json)
+        params = cls.params_class.build(ifile.data or {})
+        driver = cls(params, input_file=ifile)
+
+        if params.geoh5 is None:
+            return driver.run()
+
+        with params.geoh5.open(mode="r+"):
+            return driver.run()
+
+
+def load_drivers() -> dict[str, type[BaseDriver]]:
+    """
+    Import the command of every ui.json template in the assets, registering
+    their drivers.
+
+    :return: Registered drivers by template name.
+    """
+    for name in template_names():
+        if name not in BaseDriver.registry:
+            import_module(ui_json_template(name)["run_command"])
+
+    return BaseDriver.registry
+
+
+def get_driver(name: str) -> type[BaseDriver]:
+    """
+    Driver registered under a ui.json template name.
+
+    :param name: Template name, or the run_command of the template.
+    """
+    drivers = load_drivers()
+    if name in drivers:
+        return drivers[name]
+
+    for driver in drivers.values():
+        if ui_json_template(driver.ui_json)["run_command"] == name:
+            return driver
+
+    raise KeyError(f"No command registered for '{name}'.")
+
+
+def run(file_paths: list[str | Path]) -> list[Any]:
+    """
+    Run a batch of ui.json files in a single process, each with the driver
+    of its run_command.
+
+    :param file_paths: Paths to the ui.json files.
+
+    :return: Outputs of the drivers.
+    """
+    outputs = []
+    for file_path in file_paths:
+        with open(file_path, encoding="utf-8") as file:
+            run_command = json.load(file)["run_command"]
+
+        outputs.append(get_driver(run_command).start(file_path))
+
+    return outputs
+
+
+def main(argv: list[str] | None = None):  # pragma: no cover
+    """Command line entry point running ui.json files."""
+    file_paths = (sys.argv[1:] if argv is None else argv) or []
+    assert len(file_paths) > 0, "No input file provided"
+    run(file_paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import ctypes
+import sys
+from collections.abc import Callable
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any
+
+GIB = 1024**3
+
+# Memory assumed available when it cannot be read from the system
+DEFAULT_AVAILABLE = 2 * GIB
+
+
+def _meminfo_available(path: Path = Path("/proc/meminfo")) -> int | None:
+    """Available memory reported by the Linux kernel, in bytes."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return None
+
+
+class _MemoryStatus(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    """MEMORYSTATUSEX structure filled by GlobalMemoryStatusEx."""
+
+    _fields_ = [
+        ("dwLength", ctypes.c_ulong),
+        ("dwMemoryLoad", ctypes.c_ulong),
+        ("ullTotalPhys", ctypes.c_ulonglong),
+        ("ullAvailPhys", ctypes.c_ulonglong),
+        ("ullTotalPageFile", ctypes.c_ulonglong),
+        ("ullAvailPageFile", ctypes.c_ulonglong),
+        ("ullTotalVirtual", ctypes.c_ulonglong),
+        ("ullAvailVirtual", ctypes.c_ulonglong),
+        ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+    ]
+
+
+def _windows_available(kernel32: Any = None) -> int | None:
+    """
+    Available physical memory reported by Windows, in bytes.
+
+    :param kernel32: Library providing GlobalMemoryStatusEx, kernel32.dll if
+        None.
+    """
+    try:
+        if kernel32 is None:
+            kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        status = _MemoryStatus()
+        status.dwLength = ctypes.sizeof(_MemoryStatus)
+        if not kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+    except (AttributeError, OSError):
+        return None
+
+    return int(status.ullAvailPhys) or None
+
+
+def available_memory() -> int:
+    """
+    Memory available to new allocations without swapping, in bytes.
+
+    Read with psutil if it is installed, from GlobalMemoryStatusEx on
+    Windows or /proc/meminfo elsewhere otherwise, and
+    :data:`DEFAULT_AVAILABLE` if none is available.
+    """
+    if find_spec("psutil") is not None:
+        import psutil  # pylint: disable=import-outside-toplevel
+
+        return int(psutil.virtual_memory().available)
+
+    if sys.platform == "win32":
+        return _windows_available() or DEFAULT_AVAILABLE
+
+    return _meminfo_available() or DEFAULT_AVAILABLE
+
+
+class MemoryBudget:
+    """
+    Memory allowed to the working arrays of a command, to size its chunks.
+
+    Commands estimate the footprint of one item of work, e.g. a point or a
+    realization, and get the number of items per chunk that fits the
+    budget. Chunks run with :meth:`process` are halved and retried when
+    they still run out of memory.
+
+    :param limit: Cap on the budget, in GiB, 0 for no cap.
+    :param fraction: Fraction of the available memory used.
+    """
+
+    def __init__(self, limit: float = 0.0, fraction: float = 0.5):
+        if limit < 0:
+            raise ValueError(f"Memory limit must be positive. {limit} provided.")
+        if not 0.0 < fraction <= 1.0:
+            raise ValueError(f"Memory fraction must be in (0, 1]. {fraction}")
+
+        self.limit = limit
+        self.fraction = fraction
+        self._bytes: int | None = None
+
+    @property
+    def bytes(self) -> int:
+        """Budget in bytes, read from the system on first access."""
+        if self._bytes is None:
+            budget = int(available_memory() * self.fraction)
+            if self.limit > 0:
+                budget = min(budget, int(self.limit * GIB))
+            self._bytes = budget
+
+        return self._bytes
+
+    def chunk_size(
+        self, item_bytes: float, minimum: int = 1, maximum: int | None = None
+    ) -> int:
+        """
+        Number of items per chunk fitting the budget.
+
+        :param item_bytes: Estimated peak memory of one item, in bytes.
+        :param minimum: Smallest chunk, used even if it exceeds the budget.
+        :param maximum: Largest chunk, e.g. the number of items.
+        """
+        size = max(int(self.bytes // max(item_bytes, 1.0)), minimum)
+        if maximum is not None:
+            size = max(min(size, maximum), minimum)
+
+        return size
+
+    def process(
+        self,
+        function: Callable[[int, int], Any],
+        n_items: int,
+        item_bytes: float,
+        chunk_size: int | None = None,
+        minimum: int = 1,
+    ):
+        """
+        Run a function over consecutive chunks of items, halving the chunks
+        whenever one runs out of memory.
+
+        The function is called again on the same items after a
+        :class:`MemoryError`, so it must only write its own chunk of the
+        outputs.
+
+        :param function: Function of the start and stop of a chunk.
+        :param n_items: Number of items.
+        :param item_bytes: Estimated peak memory of one item, in bytes.
+        :param chunk_size: Initial number of items per chunk, sized by the
+            budget if None.
+        :param minimum: Smallest chunk; running out of memory on it raises.
+        """
+        size = chunk_size or self.chunk_size(item_bytes, minimum, max(n_items, 1))
+        start = 0
+        while start < n_items:
+            stop = min(start + size, n_items)
+            try:
+                function(start, stop)
+            except MemoryError:
+                if stop - start <= minimum:
+                    raise
+                size = max((stop - start) // 2, minimum)
+                continue
+            start = stop
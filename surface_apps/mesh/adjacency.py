@@ -0,0 +1,287 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def edge_table(cells: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Unique undirected edges of a triangulation.
+
+    :param cells: Array of triangles, shape (n_cells, 3).
+
+    :return: Unique edges sorted by vertex indices, shape (n_edges, 2), the
+        index of the unique edge for each of the (n_cells * 3) cell edges,
+        ordered as (v0, v1), (v1, v2), (v2, v0) per cell, and
+        the number of cells sharing each edge.
+    """
+    half_edges = np.sort(
+        np.stack([cells, np.roll(cells, -1, axis=1)], axis=2).reshape((-1, 2)),
+        axis=1,
+    ).astype(np.int64)
+    n_vertices = int(half_edges.max(initial=0)) + 1
+    keys, inverse, counts = np.unique(
+        half_edges[:, 0] * n_vertices + half_edges[:, 1],
+        return_inverse=True,
+        return_counts=True,
+    )
+    edges = np.c_[keys // n_vertices, keys % n_vertices]
+
+    return edges, inverse.ravel(), counts
+
+
+def vertex_adjacency(cells: np.ndarray, n_vertices: int) -> csr_matrix:
+    """
+    Symmetric vertex adjacency matrix of a triangulation.
+
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param n_vertices: Number of vertices.
+
+    :return: Sparse matrix with ones where two vertices share an edge.
+    """
+    return MeshTopology(cells, n_vertices).vertex_adjacency
+
+
+def boundary_vertices(cells: np.ndarray, n_vertices: int) -> np.ndarray:
+    """
+    Flag vertices lying on an open boundary, i.e. on an edge used by a
+    single cell.
+
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param n_vertices: Number of vertices.
+
+    :return: Boolean array of shape (n_vertices,).
+    """
+    return MeshTopology(cells, n_vertices).boundary_vertices
+
+
+def _gather(
+    pointers: np.ndarray, values: np.ndarray, queries: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pairs of (query index, value) of the rows of a CSR layout."""
+    counts = pointers[queries + 1] - pointers[queries]
+    owner = np.repeat(np.arange(queries.shape[0]), counts)
+    offsets = np.arange(owner.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return owner, values[np.repeat(pointers[queries], counts) + offsets]
+
+
+class MeshTopology:
+    """
+    Array-backed connectivity of a triangulation.
+
+    The edge table is built once by sorting edge keys, in O(n log n), and
+    the other relations are derived from it on first access, so that
+    algorithms share the same arrays instead of rebuilding adjacency.
+    Half-edge ``3 * t + k`` goes from corner k to corner k + 1 of cell t.
+
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param n_vertices: Number of vertices, at least one more than the
+        largest index of the cells.
+    """
+
+    def __init__(self, cells: np.ndarray, n_vertices: int | None = None):
+        self.cells = np.asarray(cells).astype(np.int64, copy=False)
+        self.n_vertices = (
+            int(self.cells.max(initial=-1)) + 1 if n_vertices is None else n_vertices
+        )
+        self.edges, inverse, self.counts = edge_table(self.cells)
+        self.cell_edges = inverse.reshape((-1, 3))
+        self._vertex_adjacency: csr_matrix | None = None
+        self._vertex_cells: tuple[np.ndarray, np.ndarray] | None = None
+        self._edge_cells: np.ndarray | None = None
+        self._twins: np.ndarray | None = None
+
+    @property
+    def n_cells(self) -> int:
+        """Number of triangles."""
+        return self.cells.shape[0]
+
+    @property
+    def boundary_edges(self) -> np.ndarray:
+        """Flag edges used by a single cell, shape (n_edges,)."""
+        return self.counts == 1
+
+    @property
+    def boundary_vertices(self) -> np.ndarray:
+        """Flag vertices on an open boundary, shape (n_vertices,)."""
+        boundary = np.zeros(self.n_vertices, dtype=bool)
+        boundary[self.edges[self.boundary_edges].ravel()] = True
+
+        return boundary
+
+    @property
+    def valence(self) -> np.ndarray:
+        """Number of edges at each vertex, shape (n_vertices,)."""
+        return np.bincount(self.edges.ravel(), minlength=self.n_vertices)
+
+    @property
+    def vertex_adjacency(self) -> csr_matrix:
+        """Symmetric sparse matrix with ones where two vertices share an edge."""
+        if self._vertex_adjacency is None:
+            rows = np.r_[self.edges[:, 0], self.edges[:, 1]]
+            cols = np.r_[self.edges[:, 1], self.edges[:, 0]]
+            self._vertex_adjacency = csr_matrix(
+                (np.ones(rows.shape[0]), (rows, cols)),
+                shape=(self.n_vertices, self.n_vertices),
+            )
+
+        return self._vertex_adjacency
+
+    @property
+    def triangle_adjacency(self) -> csr_matrix:
+        """Sparse matrix of the triangles sharing an edge, shape (n_cells, n_cells)."""
+        incidence = csr_matrix(
+            (
+                np.ones(3 * self.n_cells),
+                (np.repeat(np.arange(self.n_cells), 3), self.cell_edges.ravel()),
+            ),
+            shape=(self.n_cells, self.edges.shape[0]),
+        )
+
+        return csr_matrix(incidence @ incidence.T)
+
+    @property
+    def edge_cells(self) -> np.ndarray:
+        """
+        First two cells sharing each edge, -1 where missing, shape
+        (n_edges, 2).
+        """
+        if self._edge_cells is None:
+            order = np.argsort(self.cell_edges.ravel(), kind="stable")
+            first = np.r_[0, np.cumsum(self.counts)[:-1]]
+            second = np.minimum(first + 1, order.shape[0] - 1)
+            self._edge_cells = np.c_[
+                order[first] // 3, np.where(self.counts > 1, order[second] // 3, -1)
+            ]
+
+        return self._edge_cells
+
+    @property
+    def twins(self) -> np.ndarray:
+        """
+        Opposite half-edge of each half-edge, -1 on open or non-manifold
+        edges, shape (n_cells * 3,).
+        """
+        if self._twins is None:
+            cells = self.edge_cells[self.cell_edges.ravel()]
+            other = np.where(cells[:, 0] == np.arange(3 * self.n_cells) // 3, 1, 0)
+            twin_cell = cells[np.arange(cells.shape[0]), other]
+            manifold = (self.counts == 2)[self.cell_edges.ravel()] & (twin_cell >= 0)
+            # Position of the edge in the twin cell
+            corner = np.argmax(
+                self.cell_edges[np.maximum(twin_cell, 0)]
+                == self.cell_edges.ravel()[:, None],
+                axis=1,
+            )
+            twins = 3 * np.maximum(twin_cell, 0) + corner
+            # Only opposite half-edges of consistently oriented cells are twins
+            opposite = (
+                self.cells.ravel()[twins] == np.roll(self.cells, -1, axis=1).ravel()
+            )
+            self._twins = np.where(manifold & opposite, twins, -1)
+
+        return self._twins
+
+    def find_edges(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Index of the edges joining pairs of vertices.
+
+        :param starts: First vertices.
+        :param ends: Second vertices, in any order.
+
+        :return: Edge indices, -1 where the vertices do not share an edge.
+        """
+        keys = self.edges[:, 0] * self.n_vertices + self.edges[:, 1]
+        lookup = np.minimum(starts, ends) * self.n_vertices + np.maximum(starts, ends)
+        if keys.shape[0] == 0:
+            return np.full(lookup.shape, -1)
+
+        position = np.minimum(np.searchsorted(keys, lookup), keys.shape[0] - 1)
+
+        return np.where(keys[position] == lookup, position, -1)
+
+    def vertex_cells(self, vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Cells around vertices.
+
+        :param vertices: Indices of the query vertices.
+
+        :return: Pairs of query position and incident cell, grouped by query.
+        """
+        if self._vertex_cells is None:
+            order = np.argsort(self.cells.ravel(), kind="stable")
+            pointers = np.r_[
+                0, np.cumsum(np.bincount(self.cells.ravel(), minlength=self.n_vertices))
+            ]
+            self._vertex_cells = (pointers, order // 3)
+
+        return _gather(*self._vertex_cells, np.asarray(vertices))
+
+    def neighbours(self, vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vertices sharing an edge with query vertices.
+
+        :param vertices: Indices of the query vertices.
+
+        :return: Pairs of query position and neighbour, grouped by query.
+        """
+        adjacency = self.vertex_adjacency
+
+        return _gather(adjacency.indptr, adjacency.indices, np.asarray(vertices))
+
+    def boundary_loops(self) -> list[np.ndarray]:
+        """
+        Vertices of the open boundaries, in the order of their half-edges.
+
+        Loops are followed by pointer jumping, so that all of them are
+        ordered at once in O(n log n). Boundaries are expected to be
+        manifold, with one outgoing boundary half-edge per vertex.
+
+        :return: Vertex indices of each loop, starting from its smallest
+            half-edge.
+        """
+        half = np.flatnonzero(self.boundary_edges[self.cell_edges.ravel()])
+        if half.size == 0:
+            return []
+
+        starts = self.cells.ravel()[half]
+        ends = np.roll(self.cells, -1, axis=1).ravel()[half]
+        order = np.argsort(starts, kind="stable")
+        position = np.minimum(np.searchsorted(starts[order], ends), half.size - 1)
+        following = np.where(
+            starts[order][position] == ends, order[position], np.arange(half.size)
+        )
+
+        n_loops, labels = connected_components(
+            csr_matrix(
+                (np.ones(half.size), (np.arange(half.size), following)),
+                shape=(half.size, half.size),
+            ),
+            directed=False,
+        )
+        # Cut each loop before its first half-edge, then rank by distance to the cut
+        first = np.full(n_loops, half.size)
+        np.minimum.at(first, labels, np.arange(half.size))
+        previous = np.arange(half.size)
+        previous[following] = np.arange(half.size)
+        last = previous[first]
+        following[last] = last
+
+        remaining = (following != np.arange(half.size)).astype(np.int64)
+        for _ in range(int(np.ceil(np.log2(half.size))) + 1):
+            remaining += remaining[following]
+            following = following[following]
+
+        loops = np.lexsort((-remaining, labels))
+
+        return np.split(starts[loops], np.cumsum(np.bincount(labels))[:-1])
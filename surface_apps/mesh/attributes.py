@@ -0,0 +1,158 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+
+from surface_apps.mesh.adjacency import boundary_vertices
+
+
+def _scatter(indices: np.ndarray, weights: np.ndarray, n_vertices: int) -> np.ndarray:
+    """Sum rows of weights, shape (n, 3), into the vertices they belong to."""
+    return np.column_stack(
+        [
+            np.bincount(indices, weights=weights[:, axis], minlength=n_vertices)
+            for axis in range(weights.shape[1])
+        ]
+    )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    length = np.linalg.norm(vectors, axis=1)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(length > 0, vectors / length, 0.0)
+
+
+def face_normals(
+    vertices: np.ndarray, cells: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Unit normals and areas of triangles.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+
+    :return: Normals, shape (n_cells, 3), and areas, shape (n_cells,).
+    """
+    corners = vertices[cells]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = np.linalg.norm(normals, axis=1) / 2.0
+
+    return _normalize(normals), areas
+
+
+def vertex_normals(
+    vertices: np.ndarray, cells: np.ndarray, normals: np.ndarray, areas: np.ndarray
+) -> np.ndarray:
+    """
+    Area-weighted unit normals at the vertices.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param normals: Unit normals of the triangles, shape (n_cells, 3).
+    :param areas: Areas of the triangles, shape (n_cells,).
+    """
+    weighted = np.repeat(normals * areas[:, None], 3, axis=0)
+
+    return _normalize(_scatter(cells.ravel(), weighted, vertices.shape[0]))
+
+
+def dip_and_direction(normals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Dip and dip direction of planes from their normals.
+
+    :param normals: Unit normals, shape (n, 3), pointing up or down.
+
+    :return: Dip from horizontal and dip direction clockwise from north,
+        in degrees.
+    """
+    upward = np.where(normals[:, [2]] < 0, -normals, normals)
+    dip = np.degrees(np.arccos(np.clip(upward[:, 2], -1.0, 1.0)))
+    direction = np.degrees(np.arctan2(upward[:, 0], upward[:, 1])) % 360.0
+
+    return dip, direction
+
+
+def curvatures(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    normals: np.ndarray,
+    areas: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Discrete mean and Gaussian curvatures at the vertices.
+
+    The Gaussian curvature is the angle defect and the mean curvature the
+    cotangent Laplace-Beltrami operator projected on the vertex normal,
+    both over the barycentric area of the vertices (Meyer et al., 2003).
+    Curvatures are positive on convex parts, e.g. 1/r and 1/r**2 on a
+    sphere of radius r with outward normals, and nan on open boundaries.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param normals: Unit normals at the vertices, shape (n_vertices, 3).
+    :param areas: Areas of the triangles, shape (n_cells,).
+
+    :return: Mean and Gaussian curvatures, shape (n_vertices,).
+    """
+    n_vertices = vertices.shape[0]
+    corners = vertices[cells]
+    # Sides leaving each corner, to the next and the previous corners
+    forward = np.roll(corners, -1, axis=1) - corners
+    backward = np.roll(corners, 1, axis=1) - corners
+
+    dot = np.einsum("ijk,ijk->ij", forward, backward)
+    cross = np.linalg.norm(np.cross(forward, backward), axis=2)
+    angles = np.arctan2(cross, dot)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cotangents = np.where(cross > 0, dot / cross, 0.0)
+
+    vertex_areas = np.bincount(
+        cells.ravel(), weights=np.repeat(areas / 3.0, 3), minlength=n_vertices
+    )
+    angle_sums = np.bincount(
+        cells.ravel(), weights=angles.ravel(), minlength=n_vertices
+    )
+
+    # Cotangent at each corner weighs the opposite side, from next to previous
+    start = np.roll(cells, -1, axis=1).ravel()
+    end = np.roll(cells, 1, axis=1).ravel()
+    side = (np.roll(corners, 1, axis=1) - np.roll(corners, -1, axis=1)).reshape((-1, 3))
+    weighted = side * cotangents.reshape((-1, 1))
+    laplacian = _scatter(start, weighted, n_vertices) - _scatter(
+        end, weighted, n_vertices
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        laplacian /= 2.0 * vertex_areas[:, None]
+        mean = -0.5 * np.einsum("ij,ij->i", laplacian, normals)
+        gaussian = (2.0 * np.pi - angle_sums) / vertex_areas
+
+    boundary = boundary_vertices(cells, n_vertices) | (vertex_areas == 0)
+    mean[boundary] = np.nan
+    gaussian[boundary] = np.nan
+
+    return mean, gaussian
+
+
+def triangle_quality(vertices: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """
+    Shape quality of triangles, 4 sqrt(3) area over the sum of squared
+    side lengths: 1 for equilateral triangles and 0 for degenerate ones.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    """
+    corners = vertices[cells]
+    sides = np.roll(corners, -1, axis=1) - corners
+    squared = np.einsum("ijk,ijk->i", sides, sides)
+    doubled_area = np.linalg.norm(np.cross(sides[:, 0], -sides[:, 2]), axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(squared > 0, 2.0 * np.sqrt(3.0) * doubled_area / squared, 0.0)
@@ -0,0 +1,99 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.parallel import tree_sum
+
+
+def label_components(
+    cells: np.ndarray, topology: MeshTopology | None = None
+) -> tuple[int, np.ndarray]:
+    """
+    Label the edge-connected parts of a triangulation.
+
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param topology: Connectivity of the cells, if already built.
+
+    :return: Number of components and the component label of each cell.
+    """
+    topology = topology or MeshTopology(cells)
+
+    return connected_components(topology.triangle_adjacency, directed=False)
+
+
+def component_statistics(
+    vertices: np.ndarray, cells: np.ndarray, labels: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    Triangle count, area and enclosed volume of each component.
+
+    The volume is the absolute sum of signed tetrahedra volumes and is only
+    meaningful for closed components.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param labels: Component label of each cell.
+
+    :return: Dictionary of arrays of shape (n_components,).
+    """
+    n_components = int(labels.max()) + 1 if labels.size else 0
+    corners = vertices[cells] - vertices.mean(axis=0)
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = np.linalg.norm(normals, axis=1) / 2.0
+    signed = np.einsum("ij,ij->i", corners[:, 0], normals) / 6.0
+
+    return {
+        "n_cells": np.bincount(labels, minlength=n_components),
+        "area": tree_sum(areas, labels, n_components),
+        "volume": np.abs(tree_sum(signed, labels, n_components)),
+    }
+
+
+def remove_unused_vertices(
+    vertices: np.ndarray, cells: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Drop vertices not referenced by any cell.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+
+    :return: Remaining vertices, re-indexed cells and the indices of the
+        remaining vertices in the input array.
+    """
+    used, inverse = np.unique(cells, return_inverse=True)
+
+    return vertices[used], inverse.reshape(cells.shape), used
+
+
+def filter_components(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    min_volume: float = 0.0,
+    min_cells: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Flag the cells of components passing both size thresholds.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param min_volume: Minimum enclosed volume of a component.
+    :param min_cells: Minimum number of triangles of a component.
+
+    :return: Boolean mask of kept cells and the component label of each cell.
+    """
+    _, labels = label_components(cells)
+    stats = component_statistics(vertices, cells, labels)
+    keep = (stats["volume"] >= min_volume) & (stats["n_cells"] >= min_cells)
+
+    return keep[labels], labels
@@ -0,0 +1,134 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+from surface_apps.mesh.components import remove_unused_vertices
+
+
+def cluster_vertices(
+    vertices: np.ndarray, cells: np.ndarray, size: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate a surface by merging the vertices of each cube of a grid.
+
+    Merged vertices are placed at the mean of their cluster, triangles
+    collapsed to an edge or a point are removed and duplicates are kept
+    once. Thin features narrower than the cubes may be merged together.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param size: Size of the cubes.
+
+    :return: Vertices and triangles of the decimated surface.
+    """
+    low = vertices.min(axis=0)
+    indices = np.floor((vertices - low) / size).astype(np.int64)
+    shape = indices.max(axis=0) + 1
+    if np.prod(shape.astype(float)) >= 2**62:
+        raise ValueError(f"Cluster size {size} is too small for the extent.")
+
+    _, labels = np.unique(
+        (indices[:, 0] * shape[1] + indices[:, 1]) * shape[2] + indices[:, 2],
+        return_inverse=True,
+    )
+    labels = labels.ravel()
+    counts = np.bincount(labels)
+    merged = np.column_stack(
+        [np.bincount(labels, weights=vertices[:, axis]) / counts for axis in range(3)]
+    )
+
+    cells = labels[cells]
+    cells = cells[
+        (cells[:, 0] != cells[:, 1])
+        & (cells[:, 1] != cells[:, 2])
+        & (cells[:, 2] != cells[:, 0])
+    ]
+    _, first = np.unique(np.sort(cells, axis=1), axis=0, return_index=True)
+    merged, cells, _ = remove_unused_vertices(merged, cells[np.sort(first)])
+
+    return merged, cells
+
+
+def decimate(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    n_cells: int,
+    iterations: int = 8,
+    tolerance: float = 0.1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate a surface to about a number of triangles by vertex clustering.
+
+    The cluster size is first estimated from the area of the surface, then
+    refined until the number of triangles is within tolerance.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param n_cells: Target number of triangles.
+    :param iterations: Maximum number of cluster sizes tried.
+    :param tolerance: Relative error accepted on the number of triangles.
+
+    :return: Vertices and triangles of the decimated surface, closest to
+        the target among the sizes tried.
+    """
+    if n_cells >= cells.shape[0]:
+        return vertices, cells
+
+    corners = vertices[cells]
+    area = (
+        np.linalg.norm(
+            np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]),
+            axis=1,
+        ).sum()
+        / 2.0
+    )
+    # Area of an equilateral triangle of side equal to the cluster size
+    size = np.sqrt(4.0 * area / (np.sqrt(3.0) * max(n_cells, 1)))
+
+    best = (vertices, cells)
+    for _ in range(iterations):
+        decimated = cluster_vertices(vertices, cells, size)
+        count = max(decimated[1].shape[0], 1)
+        if abs(count - n_cells) < abs(best[1].shape[0] - n_cells):
+            best = decimated
+        if abs(count - n_cells) <= tolerance * n_cells:
+            break
+        size *= np.sqrt(count / n_cells)
+
+    return best
+
+
+def lod_pyramid(
+    vertices: np.ndarray, cells: np.ndarray, fractions: Sequence[float]
+) -> Iterator[tuple[float, np.ndarray, np.ndarray]]:
+    """
+    Progressively decimated versions of a surface.
+
+    Each level is decimated from the previous one, so that the cost is
+    dominated by the first level.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param fractions: Fractions of the triangles kept at each level, in
+        (0, 1).
+
+    :return: Fraction, vertices and triangles of each level, from the
+        finest.
+    """
+    if any(not 0.0 < fraction < 1.0 for fraction in fractions):
+        raise ValueError("Level fractions must be between 0 and 1.")
+
+    n_cells = cells.shape[0]
+    for fraction in sorted(fractions, reverse=True):
+        vertices, cells = decimate(vertices, cells, int(round(fraction * n_cells)))
+        yield fraction, vertices, cells
@@ -0,0 +1,435 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from itertools import chain
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from surface_apps.memory import MemoryBudget
+from surface_apps.mesh.adjacency import MeshTopology
+
+# Peak memory of a queried point, outside of the candidate batches
+POINT_BYTES = 512
+
+# Largest batch of points, beyond which the arrays no longer fit in cache
+MAX_CHUNK = 100_000
+
+# Closest feature of a triangle, as returned by closest_point_on_triangles
+FACE, VERTEX_A, VERTEX_B, VERTEX_C, EDGE_AB, EDGE_BC, EDGE_CA = range(7)
+
+
+def _dot(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return np.einsum("...i,...i->...", u, v)
+
+
+def closest_point_on_triangles(
+    points: np.ndarray, corner_a: np.ndarray, corner_b: np.ndarray, corner_c: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Closest point on triangles ABC, broadcast over leading dimensions.
+
+    Follows the Voronoi-region classification of Ericson, Real-Time
+    Collision Detection (2005), section 5.1.5.
+
+    :param points: Query locations, shape (..., 3).
+    :param corner_a: First corners, shape (..., 3).
+    :param corner_b: Second corners, shape (..., 3).
+    :param corner_c: Third corners, shape (..., 3).
+
+    :return: Closest points, shape (..., 3), and the closest feature code
+        (FACE, VERTEX_* or EDGE_*), shape (...).
+    """
+    edge_ab = corner_b - corner_a
+    edge_ac = corner_c - corner_a
+    d_1 = _dot(edge_ab, points - corner_a)
+    d_2 = _dot(edge_ac, points - corner_a)
+    d_3 = _dot(edge_ab, points - corner_b)
+    d_4 = _dot(edge_ac, points - corner_b)
+    d_5 = _dot(edge_ab, points - corner_c)
+    d_6 = _dot(edge_ac, points - corner_c)
+    v_a = d_3 * d_6 - d_5 * d_4
+    v_b = d_5 * d_2 - d_1 * d_6
+    v_c = d_1 * d_4 - d_3 * d_2
+
+    conditions = [
+        (d_1 <= 0) & (d_2 <= 0),
+        (d_3 >= 0) & (d_4 <= d_3),
+        (v_c <= 0) & (d_1 >= 0) & (d_3 <= 0),
+        (d_6 >= 0) & (d_5 <= d_6),
+        (v_b <= 0) & (d_2 >= 0) & (d_6 <= 0),
+        (v_a <= 0) & (d_4 >= d_3) & (d_5 >= d_6),
+    ]
+    feature = np.select(
+        conditions, [VERTEX_A, VERTEX_B, EDGE_AB, VERTEX_C, EDGE_CA, EDGE_BC], FACE
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_ab = d_1 / (d_1 - d_3)
+        t_ca = d_2 / (d_2 - d_6)
+        t_bc = (d_4 - d_3) / ((d_4 - d_3) + (d_5 - d_6))
+        denominator = v_a + v_b + v_c
+        u_face = v_b / denominator
+        v_face = v_c / denominator
+
+    # Barycentric coordinates along AB and AC of the closest point
+    zero, one = np.zeros_like(t_ab), np.ones_like(t_ab)
+    along_ab = np.choose(feature, [u_face, zero, one, zero, t_ab, 1 - t_bc, zero])
+    along_ac = np.choose(feature, [v_face, zero, zero, one, zero, t_bc, t_ca])
+    closest = corner_a + edge_ab * along_ab[..., None] + edge_ac * along_ac[..., None]
+
+    return closest, feature
+
+
+class TriangleTree:
+    """
+    Spatial index over the triangles of a surface for batched
+    nearest-triangle queries.
+
+    Candidates are the triangles of the k nearest centroids, stored in a
+    KD-tree. Every point of a triangle lies within its radius of its
+    centroid, so the nearest candidate is exact when closer than the k-th
+    centroid distance minus the largest radius, ``reach``.
+
+    Other points, mostly away from the surface where many triangles lie at
+    about the same distance, are resolved against all triangles whose
+    bounding sphere is closer than the best candidate, found from KD-trees
+    of triangles of similar sizes. Those candidates are pruned by the
+    distance to the disc holding each triangle in its plane, so that only
+    a few are compared exactly.
+
+    Signs use the angle-weighted pseudo-normals of the closest feature
+    (Baerentzen and Aanaes, 2005), positive on the side the normals point to.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    """
+
+    max_pairs = 1_000_000
+    """Maximum number of point-triangle pairs evaluated at once."""
+
+    leaf_size = 64
+    """Number of centroids per leaf of the KD-trees; large leaves are faster
+    for points away from the surface."""
+
+    def __init__(self, vertices: np.ndarray, cells: np.ndarray):
+        self.origin = vertices.mean(axis=0)
+        self.vertices = np.asarray(vertices, dtype=float) - self.origin
+        self.cells = np.asarray(cells)
+
+        corners = self.vertices[self.cells]
+        self.centroids = corners.mean(axis=1)
+        self.radii = np.linalg.norm(corners - self.centroids[:, None], axis=2).max(
+            axis=1
+        )
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        self.normals = (
+            normals / np.maximum(np.linalg.norm(normals, axis=1), 1e-300)[:, None]
+        )
+        self.reach = float(self.radii.max(initial=0.0))
+        self.tree = cKDTree(self.centroids, leafsize=self.leaf_size)
+        # Squared distance below which bounds are not trusted, for round-off
+        self.tolerance = 1e-12 * float(np.ptp(self.vertices, axis=0).max()) ** 2
+
+        # Size classes by powers of two of the radius, tiny ones merged
+        scale = self.reach or 1.0
+        levels = np.floor(np.log2(np.maximum(self.radii / scale, 2.0**-20)))
+        self.groups: list[tuple[np.ndarray, cKDTree, float]] = []
+        for level in np.unique(levels):
+            members = np.flatnonzero(levels == level)
+            self.groups.append(
+                (
+                    members,
+                    cKDTree(self.centroids[members], leafsize=self.leaf_size),
+                    float(self.radii[members].max()),
+                )
+            )
+        self._pseudo_normals: tuple[np.ndarray, ...] | None = None
+
+    @property
+    def pseudo_normals(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Face normals, angle-weighted vertex normals and edge normals indexed
+        by cell edge, shape (n_cells, 3, 3).
+        """
+        if self._pseudo_normals is None:
+            corners = self.vertices[self.cells]
+            normals = np.cross(
+                corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                normals = np.nan_to_num(
+                    normals / np.linalg.norm(normals, axis=1)[:, None]
+                )
+
+            sides = np.roll(corners, -1, axis=1) - corners
+            sides /= np.maximum(np.linalg.norm(sides, axis=2), 1e-300)[..., None]
+            angles = np.arccos(
+                np.clip(-_dot(sides, np.roll(sides, 1, axis=1)), -1.0, 1.0)
+            )
+            vertex_normals = np.column_stack(
+                [
+                    np.bincount(
+                        self.cells.ravel(),
+                        weights=(angles[..., None] * normals[:, None])[
+                            ..., axis
+                        ].ravel(),
+                        minlength=self.vertices.shape[0],
+                    )
+                    for axis in range(3)
+                ]
+            )
+
+            inverse = MeshTopology(self.cells).cell_edges.ravel()
+            edge_normals = np.column_stack(
+                [
+                    np.bincount(inverse, weights=np.repeat(normals[:, axis], 3))
+                    for axis in range(3)
+                ]
+            )
+            self._pseudo_normals = (
+                normals,
+                vertex_normals,
+                edge_normals[inverse].reshape((-1, 3, 3)),
+            )
+
+        return self._pseudo_normals  # type: ignore
+
+    def _closest(
+        self, points: np.ndarray, candidates: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Closest candidate triangle of each point, with candidates (m, k)."""
+        corners = self.vertices[self.cells[candidates]]
+        closest, feature = closest_point_on_triangles(
+            points[:, None], corners[..., 0, :], corners[..., 1, :], corners[..., 2, :]
+        )
+        distance = np.linalg.norm(closest - points[:, None], axis=2)
+        best = np.argmin(distance, axis=1)
+        rows = np.arange(points.shape[0])
+
+        return (
+            candidates[rows, best],
+            closest[rows, best],
+            feature[rows, best],
+        )
+
+    def _group_within(
+        self, group: int, points: np.ndarray, radius: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Pairs of point and triangle of a size group within a radius."""
+        members, tree, reach = self.groups[group]
+        found = tree.query_ball_point(
+            points, radius + reach, return_sorted=False, workers=-1
+        )
+        counts = np.fromiter(map(len, found), dtype=np.int64, count=len(found))
+        triangle = np.fromiter(
+            chain.from_iterable(found), dtype=np.int64, count=int(counts.sum())
+        )
+
+        return np.repeat(np.arange(len(found)), counts), members[triangle]
+
+    def within(
+        self, points: np.ndarray, radius: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Triangles of which some part may lie within a radius of each point,
+        found from the centroids within the radius plus the reach of their
+        size group.
+
+        :param points: Centered query locations, shape (m, 3).
+        :param radius: Radius around each point, shape (m,).
+
+        :return: Pairs of point and triangle indices.
+        """
+        pairs = [
+            self._group_within(group, points, radius)
+            for group in range(len(self.groups))
+        ]
+
+        return (
+            np.concatenate([point for point, _ in pairs]),
+            np.concatenate([triangle for _, triangle in pairs]),
+        )
+
+    def _lower_bound(self, points: np.ndarray, triangle: np.ndarray) -> np.ndarray:
+        """
+        Squared distance of points to the discs holding triangles in their
+        plane, a lower bound of their squared distance to the triangles.
+        """
+        offset = points - self.centroids[triangle]
+        height = _dot(offset, self.normals[triangle])
+        lateral = np.sqrt(np.maximum(_dot(offset, offset) - height**2, 0.0))
+
+        return height**2 + np.maximum(lateral - self.radii[triangle], 0.0) ** 2
+
+    def _update(
+        self,
+        points: np.ndarray,
+        point: np.ndarray,
+        candidate: np.ndarray,
+        nearest: tuple[np.ndarray, ...],
+    ):
+        """
+        Update in place the triangle, closest point, feature and distance of
+        points with the candidates of point-triangle pairs that are closer.
+        """
+        triangle, closest, feature, distance = nearest
+        for first in range(0, point.shape[0], self.max_pairs):
+            pairs = slice(first, first + self.max_pairs)
+            corners = self.vertices[self.cells[candidate[pairs]]]
+            pair_closest, pair_feature = closest_point_on_triangles(
+                points[point[pairs]], corners[:, 0], corners[:, 1], corners[:, 2]
+            )
+            pair_distance = np.linalg.norm(pair_closest - points[point[pairs]], axis=1)
+            order = np.lexsort((pair_distance, point[pairs]))
+            order = order[np.unique(point[pairs][order], return_index=True)[1]]
+            rows = point[pairs][order]
+            better = pair_distance[order] < distance[rows]
+            order, rows = order[better], rows[better]
+            distance[rows] = pair_distance[order]
+            triangle[rows] = candidate[pairs][order]
+            closest[rows] = pair_closest[order]
+            feature[rows] = pair_feature[order]
+
+    def _exhaustive(self, points: np.ndarray, nearest: tuple[np.ndarray, ...]):
+        """
+        Update in place the nearest triangle, closest point, feature and
+        distance of points to the nearest among all triangles whose bounding
+        sphere is closer than their distance so far.
+        """
+        distance = nearest[3]
+        start, step = 0, 4096
+        while start < points.shape[0]:
+            rows = np.arange(start, min(start + step, points.shape[0]))
+            n_pairs = 0
+            # Groups are searched in turn, with the distances found so far
+            for group in range(len(self.groups)):
+                point, candidate = self._group_within(
+                    group, points[rows], distance[rows]
+                )
+                point = rows[point]
+                n_pairs += point.shape[0]
+                bound = self._lower_bound(points[point], candidate)
+
+                keep = bound <= distance[point] ** 2 + self.tolerance
+                self._update(points, point[keep], candidate[keep], nearest)
+
+            # Fewer points per batch when they have many candidates
+            start = rows[-1] + 1
+            if n_pairs > self.max_pairs:
+                step = max(step // 2, 1)
+
+    def query(
+        self, points: np.ndarray, k: int = 8
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Nearest triangle of each point.
+
+        :param points: Query locations, shape (n_points, 3).
+        :param k: Number of centroid candidates per point, before the
+            answers that cannot be certified are resolved exhaustively.
+
+        :return: Index of the nearest triangle, closest point on it and the
+            closest feature code.
+        """
+        points = np.asarray(points, dtype=float) - self.origin
+        n_points = points.shape[0]
+        triangle = np.zeros(n_points, dtype=int)
+        closest = np.zeros((n_points, 3))
+        feature = np.zeros(n_points, dtype=int)
+        bound = np.full(n_points, np.inf)
+        k = min(k, self.cells.shape[0])
+        step = max(1, self.max_pairs // k)
+
+        for start in range(0, n_points, step):
+            batch = slice(start, start + step)
+            distance, candidates = self.tree.query(points[batch], k=k, workers=-1)
+            candidates = candidates.reshape((-1, k))
+            triangle[batch], closest[batch], feature[batch] = self._closest(
+                points[batch], candidates
+            )
+            if k < self.cells.shape[0]:
+                bound[batch] = distance.reshape((-1, k))[:, -1] - self.reach
+
+        distance = np.linalg.norm(closest - points, axis=1)
+        unresolved = np.flatnonzero(distance > bound)
+        if unresolved.size:
+            nearest = (
+                triangle[unresolved],
+                closest[unresolved],
+                feature[unresolved],
+                distance[unresolved],
+            )
+            self._exhaustive(points[unresolved], nearest)
+            triangle[unresolved], closest[unresolved], feature[unresolved], _ = nearest
+
+        return triangle, closest + self.origin, feature
+
+    def signed_distance(
+        self,
+        points: np.ndarray,
+        chunk_size: int | None = None,
+        budget: MemoryBudget | None = None,
+    ) -> np.ndarray:
+        """
+        Signed distance of points to the surface.
+
+        :param points: Query locations, shape (n_points, 3).
+        :param chunk_size: Number of points queried per batch, sized by the
+            memory budget if None.
+        :param budget: Memory budget of the batches, half the available
+            memory by default.
+
+        :return: Distances, positive on the side the normals point to.
+        """
+        faces, vertex_normals, edge_normals = self.pseudo_normals
+        distance = np.empty(points.shape[0])
+
+        def distance_chunk(start: int, stop: int):
+            batch = np.asarray(points[start:stop], dtype=float)
+            triangle, closest, feature = self.query(batch)
+            offset = batch - closest
+
+            normal = faces[triangle]
+            is_vertex = (feature >= VERTEX_A) & (feature <= VERTEX_C)
+            normal[is_vertex] = vertex_normals[
+                self.cells[triangle[is_vertex], feature[is_vertex] - VERTEX_A]
+            ]
+            is_edge = feature >= EDGE_AB
+            normal[is_edge] = edge_normals[
+                triangle[is_edge], feature[is_edge] - EDGE_AB
+            ]
+
+            sign = np.where(_dot(offset, normal) < 0, -1.0, 1.0)
+            distance[start:stop] = sign * np.linalg.norm(offset, axis=1)
+
+        budget = budget or MemoryBudget()
+        if chunk_size is None:
+            chunk_size = budget.chunk_size(POINT_BYTES, maximum=MAX_CHUNK)
+        budget.process(
+            distance_chunk, points.shape[0], POINT_BYTES, chunk_size=chunk_size
+        )
+
+        return distance
+
+
+def signed_distance(
+    points: np.ndarray, vertices: np.ndarray, cells: np.ndarray
+) -> np.ndarray:
+    """
+    Signed distance of points to a triangulated surface.
+
+    :param points: Query locations, shape (n_points, 3).
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+
+    :return: Distances, positive on the side the normals point to.
+    """
+    return TriangleTree(vertices, cells).signed_distance(points)
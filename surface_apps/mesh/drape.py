@@ -0,0 +1,267 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from surface_apps.memory import MemoryBudget
+
+# Upper bound on the number of buckets per triangle of the grid
+MAX_BUCKETS = 4
+
+# Peak memory of a located point and of each of its candidate triangles
+POINT_BYTES = 128
+PAIR_BYTES = 160
+
+# Largest batch of points, beyond which the arrays no longer fit in cache
+MAX_CHUNK = 200_000
+
+# Barycentric tolerance of points on the edges of triangles
+TOLERANCE = 1e-10
+
+
+def projection_frame(direction: Sequence[float]) -> np.ndarray:
+    """
+    Rotation to a frame where a projection direction points down.
+
+    :param direction: Direction of projection, e.g. (0, 0, -1) to project
+        vertically down.
+
+    :return: Orthonormal rotation matrix, shape (3, 3), whose rows are the
+        local x, y and z axes, with z opposite to the direction.
+    """
+    down = np.asarray(direction, dtype=np.float64)
+    length = np.linalg.norm(down)
+    if down.shape != (3,) or length == 0:
+        raise ValueError(f"Direction must be a non-zero 3D vector. {direction}")
+
+    up = -down / length
+    # Any axis not parallel to the direction completes the frame
+    axis = np.eye(3)[np.argmin(np.abs(up))]
+    u_axis = np.cross(axis, up)
+    u_axis /= np.linalg.norm(u_axis)
+
+    return np.vstack([u_axis, np.cross(up, u_axis), up])
+
+
+def _affine_maps(corners: np.ndarray) -> np.ndarray:
+    """
+    First corners and inverse edge matrices of 2D triangles, shape
+    (n_cells, 6), so that the barycentric coordinates of the second and
+    third corners are linear in the offset from the first. Triangles with
+    no area get nan rows and never contain a point.
+    """
+    side_b = corners[:, 1] - corners[:, 0]
+    side_c = corners[:, 2] - corners[:, 0]
+    area = side_b[:, 0] * side_c[:, 1] - side_b[:, 1] * side_c[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = 1.0 / area
+    inverse[area == 0] = np.nan
+
+    return np.c_[
+        corners[:, 0],
+        side_c[:, 1] * inverse,
+        -side_c[:, 0] * inverse,
+        -side_b[:, 1] * inverse,
+        side_b[:, 0] * inverse,
+    ]
+
+
+class TriangleGrid:
+    """
+    Uniform bucket grid over the triangles of a surface, seen along a
+    projection direction, to locate many points in one vectorized pass.
+
+    Each triangle is listed in every bucket its bounding box overlaps, in
+    a CSR layout, so that the candidates of a point are read from its
+    bucket and tested with barycentric coordinates in batches, instead of
+    casting one ray per point.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param direction: Direction of projection.
+    :param bucket_size: Width of the buckets, defaults to half the mean
+        width of the triangles.
+    """
+
+    def __init__(
+        self,
+        vertices: np.ndarray,
+        cells: np.ndarray,
+        direction: Sequence[float] = (0.0, 0.0, -1.0),
+        bucket_size: float | None = None,
+    ):
+        if cells.shape[0] == 0:
+            raise ValueError("Surface has no triangles.")
+
+        self.rotation = projection_frame(direction)
+        self.vertices = vertices @ self.rotation.T
+        self.cells = cells
+
+        corners = self.vertices[cells][:, :, :2]
+        self.affine = _affine_maps(corners)
+        low, high = corners.min(axis=1), corners.max(axis=1)
+        self.origin = low.min(axis=0)
+        extent = high.max(axis=0) - self.origin
+
+        if bucket_size is None:
+            # About six candidates per bucket on regular triangulations
+            bucket_size = 0.5 * float(np.mean(np.max(high - low, axis=1)))
+        if bucket_size <= 0:
+            bucket_size = float(extent.max()) or 1.0
+        # Coarsen the grid rather than spending memory on empty buckets
+        n_buckets = np.prod(np.floor(extent / bucket_size) + 1)
+        if n_buckets > MAX_BUCKETS * cells.shape[0]:
+            bucket_size *= np.sqrt(n_buckets / (MAX_BUCKETS * cells.shape[0]))
+
+        self.bucket_size = bucket_size
+        self.shape = (np.floor(extent / bucket_size) + 1).astype(np.int64)
+        first = self._index(low)
+        spans = self._index(high) - first + 1
+        counts = spans[:, 0] * spans[:, 1]
+
+        triangles = np.repeat(np.arange(cells.shape[0]), counts)
+        offsets = np.arange(triangles.shape[0]) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        columns = first[triangles, 0] + offsets % spans[triangles, 0]
+        rows = first[triangles, 1] + offsets // spans[triangles, 0]
+        buckets = rows * self.shape[0] + columns
+
+        order = np.argsort(buckets, kind="stable")
+        self.triangles = triangles[order]
+        self.pointers = np.r_[
+            0, np.cumsum(np.bincount(buckets, minlength=int(np.prod(self.shape))))
+        ]
+        # Mean number of candidates of a point in a non-empty bucket
+        self.occupancy = triangles.shape[0] / max(
+            np.count_nonzero(np.diff(self.pointers)), 1
+        )
+
+    def _index(self, points: np.ndarray) -> np.ndarray:
+        """Column and row of the buckets of local x, y coordinates."""
+        index = np.floor((points - self.origin) / self.bucket_size).astype(np.int64)
+        return np.clip(index, 0, self.shape - 1)
+
+    def _candidates(self, local: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Pairs of (point index, triangle) sharing a bucket."""
+        inside = np.all(
+            (local >= self.origin)
+            & (local <= self.origin + self.shape * self.bucket_size),
+            axis=1,
+        )
+        queries = np.flatnonzero(inside)
+        index = self._index(local[queries])
+        buckets = index[:, 1] * self.shape[0] + index[:, 0]
+
+        counts = self.pointers[buckets + 1] - self.pointers[buckets]
+        owner = np.repeat(queries, counts)
+        offsets = np.arange(owner.shape[0]) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+
+        return (
+            owner,
+            self.triangles[np.repeat(self.pointers[buckets], counts) + offsets],
+        )
+
+    def locate(
+        self,
+        points: np.ndarray,
+        chunk_size: int | None = None,
+        budget: MemoryBudget | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Triangles hit by the projection of points, with the barycentric
+        coordinates of the hits.
+
+        Where the surface overlaps itself along the direction, the highest
+        hit is kept, highest meaning furthest against the direction: the
+        first hit met by a ray coming from far against the direction, e.g.
+        the top of an overhang when projecting down, whichever side of the
+        surface the point is on.
+
+        :param points: Locations, shape (n_points, 3).
+        :param chunk_size: Number of points located per batch, sized by the
+            memory budget if None.
+        :param budget: Memory budget of the batches, half the available
+            memory by default.
+
+        :return: Index of the triangle hit by each point, -1 for misses, and
+            barycentric coordinates of the hits, shape (n_points, 3).
+        """
+        n_points = points.shape[0]
+        triangle = np.full(n_points, -1, dtype=np.int64)
+        weights = np.zeros((n_points, 3))
+
+        def locate_chunk(start: int, stop: int):
+            batch = np.asarray(points[start:stop], dtype=np.float64)
+            local = batch @ self.rotation[:2].T
+            owner, candidates = self._candidates(local)
+
+            # Barycentric coordinates from the affine map of each triangle
+            affine = self.affine[candidates]
+            offset = local[owner] - affine[:, :2]
+            w_b = offset[:, 0] * affine[:, 2] + offset[:, 1] * affine[:, 3]
+            w_c = offset[:, 0] * affine[:, 4] + offset[:, 1] * affine[:, 5]
+            w_a = 1.0 - w_b - w_c
+            hit = (w_a >= -TOLERANCE) & (w_b >= -TOLERANCE) & (w_c >= -TOLERANCE)
+            owner, candidates = owner[hit], candidates[hit]
+            barycentric = np.c_[w_a[hit], w_b[hit], w_c[hit]]
+            if owner.shape[0] == 0:
+                return
+
+            # Highest hit of each point, local z pointing against the
+            # direction; pairs are grouped by point
+            elevation = np.einsum(
+                "ij,ij->i", barycentric, self.vertices[self.cells[candidates], 2]
+            )
+            starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+            counts = np.diff(np.r_[starts, owner.shape[0]])
+            top = np.repeat(np.maximum.reduceat(elevation, starts), counts)
+            best = np.flatnonzero(elevation == top)
+            best = best[np.r_[True, owner[best[1:]] != owner[best[:-1]]]]
+            triangle[start + owner[best]] = candidates[best]
+            weights[start + owner[best]] = barycentric[best]
+
+        budget = budget or MemoryBudget()
+        item_bytes = POINT_BYTES + PAIR_BYTES * self.occupancy
+        if chunk_size is None:
+            chunk_size = budget.chunk_size(item_bytes, maximum=MAX_CHUNK)
+        budget.process(locate_chunk, n_points, item_bytes, chunk_size=chunk_size)
+
+        return triangle, weights
+
+    def project(
+        self,
+        points: np.ndarray,
+        chunk_size: int | None = None,
+        budget: MemoryBudget | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Project points onto the surface along the direction.
+
+        :param points: Locations, shape (n_points, 3).
+        :param chunk_size: Number of points located per batch, sized by the
+            memory budget if None.
+        :param budget: Memory budget of the batches.
+
+        :return: Projected locations, shape (n_points, 3), with the points
+            that miss the surface left in place, and a mask of the hits.
+        """
+        triangle, weights = self.locate(points, chunk_size=chunk_size, budget=budget)
+        hit = triangle >= 0
+
+        local = points @ self.rotation.T
+        corners = self.vertices[self.cells[triangle[hit]], 2]
+        local[hit, 2] = np.einsum("ij,ij->i", weights[hit], corners)
+
+        return local @ self.rotation, hit
@@ -0,0 +1,293 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import Delaunay
+
+from surface_apps.mesh.adjacency import MeshTopology, edge_table
+from surface_apps.mesh.components import remove_unused_vertices
+from surface_apps.mesh.distance import TriangleTree
+
+
+def delaunay_2d(points: np.ndarray) -> np.ndarray:
+    """
+    Delaunay triangulation of points in plan view, with upward normals.
+
+    :param points: Array of locations, shape (n_points, 3).
+
+    :return: Array of triangles, shape (n_cells, 3).
+    """
+    cells = Delaunay(points[:, :2]).simplices
+    corners = points[cells, :2]
+    edge_1, edge_2 = corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+    clockwise = edge_1[:, 0] * edge_2[:, 1] - edge_1[:, 1] * edge_2[:, 0] < 0
+    cells[clockwise] = cells[clockwise][:, ::-1]
+
+    return cells
+
+
+def segment_intersections(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    corner_a: np.ndarray,
+    corner_b: np.ndarray,
+    corner_c: np.ndarray,
+    tolerance: float = 1e-9,
+) -> np.ndarray:
+    """
+    Intersections of segments with triangles, pair by pair, after Moller
+    and Trumbore (1997).
+
+    Segments ending on a triangle do not cross it, so that the vertices
+    created on a fault by :func:`cut_triangles` do not count as crossings.
+
+    :param starts: Segment starts, shape (n, 3).
+    :param ends: Segment ends, shape (n, 3).
+    :param corner_a: First triangle corners, shape (n, 3).
+    :param corner_b: Second triangle corners, shape (n, 3).
+    :param corner_c: Third triangle corners, shape (n, 3).
+    :param tolerance: Fraction of the segment length ignored at both ends.
+
+    :return: Position of the intersection along each segment, between 0
+        (start) and 1 (end), nan if the segment misses the triangle.
+    """
+    direction = ends - starts
+    edge_ab, edge_ac = corner_b - corner_a, corner_c - corner_a
+    normal = np.cross(direction, edge_ac)
+    determinant = np.einsum("ij,ij->i", edge_ab, normal)
+    valid = np.abs(determinant) > 1e-12 * np.maximum(
+        np.linalg.norm(direction, axis=1) ** 3, 1e-300
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = 1.0 / determinant
+        offset = starts - corner_a
+        along_ab = inverse * np.einsum("ij,ij->i", offset, normal)
+        cross = np.cross(offset, edge_ab)
+        along_ac = inverse * np.einsum("ij,ij->i", direction, cross)
+        along_segment = inverse * np.einsum("ij,ij->i", edge_ac, cross)
+        hit = (
+            valid
+            & (along_ab >= 0)
+            & (along_ac >= 0)
+            & (along_ab + along_ac <= 1)
+            & (along_segment > tolerance)
+            & (along_segment < 1 - tolerance)
+        )
+
+    return np.where(hit, along_segment, np.nan)
+
+
+def fault_crossings(
+    fault: TriangleTree,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    chunk_size: int = 100_000,
+) -> np.ndarray:
+    """
+    First crossing of segments with a fault surface.
+
+    Segments outside the bounding box of the fault are skipped, others are
+    only tested against the fault triangles that may reach them, found
+    with :meth:`TriangleTree.within`.
+
+    :param fault: Spatial index of the fault triangles.
+    :param starts: Segment starts, shape (n_segments, 3).
+    :param ends: Segment ends, shape (n_segments, 3).
+    :param chunk_size: Number of segments queried per batch.
+
+    :return: Position of the first crossing along each segment, between 0
+        (start) and 1 (end), nan if the segment does not cross the fault.
+    """
+    starts = np.asarray(starts, dtype=float) - fault.origin
+    ends = np.asarray(ends, dtype=float) - fault.origin
+    crossing = np.full(starts.shape[0], np.nan)
+    nearby = np.flatnonzero(
+        np.all(np.minimum(starts, ends) <= fault.vertices.max(axis=0), axis=1)
+        & np.all(np.maximum(starts, ends) >= fault.vertices.min(axis=0), axis=1)
+    )
+
+    for start in range(0, nearby.shape[0], chunk_size):
+        batch = nearby[start : start + chunk_size]
+        radius = np.linalg.norm(ends[batch] - starts[batch], axis=1) / 2.0
+        segment, triangle = fault.within((starts[batch] + ends[batch]) / 2.0, radius)
+        segment = batch[segment]
+
+        for first in range(0, segment.shape[0], fault.max_pairs):
+            pairs = slice(first, first + fault.max_pairs)
+            corners = fault.vertices[fault.cells[triangle[pairs]]]
+            along = segment_intersections(
+                starts[segment[pairs]],
+                ends[segment[pairs]],
+                corners[:, 0],
+                corners[:, 1],
+                corners[:, 2],
+            )
+            np.fmin.at(crossing, segment[pairs], along)
+
+    return crossing
+
+
+def fault_blocks(
+    points: np.ndarray, faults: Sequence[TriangleTree]
+) -> tuple[int, np.ndarray]:
+    """
+    Partition points into fault blocks.
+
+    Points are connected by their plan-view Delaunay triangulation, edges
+    crossing a fault are removed and the remaining connected groups form
+    the blocks. Points on both sides of a fault that does not cut through
+    the dataset stay in the same block, connected around its tip.
+
+    :param points: Array of locations, shape (n_points, 3).
+    :param faults: Spatial indexes of the fault surfaces.
+
+    :return: Number of blocks and the block label of each point.
+    """
+    edges, _, _ = edge_table(delaunay_2d(points))
+    keep = np.ones(edges.shape[0], dtype=bool)
+    for fault in faults:
+        keep &= np.isnan(
+            fault_crossings(fault, points[edges[:, 0]], points[edges[:, 1]])
+        )
+
+    graph = csr_matrix(
+        (np.ones(keep.sum()), (edges[keep, 0], edges[keep, 1])),
+        shape=(points.shape[0], points.shape[0]),
+    )
+
+    return connected_components(graph, directed=False)
+
+
+def cut_triangles(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    distance: np.ndarray,
+    cut: np.ndarray,
+    fault: TriangleTree | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Tear triangles along the zero level of a distance field, by marching
+    triangles.
+
+    Each crossing edge gets one new vertex per side, so that the pieces on
+    either side are disconnected. New vertices are placed by linear
+    interpolation of the distance, or exactly where the edge crosses the
+    fault surface if provided.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param distance: Signed distance at the vertices, shape (n_vertices,).
+    :param cut: Triangles to cut; those with corners on a single side are
+        left unchanged.
+    :param fault: Fault surface the distance is measured to.
+
+    :return: Vertices and triangles, with the cut triangles replaced by
+        their pieces.
+    """
+    positive = (distance >= 0)[cells]
+    n_positive = positive.sum(axis=1)
+    cut = cut & (n_positive % 3 != 0)
+    if not cut.any():
+        return vertices, cells
+
+    # Roll the corners so that the lone corner, alone on its side, is first
+    lone_positive = n_positive[cut] == 1
+    lone = np.argmax(positive[cut] == lone_positive[:, None], axis=1)
+    corners = np.take_along_axis(cells[cut], (lone[:, None] + np.arange(3)) % 3, axis=1)
+
+    pairs = np.r_[corners[:, [0, 1]], corners[:, [0, 2]]]
+    keys, inverse = np.unique(
+        np.sort(pairs, axis=1) @ np.r_[vertices.shape[0], 1],
+        return_inverse=True,
+    )
+    start, end = keys // vertices.shape[0], keys % vertices.shape[0]
+    ratio = distance[start] / (distance[start] - distance[end])
+    if fault is not None:
+        exact = fault_crossings(fault, vertices[start], vertices[end])
+        ratio = np.where(np.isnan(exact), ratio, exact)
+    points = vertices[start] + ratio[:, None] * (vertices[end] - vertices[start])
+
+    # Copies of each crossing point: 2k on the positive side, 2k+1 on the other
+    n_cut = corners.shape[0]
+    lone_copy = vertices.shape[0] + 2 * inverse.reshape((2, n_cut)) + ~lone_positive
+    other_copy = vertices.shape[0] + 2 * inverse.reshape((2, n_cut)) + lone_positive
+
+    pieces = np.r_[
+        np.c_[corners[:, 0], lone_copy[0], lone_copy[1]],
+        np.c_[other_copy[0], corners[:, 1], corners[:, 2]],
+        np.c_[other_copy[0], corners[:, 2], other_copy[1]],
+    ]
+
+    return (
+        np.r_[vertices, np.repeat(points, 2, axis=0)],
+        np.r_[cells[~cut], pieces],
+    )
+
+
+def clip_to_faults(
+    vertices: np.ndarray, cells: np.ndarray, faults: Sequence[TriangleTree]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clip a triangulation against fault surfaces.
+
+    Triangles with an edge crossing a fault are torn along the fault if
+    their corners lie on both sides, and removed otherwise, i.e. where the
+    triangulation bridges a bend of the fault. Only the corners of crossed
+    triangles are evaluated against each fault.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param faults: Spatial indexes of the fault surfaces.
+
+    :return: Vertices and triangles of the clipped surface.
+    """
+    for fault in faults:
+        topology = MeshTopology(cells, vertices.shape[0])
+        edges = topology.edges
+        crossing = ~np.isnan(
+            fault_crossings(fault, vertices[edges[:, 0]], vertices[edges[:, 1]])
+        )
+        crossed = crossing[topology.cell_edges].any(axis=1)
+        if not crossed.any():
+            continue
+
+        nodes = np.unique(cells[crossed])
+        distance = np.zeros(vertices.shape[0])
+        distance[nodes] = fault.signed_distance(vertices[nodes])
+
+        positive = (distance >= 0)[cells].sum(axis=1)
+        bridging = crossed & (positive % 3 == 0)
+        vertices, cells = cut_triangles(
+            vertices, cells[~bridging], distance, crossed[~bridging], fault=fault
+        )
+
+    vertices, cells, _ = remove_unused_vertices(vertices, cells)
+
+    return vertices, cells
+
+
+def triangulate_block(
+    points: np.ndarray, faults: Sequence[TriangleTree]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Triangulate the points of a fault block and clip the result against
+    the faults.
+
+    :param points: Array of locations, shape (n_points, 3).
+    :param faults: Spatial indexes of the fault surfaces.
+
+    :return: Vertices and triangles of the block surface.
+    """
+    return clip_to_faults(points, delaunay_2d(points), faults)
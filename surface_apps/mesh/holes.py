@@ -0,0 +1,161 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.mesh.precision import index_dtype
+
+
+def fan_fill(
+    vertices: np.ndarray, loops: Sequence[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Close boundary loops with a fan of triangles around their centroid.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param loops: Vertex indices of each loop, in the order of the
+        boundary half-edges.
+
+    :return: Centroids of the loops, shape (n_loops, 3), indexed after the
+        input vertices, and the fan triangles, oriented as the cells along
+        the loops.
+    """
+    if not loops:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+
+    sizes = np.array([loop.shape[0] for loop in loops])
+    current = np.concatenate(loops).astype(np.int64)
+    following = np.concatenate([np.roll(loop, -1) for loop in loops]).astype(np.int64)
+    labels = np.repeat(np.arange(len(loops)), sizes)
+    centroids = np.column_stack(
+        [
+            np.bincount(labels, weights=vertices[current, axis]) / sizes
+            for axis in range(3)
+        ]
+    )
+
+    return centroids, np.c_[following, current, vertices.shape[0] + labels]
+
+
+def _plane_coordinates(points: np.ndarray) -> np.ndarray:
+    """Coordinates of a polygon in its plane, counter-clockwise (Newell, 1972)."""
+    following = np.roll(points, -1, axis=0)
+    normal = np.c_[
+        (points[:, 1] - following[:, 1]) * (points[:, 2] + following[:, 2]),
+        (points[:, 2] - following[:, 2]) * (points[:, 0] + following[:, 0]),
+        (points[:, 0] - following[:, 0]) * (points[:, 1] + following[:, 1]),
+    ].sum(axis=0)
+    normal /= max(np.linalg.norm(normal), 1e-300)
+    axis_u = np.cross(normal, np.eye(3)[np.argmin(np.abs(normal))])
+    axis_u /= np.linalg.norm(axis_u)
+    axis_v = np.cross(normal, axis_u)
+    centered = points - points.mean(axis=0)
+
+    return np.c_[centered @ axis_u, centered @ axis_v]
+
+
+def ear_clipping(points: np.ndarray) -> np.ndarray:
+    """
+    Triangulate a simple polygon by clipping its ears.
+
+    The polygon is projected on its mean plane. Where no ear is found,
+    e.g. for a polygon folding over itself in projection, the sharpest
+    convex corner is clipped instead.
+
+    :param points: Corners of the polygon, shape (n_points, 3), in order.
+
+    :return: Triangles indexing the corners, shape (n_points - 2, 3),
+        oriented as the polygon.
+    """
+    planar = _plane_coordinates(points)
+    remaining = np.arange(points.shape[0])
+    triangles = []
+    while remaining.shape[0] > 3:
+        corner = planar[remaining]
+        previous, following = np.roll(corner, 1, axis=0), np.roll(corner, -1, axis=0)
+        side_a, side_b = corner - previous, following - corner
+        convex = side_a[:, 0] * side_b[:, 1] - side_a[:, 1] * side_b[:, 0] > 0
+
+        ear = -1
+        for index in np.flatnonzero(convex):
+            others = np.delete(corner, [index - 1, index, (index + 1) % len(corner)], 0)
+            triangle = np.r_[[previous[index], corner[index], following[index]]]
+            edges = np.roll(triangle, -1, axis=0) - triangle
+            offsets = others[:, None] - triangle
+            inside = (
+                edges[:, 0] * offsets[..., 1] - edges[:, 1] * offsets[..., 0] >= 0
+            ).all(axis=1)
+            if not inside.any():
+                ear = index
+                break
+
+        if ear < 0:
+            cosine = np.einsum("ij,ij->i", -side_a, side_b) / np.maximum(
+                np.linalg.norm(side_a, axis=1) * np.linalg.norm(side_b, axis=1), 1e-300
+            )
+            ear = int(np.argmax(np.where(convex, cosine, -np.inf)))
+
+        triangles.append(remaining[[ear - 1, ear, (ear + 1) % len(remaining)]])
+        remaining = np.delete(remaining, ear)
+
+    triangles.append(remaining)
+
+    return np.vstack(triangles)
+
+
+def fill_holes(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    max_edges: int,
+    method: str = "Fan",
+    topology: MeshTopology | None = None,
+) -> tuple[np.ndarray, np.ndarray, list[np.ndarray]]:
+    """
+    Close the open boundaries of a surface up to a number of edges.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of consistently oriented triangles, shape (n_cells, 3).
+    :param max_edges: Maximum number of edges of the holes filled.
+    :param method: 'Fan', adding a vertex at the centroid of each hole, or
+        'Ear clipping', triangulating holes from their own vertices.
+    :param topology: Connectivity of the cells, if already built.
+
+    :return: Vertices and triangles with the holes filled, and the loops
+        left open.
+    """
+    if method not in ("Fan", "Ear clipping"):
+        raise ValueError(f"Filling method must be 'Fan' or 'Ear clipping'. {method}")
+
+    topology = topology or MeshTopology(cells, vertices.shape[0])
+    loops = topology.boundary_loops()
+    holes = [loop for loop in loops if loop.shape[0] <= max_edges]
+    if not holes:
+        return vertices, cells, loops
+
+    if method == "Fan":
+        centroids, patches = fan_fill(vertices, holes)
+        vertices = np.r_[vertices, centroids]
+    else:
+        # Walk the holes backward, as the cells on their far side would
+        patches = np.vstack(
+            [hole[::-1][ear_clipping(vertices[hole[::-1]])] for hole in holes]
+        )
+
+    # Compact cells may be too narrow to index the centroids of fans
+    dtype = np.promote_types(cells.dtype, index_dtype(vertices.shape[0]))
+
+    return (
+        vertices,
+        np.r_[cells.astype(dtype, copy=False), patches.astype(dtype)],
+        [loop for loop in loops if loop.shape[0] > max_edges],
+    )
@@ -0,0 +1,152 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import numpy as np
+
+# Sub-cell shift of the ray positions, irrational in cell units, so that rays
+# never pass exactly through the shared edges or vertices of triangles
+RAY_SHIFT = np.r_[np.sqrt(2.0), np.sqrt(3.0)] * 1e-6
+
+
+def _triangle_batches(counts: np.ndarray, max_pairs: int) -> Iterator[slice]:
+    """Consecutive triangle ranges with at most max_pairs ray-triangle pairs."""
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < counts.shape[0]:
+        offset = cumulative[start - 1] if start > 0 else 0
+        end = int(np.searchsorted(cumulative, offset + max_pairs, side="right"))
+        end = max(end, start + 1)
+        yield slice(start, end)
+        start = end
+
+
+def column_crossings(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    x_centers: np.ndarray,
+    y_centers: np.ndarray,
+    max_pairs: int = 4_000_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Crossings of vertical rays, cast at the centers of a column grid, with
+    a triangulated surface.
+
+    Every triangle is rasterized once onto the columns covered by its x-y
+    bounding box, so the cost scales with the number of triangles plus the
+    number of columns they cover.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param x_centers: Increasing x-coordinates of the columns, shape (n_x,).
+    :param y_centers: Increasing y-coordinates of the columns, shape (n_y,).
+    :param max_pairs: Maximum number of ray-triangle pairs tested at once.
+
+    :return: Column index (``y_index * n_x + x_index``) and elevation of
+        every crossing.
+    """
+    spacing = np.r_[
+        np.diff(x_centers).min(initial=1.0), np.diff(y_centers).min(initial=1.0)
+    ]
+    rays_x = x_centers + RAY_SHIFT[0] * spacing[0]
+    rays_y = y_centers + RAY_SHIFT[1] * spacing[1]
+
+    corners = vertices[cells]
+    lower = corners[..., :2].min(axis=1)
+    upper = corners[..., :2].max(axis=1)
+    i_start = np.searchsorted(rays_x, lower[:, 0])
+    n_i = np.maximum(np.searchsorted(rays_x, upper[:, 0], side="right") - i_start, 0)
+    j_start = np.searchsorted(rays_y, lower[:, 1])
+    n_j = np.maximum(np.searchsorted(rays_y, upper[:, 1], side="right") - j_start, 0)
+
+    columns, elevations = [], []
+    for batch in _triangle_batches(n_i * n_j, max_pairs):
+        counts = (n_i * n_j)[batch]
+        triangle = np.repeat(np.arange(batch.start, batch.stop), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        x_index = i_start[triangle] + offset % n_i[triangle]
+        y_index = j_start[triangle] + offset // n_i[triangle]
+
+        rays = np.c_[rays_x[x_index], rays_y[y_index]]
+        a_xy, b_xy, c_xy = (corners[triangle, ind, :2] - rays for ind in range(3))
+        weights = np.c_[
+            np.cross(b_xy, c_xy), np.cross(c_xy, a_xy), np.cross(a_xy, b_xy)
+        ]
+        area = weights.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights /= area[:, None]
+
+        hit = (area != 0) & np.all(weights >= 0, axis=1)
+        columns.append(y_index[hit] * x_centers.shape[0] + x_index[hit])
+        elevations.append(
+            np.einsum("ij,ij->i", weights[hit], corners[triangle[hit], :, 2])
+        )
+
+    if not columns:
+        return np.zeros(0, dtype=int), np.zeros(0)
+
+    return np.concatenate(columns), np.concatenate(elevations)
+
+
+def column_parity(
+    columns: np.ndarray,
+    elevations: np.ndarray,
+    z_centers: np.ndarray,
+    n_columns: int,
+) -> np.ndarray:
+    """
+    Inside/outside state of the cells of every column from the parity of
+    the crossings below them.
+
+    :param columns: Column index of every crossing.
+    :param elevations: Elevation of every crossing.
+    :param z_centers: Elevations of the cell centers, shared by all columns.
+    :param n_columns: Number of columns.
+
+    :return: Boolean array of shape (n_columns, n_z), ordered as z_centers.
+    """
+    order = np.argsort(z_centers)
+    n_z = z_centers.shape[0]
+    above = np.searchsorted(z_centers[order], elevations)
+    toggles = np.bincount(
+        columns * (n_z + 1) + above, minlength=n_columns * (n_z + 1)
+    ).reshape((n_columns, n_z + 1))
+    inside = (np.cumsum(toggles[:, :n_z], axis=1) % 2).astype(bool)
+
+    result = np.empty_like(inside)
+    result[:, order] = inside
+
+    return result
+
+
+def inside_grid(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    x_centers: np.ndarray,
+    y_centers: np.ndarray,
+    z_centers: np.ndarray,
+) -> np.ndarray:
+    """
+    Flag the cells of a rectilinear grid lying inside a closed surface.
+
+    :param vertices: Array of vertices in grid coordinates, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param x_centers: Increasing x-coordinates of the cell centers.
+    :param y_centers: Increasing y-coordinates of the cell centers.
+    :param z_centers: z-coordinates of the cell centers, in any order.
+
+    :return: Boolean array of shape (n_y * n_x, n_z).
+    """
+    columns, elevations = column_crossings(vertices, cells, x_centers, y_centers)
+
+    return column_parity(
+        columns, elevations, z_centers, x_centers.shape[0] * y_centers.shape[0]
+    )
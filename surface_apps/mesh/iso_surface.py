@@ -0,0 +1,399 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from itertools import permutations
+
+import numpy as np
+
+from surface_apps.mesh.precision import index_dtype
+
+
+def _corner(corner: int) -> np.ndarray:
+    """Offsets of a cube corner, numbered as i + 2j + 4k."""
+    return np.array([corner & 1, (corner >> 1) & 1, (corner >> 2) & 1])
+
+
+def _case_table() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Marching tetrahedra triangles of a cube for the 256 corner codes.
+
+    Cubes are split into the 6 tetrahedra of the Kuhn triangulation, which
+    all share the main diagonal and conform across neighbouring cubes.
+    Triangles are oriented with normals pointing from the corners inside
+    (above the threshold) to the corners outside.
+
+    :return: Cube edges as (start, end) corners, triangles of each code as
+        edge indices padded with -1, shape (256, 12, 3), and the number of
+        triangles per code.
+    """
+    tetrahedra = [
+        (0, 1 << axes[0], (1 << axes[0]) | (1 << axes[1]), 7)
+        for axes in permutations(range(3))
+    ]
+    # Corners of a Kuhn edge are nested, so the lower code is the start
+    edges = sorted(
+        {
+            (min(tet[i], tet[j]), max(tet[i], tet[j]))
+            for tet in tetrahedra
+            for i in range(4)
+            for j in range(i + 1, 4)
+        }
+    )
+    edge_index = {edge: index for index, edge in enumerate(edges)}
+
+    table = -np.ones((256, 12, 3), dtype=np.int8)
+    counts = np.zeros(256, dtype=np.int8)
+    for code in range(256):
+        for tet in tetrahedra:
+            inside = [corner for corner in tet if (code >> corner) & 1]
+            outside = [corner for corner in tet if not (code >> corner) & 1]
+
+            if len(inside) in (1, 3):
+                lone = (inside if len(inside) == 1 else outside)[0]
+                polygons = [[(lone, other) for other in tet if other != lone]]
+            elif len(inside) == 2:
+                (a, b), (c, d) = inside, outside
+                quad = [(a, c), (b, c), (b, d), (a, d)]
+                polygons = [quad[:3], [quad[0], quad[2], quad[3]]]
+            else:
+                continue
+
+            direction = np.mean([_corner(corner) for corner in outside], axis=0)
+            direction -= np.mean([_corner(corner) for corner in inside], axis=0)
+            for polygon in polygons:
+                points = [(_corner(start) + _corner(end)) / 2 for start, end in polygon]
+                normal = np.cross(points[1] - points[0], points[2] - points[0])
+                if normal @ direction < 0:
+                    polygon = polygon[::-1]
+
+                table[code, counts[code]] = [
+                    edge_index[(min(pair), max(pair))] for pair in polygon
+                ]
+                counts[code] += 1
+
+    return np.array(edges), table, counts
+
+
+CUBE_EDGES, CASE_TABLE, CASE_COUNTS = _case_table()
+
+
+class GridTopology:
+    """
+    Topology of a rectilinear grid of nodes, shared by all the fields
+    contoured on it.
+
+    Nodes are numbered in C order over the grid shape. Each lattice edge
+    is identified by a key combining its direction and start node, so that
+    the cubes sharing an edge produce the same key.
+
+    :param shape: Number of nodes along each axis; the axes must be
+        ordered as a right-handed frame for normals to point outward.
+    """
+
+    def __init__(self, shape: tuple[int, int, int]):
+        self.shape = tuple(int(size) for size in shape)
+        if len(self.shape) != 3 or min(self.shape) < 2:
+            raise ValueError(
+                f"Grid must have at least 2 nodes along 3 axes. Shape {shape} provided."
+            )
+
+        n_0, n_1, n_2 = self.shape
+        strides = np.r_[n_1 * n_2, n_2, 1]
+        self.n_nodes = n_0 * n_1 * n_2
+        self.corner_offsets = np.array(
+            [_corner(corner) @ strides for corner in range(8)], dtype=np.int64
+        )
+        self.direction_offsets = np.array(
+            [_corner(bits) @ strides for bits in range(1, 8)], dtype=np.int64
+        )
+        bases = (
+            np.arange(n_0 - 1)[:, None, None] * strides[0]
+            + np.arange(n_1 - 1)[None, :, None] * strides[1]
+            + np.arange(n_2 - 1)
+        )
+        self.bases = bases.ravel().astype(index_dtype(self.n_nodes))
+
+        # Direction (corner bits minus one) and start offset of cube edges
+        self.edge_directions = (CUBE_EDGES[:, 1] ^ CUBE_EDGES[:, 0]) - 1
+        self.edge_starts = self.corner_offsets[CUBE_EDGES[:, 0]]
+
+    @property
+    def n_cubes(self) -> int:
+        """Number of cubes between the nodes."""
+        return self.bases.shape[0]
+
+    def cube_codes(
+        self, inside: np.ndarray, cubes: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Corner codes of the cubes, one bit per corner inside.
+
+        :param inside: Nodes inside, shape (n_nodes,) or (n_nodes, n_fields)
+            to classify several fields at once.
+        :param cubes: Increasing indices of the cubes to classify, all
+            cubes if omitted.
+
+        :return: Codes, shape (n_cubes,) or (n_cubes, n_fields).
+        """
+        bases = self.bases if cubes is None else self.bases[cubes]
+        codes = np.zeros((bases.shape[0],) + inside.shape[1:], dtype=np.uint8)
+        for corner, offset in enumerate(self.corner_offsets):
+            codes |= inside[bases + offset].astype(np.uint8) << corner
+
+        return codes
+
+    def triangles(
+        self, codes: np.ndarray, cubes: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Triangles of the cubes, as lattice edge keys.
+
+        :param codes: Corner codes of the cubes, shape (n_cubes,).
+        :param cubes: Indices of the classified cubes, all cubes if omitted.
+
+        :return: Edge keys of the triangle corners, shape (n_triangles, 3).
+        """
+        bases = self.bases if cubes is None else self.bases[cubes]
+        counts = CASE_COUNTS[codes]
+        crossed = np.flatnonzero(counts)
+        counts = counts[crossed]
+        cube = np.repeat(crossed, counts)
+        slot = np.arange(cube.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        local = CASE_TABLE[codes[cube], slot]
+
+        starts = bases[cube].astype(np.int64)[:, None] + self.edge_starts[local]
+
+        return self.edge_directions[local] * self.n_nodes + starts
+
+    def edge_nodes(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Start and end nodes of lattice edges.
+
+        :param keys: Edge keys, as returned by :meth:`triangles`.
+        """
+        start = keys % self.n_nodes
+        end = start + self.direction_offsets[keys // self.n_nodes]
+
+        return start, end
+
+    def coordinates(self, nodes: np.ndarray, axes: list[np.ndarray]) -> np.ndarray:
+        """
+        Coordinates of grid nodes.
+
+        :param nodes: Node indices.
+        :param axes: Node coordinates along each axis.
+        """
+        return np.column_stack(
+            [
+                axis[index]
+                for axis, index in zip(axes, np.unravel_index(nodes, self.shape))
+            ]
+        )
+
+
+def _reduce_nodes(
+    array: np.ndarray, size: int, function: np.ufunc, axis: int
+) -> np.ndarray:
+    """
+    Reduce nodes by blocks of cubes along an axis; neighbouring blocks
+    share their boundary nodes.
+    """
+    n_nodes = array.shape[axis]
+    starts = np.arange(0, n_nodes - 1, size)
+    ends = np.minimum(starts + size, n_nodes - 1)
+
+    return function(
+        function.reduceat(array, starts, axis=axis), np.take(array, ends, axis=axis)
+    )
+
+
+def _reduce_blocks(array: np.ndarray, function: np.ufunc) -> np.ndarray:
+    """Reduce blocks by pairs along all axes."""
+    for axis in range(3):
+        array = function.reduceat(array, np.arange(0, array.shape[axis], 2), axis=axis)
+
+    return array
+
+
+class RangePyramid:
+    """
+    Pyramid of the value ranges of a field over blocks of cubes, to skip
+    the regions an iso-surface does not cross.
+
+    The finest level holds the minimum and maximum values of blocks of
+    cubes, each coarser level merges blocks by 2 along every axis, like an
+    octree. The pyramid only depends on the field and can be queried for
+    any number of thresholds.
+
+    :param topology: Topology of the grid.
+    :param values: Field values, shape (n_nodes,).
+    :param block_size: Number of cubes along each axis of the finest blocks.
+    """
+
+    def __init__(self, topology: GridTopology, values: np.ndarray, block_size: int = 8):
+        if block_size < 1:
+            raise ValueError(f"Block size must be positive. {block_size} provided.")
+
+        self.topology = topology
+        self.block_size = int(block_size)
+        minimum = maximum = values.reshape(topology.shape)
+        no_data = np.isnan(minimum)
+        has_no_data = no_data.any()
+        for axis in range(3):
+            minimum = _reduce_nodes(minimum, self.block_size, np.fmin, axis)
+            maximum = _reduce_nodes(maximum, self.block_size, np.fmax, axis)
+            if has_no_data:
+                no_data = _reduce_nodes(no_data, self.block_size, np.logical_or, axis)
+
+        if not has_no_data:
+            no_data = np.zeros(minimum.shape, dtype=bool)
+
+        self.levels = [(minimum, maximum, no_data)]
+        while max(minimum.shape) > 1:
+            minimum = _reduce_blocks(minimum, np.fmin)
+            maximum = _reduce_blocks(maximum, np.fmax)
+            no_data = _reduce_blocks(no_data, np.logical_or)
+            self.levels.append((minimum, maximum, no_data))
+
+    def active_blocks(self, threshold: float) -> np.ndarray:
+        """
+        Blocks of the finest level crossed by an iso-surface, found by
+        descending the pyramid from its coarsest level.
+
+        Blocks are crossed if they hold values at or above the threshold,
+        and values below it or no-data, which is outside.
+
+        :param threshold: Iso-value.
+
+        :return: Block indices along each axis, shape (n_blocks, 3).
+        """
+        children = np.array([_corner(corner) for corner in range(8)])
+        blocks = np.zeros((1, 3), dtype=np.int64)
+        for level, (minimum, maximum, no_data) in enumerate(self.levels[::-1]):
+            if level > 0:
+                blocks = (2 * blocks[:, None, :] + children).reshape((-1, 3))
+                blocks = blocks[np.all(blocks < minimum.shape, axis=1)]
+
+            index = tuple(blocks.T)
+            crossed = (maximum[index] >= threshold) & (
+                (minimum[index] < threshold) | no_data[index]
+            )
+            blocks = blocks[crossed]
+
+        return blocks
+
+    def active_cubes(self, threshold: float) -> np.ndarray:
+        """
+        Cubes of the blocks crossed by an iso-surface.
+
+        :param threshold: Iso-value.
+
+        :return: Increasing cube indices.
+        """
+        shape = np.array(self.topology.shape) - 1
+        offsets = np.stack(
+            np.meshgrid(*[np.arange(self.block_size)] * 3, indexing="ij"), axis=-1
+        ).reshape((-1, 3))
+        cubes = (
+            self.active_blocks(threshold)[:, None, :] * self.block_size + offsets
+        ).reshape((-1, 3))
+        cubes = cubes[np.all(cubes < shape, axis=1)]
+
+        return np.sort(np.ravel_multi_index(tuple(cubes.T), tuple(shape)))
+
+
+def contour(  # pylint: disable=too-many-arguments
+    topology: GridTopology,
+    values: np.ndarray,
+    axes: list[np.ndarray],
+    threshold: float,
+    codes: np.ndarray | None = None,
+    cubes: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Iso-surface of a field sampled on a grid, by marching tetrahedra.
+
+    Nodes at or above the threshold are inside, so that the surface wraps
+    the high values with outward normals. No-data (nan) nodes are outside.
+
+    :param topology: Topology of the grid.
+    :param values: Field values, shape (n_nodes,).
+    :param axes: Increasing node coordinates along each axis.
+    :param threshold: Iso-value.
+    :param codes: Cube codes of the field, if already classified.
+    :param cubes: Increasing indices of the cubes to contour, e.g. from
+        :meth:`RangePyramid.active_cubes`, all cubes if omitted.
+
+    :return: Vertices, shape (n_vertices, 3), and triangles, shape (n_cells, 3).
+    """
+    if codes is None:
+        codes = topology.cube_codes(values >= threshold, cubes=cubes)
+
+    keys = topology.triangles(codes, cubes=cubes)
+    if keys.size == 0:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32)
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    start, end = topology.edge_nodes(unique)
+    v_start = values[start].astype(np.float64)
+    v_end = values[end].astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (threshold - v_start) / (v_end - v_start)
+    ratio = np.where(np.isfinite(ratio), np.clip(ratio, 0.0, 1.0), 0.5)
+
+    origin = topology.coordinates(start, axes)
+    vertices = origin + ratio[:, None] * (topology.coordinates(end, axes) - origin)
+    cells = inverse.reshape((-1, 3)).astype(np.int32)
+
+    return vertices, cells
+
+
+def contour_batch(
+    topology: GridTopology,
+    values: np.ndarray,
+    axes: list[np.ndarray],
+    threshold: float,
+    block_size: int = 0,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Iso-surfaces of several fields on the same grid, classified at once.
+
+    :param topology: Topology of the grid.
+    :param values: Field values, shape (n_nodes, n_fields).
+    :param axes: Increasing node coordinates along each axis.
+    :param threshold: Iso-value.
+    :param block_size: Size of the blocks of a :class:`RangePyramid` of
+        each field, to only classify the cubes of crossed blocks; 0 to
+        classify all fields and cubes at once.
+
+    :return: Vertices and triangles of each field.
+    """
+    if block_size:
+        meshes = []
+        for field in range(values.shape[1]):
+            pyramid = RangePyramid(topology, values[:, field], block_size)
+            meshes.append(
+                contour(
+                    topology,
+                    values[:, field],
+                    axes,
+                    threshold,
+                    cubes=pyramid.active_cubes(threshold),
+                )
+            )
+        return meshes
+
+    codes = topology.cube_codes(values >= threshold)
+
+    return [
+        contour(topology, values[:, field], axes, threshold, codes=codes[:, field])
+        for field in range(values.shape[1])
+    ]
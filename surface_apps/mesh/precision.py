@@ -0,0 +1,101 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+INDEX_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def index_dtype(n_vertices: int) -> np.dtype:
+    """
+    Smallest unsigned integer type able to index a number of vertices.
+
+    :param n_vertices: Number of vertices.
+    """
+    for dtype in INDEX_DTYPES:
+        if n_vertices - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    raise ValueError(f"Too many vertices to index: {n_vertices}.")
+
+
+@dataclass(slots=True)
+class CompactMesh:
+    """
+    Triangulated surface stored as float32 offsets from a float64 origin,
+    with cells in the smallest integer type that fits.
+
+    On projected coordinates (e.g. UTM northings around 7e6) float32 alone
+    only resolves about half a meter, while offsets from a local origin
+    keep sub-millimeter precision over extents of several kilometers.
+
+    :param origin: Local origin, shape (3,).
+    :param offsets: Vertices relative to the origin, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    """
+
+    origin: np.ndarray
+    offsets: np.ndarray
+    cells: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls, vertices: np.ndarray, cells: np.ndarray, tolerance: float = 1e-3
+    ) -> CompactMesh:
+        """
+        Compact a surface, verifying the precision of the conversion.
+
+        :param vertices: Array of vertices, shape (n_vertices, 3).
+        :param cells: Array of triangles, shape (n_cells, 3).
+        :param tolerance: Maximum round-trip error on the vertices, in
+            coordinate units.
+
+        :raises ValueError: If the round-trip error exceeds the tolerance.
+        """
+        vertices = np.asarray(vertices, dtype=np.float64)
+        origin = (vertices.min(axis=0) + vertices.max(axis=0)) / 2.0
+        mesh = cls(
+            origin=origin,
+            offsets=(vertices - origin).astype(np.float32),
+            cells=np.asarray(cells).astype(index_dtype(vertices.shape[0])),
+        )
+
+        error = mesh.round_trip_error(vertices)
+        if error > tolerance:
+            raise ValueError(
+                f"Round-trip error of float32 vertices ({error:.3g}) exceeds "
+                f"the tolerance ({tolerance:.3g})."
+            )
+
+        return mesh
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """Vertices in float64 world coordinates."""
+        return self.origin + self.offsets.astype(np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays."""
+        return self.origin.nbytes + self.offsets.nbytes + self.cells.nbytes
+
+    def round_trip_error(self, vertices: np.ndarray) -> float:
+        """
+        Largest coordinate difference between the compact and original
+        vertices.
+
+        :param vertices: Original vertices, shape (n_vertices, 3).
+        """
+        if vertices.size == 0:
+            return 0.0
+
+        return float(np.abs(self.vertices - vertices).max())
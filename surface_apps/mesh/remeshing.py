@@ -0,0 +1,386 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.mesh.attributes import face_normals, vertex_normals
+from surface_apps.mesh.components import remove_unused_vertices
+from surface_apps.mesh.distance import TriangleTree
+from surface_apps.mesh.smoothing import umbrella_operator
+
+MAX_ROUNDS = 10
+"""Maximum number of rounds of independent operations per pass."""
+
+
+def independent_operations(
+    owners: np.ndarray, items: np.ndarray, n_items: int
+) -> np.ndarray:
+    """
+    Maximal set of operations touching disjoint items, e.g. vertices or
+    triangles, favouring the operations of lowest rank.
+
+    At each round, items go to the live operation of lowest rank touching
+    them, operations holding all their items are selected and the others
+    touching a selected item are discarded (Luby, 1986).
+
+    :param owners: Rank of the operation touching each item.
+    :param items: Items touched, paired with owners.
+    :param n_items: Total number of items.
+
+    :return: Whether each operation, by rank, is selected.
+    """
+    n_operations = int(owners.max(initial=-1)) + 1
+    selected = np.zeros(n_operations, dtype=bool)
+    alive = np.ones(n_operations, dtype=bool)
+    taken = np.zeros(n_items, dtype=bool)
+    while alive.any():
+        live = alive[owners]
+        claims = np.full(n_items, n_operations)
+        np.minimum.at(claims, items[live], owners[live])
+        lost = ~alive.copy()
+        np.logical_or.at(lost, owners, claims[items] != owners)
+
+        selected |= ~lost
+        taken[items[~lost[owners]]] = True
+        np.logical_or.at(lost, owners, taken[items])
+        alive &= ~lost & ~selected
+
+    return selected
+
+
+def _normals(vertices: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """Unit vertex normals, the reference to detect folds against."""
+    return vertex_normals(vertices, cells, *face_normals(vertices, cells))
+
+
+def split_long_edges(
+    vertices: np.ndarray, cells: np.ndarray, high: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split the edges longer than a length at their midpoint.
+
+    Triangles with one, two or three split edges are replaced by two,
+    three or four triangles, so that all long edges are split at once.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param high: Maximum edge length.
+
+    :return: Vertices and triangles with the long edges split.
+    """
+    topology = MeshTopology(cells, vertices.shape[0])
+    edges = topology.edges
+    long = np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1) > high
+    if not long.any():
+        return vertices, cells
+
+    midpoints = np.full(edges.shape[0], -1, dtype=np.int64)
+    midpoints[long] = vertices.shape[0] + np.arange(np.count_nonzero(long))
+    vertices = np.r_[vertices, vertices[edges[long]].mean(axis=1)]
+
+    # Mid-vertex of each cell edge (k, k + 1), -1 where not split
+    middles = midpoints[topology.cell_edges]
+    split = middles >= 0
+    n_split = split.sum(axis=1)
+    # Rotate the corners: a single split edge first, a single kept edge last
+    rotation = np.where(
+        n_split == 1,
+        np.argmax(split, axis=1),
+        np.where(n_split == 2, (np.argmin(split, axis=1) + 1) % 3, 0),
+    )
+    index = (rotation[:, None] + np.arange(3)) % 3
+    corners = np.take_along_axis(cells.astype(np.int64), index, axis=1)
+    middles = np.take_along_axis(middles, index, axis=1)
+    a, b, c = corners.T
+    m_ab, m_bc, m_ca = middles.T
+
+    one, two, three = n_split == 1, n_split == 2, n_split == 3
+    # Split the quad (a, m_ab, m_bc, c) of two-split cells by its shortest diagonal
+    short = np.linalg.norm(vertices[a] - vertices[m_bc], axis=1) <= np.linalg.norm(
+        vertices[m_ab] - vertices[c], axis=1
+    )
+    pieces = [
+        cells[n_split == 0],
+        np.c_[a, m_ab, c][one],
+        np.c_[m_ab, b, c][one],
+        np.c_[m_ab, b, m_bc][two],
+        np.where(short[:, None], np.c_[a, m_ab, m_bc], np.c_[a, m_ab, c])[two],
+        np.where(short[:, None], np.c_[a, m_bc, c], np.c_[m_ab, m_bc, c])[two],
+        np.c_[a, m_ab, m_ca][three],
+        np.c_[m_ab, b, m_bc][three],
+        np.c_[m_ca, m_bc, c][three],
+        np.c_[m_ab, m_bc, m_ca][three],
+    ]
+
+    return vertices, np.vstack(pieces).astype(np.int64)
+
+
+def collapse_short_edges(  # pylint: disable=too-many-locals
+    vertices: np.ndarray, cells: np.ndarray, low: float, high: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Collapse the interior edges shorter than a length, shortest first.
+
+    An edge is collapsed into its second vertex if no edge longer than
+    ``high`` is created, no triangle flips and the surface stays manifold.
+    Independent collapses are applied by rounds. Open boundaries are left
+    unchanged.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param low: Minimum edge length.
+    :param high: Maximum edge length.
+
+    :return: Vertices and triangles with the short edges collapsed; unused
+        vertices are kept.
+    """
+    n_vertices = vertices.shape[0]
+    cells = cells.astype(np.int64)
+    for _ in range(MAX_ROUNDS):
+        topology = MeshTopology(cells, n_vertices)
+        edges, counts = topology.edges, topology.counts
+        valence = topology.valence
+        fixed = topology.boundary_vertices
+        normals = _normals(vertices, cells)
+
+        lengths = np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1)
+        short = (lengths < low) & (counts == 2)
+        # Both directions, but interior vertices only collapse into boundaries
+        candidates = np.r_[
+            np.flatnonzero(short & ~fixed[edges[:, 0]]),
+            -1 - np.flatnonzero(short & ~fixed[edges[:, 1]]),
+        ]
+        if candidates.size == 0:
+            break
+
+        reverse = candidates < 0
+        candidates = np.where(reverse, -1 - candidates, candidates)
+        order = np.argsort(lengths[candidates], kind="stable")
+        candidates, reverse = candidates[order], reverse[order]
+        source = np.where(reverse, edges[candidates, 1], edges[candidates, 0])
+        target = np.where(reverse, edges[candidates, 0], edges[candidates, 1])
+
+        # Triangles around the source, with the source moved to the target
+        owner, triangle = topology.vertex_cells(source)
+        corners = cells[triangle]
+        kept = ~(corners == target[owner, None]).any(axis=1)
+        moved = np.where(corners == source[owner, None], target[owner, None], corners)
+
+        new = np.cross(
+            vertices[moved[:, 1]] - vertices[moved[:, 0]],
+            vertices[moved[:, 2]] - vertices[moved[:, 0]],
+        )
+        flipped = kept & (np.einsum("ij,ij->i", normals[source[owner]], new) <= 0)
+
+        others = moved.ravel()
+        others_owner = np.repeat(owner, 3)
+        stretched = (
+            np.linalg.norm(vertices[others] - vertices[target[others_owner]], axis=1)
+            > high
+        )
+
+        # Link condition: the source and target share exactly two neighbours
+        ring = corners.ravel()
+        pairs = np.unique(
+            (others_owner * n_vertices + ring)[
+                (ring != source[others_owner]) & (ring != target[others_owner])
+            ]
+        )
+        pair_owner, neighbour = pairs // n_vertices, pairs % n_vertices
+        common = topology.find_edges(neighbour, target[pair_owner]) >= 0
+        shared = np.bincount(pair_owner, weights=common, minlength=candidates.size)
+
+        # Vertices losing an edge keep at least 3, or 2 on open boundaries
+        minimum = np.where(fixed, 2, 3)
+        invalid = (valence[source] <= 3) | (valence[target] <= minimum[target])
+        invalid |= shared != 2
+        np.logical_or.at(
+            invalid,
+            pair_owner[common],
+            valence[neighbour[common]] <= minimum[neighbour[common]],
+        )
+        np.logical_or.at(invalid, owner, flipped)
+        np.logical_or.at(invalid, others_owner, stretched)
+
+        valid = np.flatnonzero(~invalid)
+        if valid.size == 0:
+            break
+
+        # Collapses whose sources have disjoint closed rings are independent
+        rank = np.cumsum(~invalid) - 1
+        claim = ~invalid[owner]
+        accepted = valid[
+            independent_operations(
+                np.repeat(rank[owner[claim]], 3), corners[claim].ravel(), n_vertices
+            )
+        ]
+
+        mapping = np.arange(n_vertices)
+        mapping[source[accepted]] = target[accepted]
+        cells = mapping[cells]
+        cells = cells[
+            (cells[:, 0] != cells[:, 1])
+            & (cells[:, 1] != cells[:, 2])
+            & (cells[:, 2] != cells[:, 0])
+        ]
+
+    return vertices, cells
+
+
+def flip_edges(vertices: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """
+    Flip interior edges that bring the valences closer to 6, or 4 on open
+    boundaries, without folding the surface.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+
+    :return: Triangles with the edges flipped.
+    """
+    n_vertices = vertices.shape[0]
+    cells = cells.astype(np.int64).copy()
+    for _ in range(MAX_ROUNDS):
+        topology = MeshTopology(cells, n_vertices)
+        valence = topology.valence
+        target = np.where(topology.boundary_vertices, 4, 6)
+        normals = _normals(vertices, cells)
+
+        twins = topology.twins
+        half = np.flatnonzero(twins > np.arange(twins.shape[0]))
+        first, second = half // 3, twins[half] // 3
+        a = cells[first, half % 3]
+        b = cells[first, (half + 1) % 3]
+        c = cells[first, (half + 2) % 3]
+        d = cells[second, (twins[half] + 2) % 3]
+
+        corners = np.c_[a, b, c, d]
+        before = ((valence[corners] - target[corners]) ** 2).sum(axis=1)
+        after = ((valence[corners] + np.r_[-1, -1, 1, 1] - target[corners]) ** 2).sum(
+            axis=1
+        )
+
+        normal = normals[a] + normals[b] + normals[c] + normals[d]
+        left = np.cross(vertices[d] - vertices[a], vertices[c] - vertices[a])
+        right = np.cross(vertices[b] - vertices[d], vertices[c] - vertices[d])
+        candidates = np.flatnonzero(
+            (after < before)
+            & (c != d)
+            & (topology.find_edges(c, d) < 0)
+            & (valence[a] > 3)
+            & (valence[b] > 3)
+            & (np.einsum("ij,ij->i", left, normal) > 0)
+            & (np.einsum("ij,ij->i", right, normal) > 0)
+        )
+        if candidates.size == 0:
+            break
+
+        candidates = candidates[
+            np.argsort(after[candidates] - before[candidates], kind="stable")
+        ]
+        # Flips sharing a vertex would change its valence twice
+        won = independent_operations(
+            np.repeat(np.arange(candidates.size), 4),
+            corners[candidates].ravel(),
+            n_vertices,
+        )
+        flips = candidates[won]
+        cells[first[flips]] = np.c_[a[flips], d[flips], c[flips]]
+        cells[second[flips]] = np.c_[d[flips], b[flips], c[flips]]
+
+    return cells
+
+
+def relax(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    surface: TriangleTree,
+    factor: float = 0.5,
+) -> np.ndarray:
+    """
+    Move vertices toward the average of their neighbours in the tangent
+    plane, then back onto the original surface. Open boundaries are fixed,
+    and the corners of triangles that would fold are only projected.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param surface: Spatial index of the original surface.
+    :param factor: Fraction of the tangential displacement applied.
+
+    :return: Relaxed vertices.
+    """
+    n_vertices = vertices.shape[0]
+    topology = MeshTopology(cells, n_vertices)
+    normals = _normals(vertices, cells)
+    step = umbrella_operator(topology.vertex_adjacency) @ vertices - vertices
+    step -= np.einsum("ij,ij->i", step, normals)[:, None] * normals
+
+    free = np.flatnonzero(
+        ~topology.boundary_vertices
+        & (np.bincount(cells.ravel(), minlength=n_vertices) > 0)
+    )
+    projected, relaxed = vertices.copy(), vertices.copy()
+    _, projected[free], _ = surface.query(vertices[free])
+    _, relaxed[free], _ = surface.query(vertices[free] + factor * step[free])
+
+    reference = normals[cells].sum(axis=1)
+    for _ in range(MAX_ROUNDS):
+        corners = relaxed[cells]
+        new = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        folded = np.unique(cells[np.einsum("ij,ij->i", new, reference) <= 0])
+        folded = folded[(relaxed[folded] != projected[folded]).any(axis=1)]
+        if folded.size == 0:
+            break
+        relaxed[folded] = projected[folded]
+
+    return relaxed
+
+
+def remesh(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    target_length: float,
+    iterations: int = 10,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Isotropic remeshing to a target edge length, after Botsch and Kobbelt
+    (2004).
+
+    Each iteration splits edges longer than 4/3 of the target, collapses
+    edges shorter than 4/5 of it, flips edges to regularize valences and
+    relaxes the vertices tangentially, projected back onto the input
+    surface. Open boundaries are only refined.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of consistently oriented triangles, shape (n_cells, 3).
+    :param target_length: Target edge length.
+    :param iterations: Number of iterations.
+
+    :return: Vertices and triangles of the remeshed surface.
+    """
+    if target_length <= 0:
+        raise ValueError(f"Target edge length must be positive. {target_length}")
+
+    surface = TriangleTree(vertices, cells)
+    low, high = 0.8 * target_length, 4.0 / 3.0 * target_length
+    vertices = np.asarray(vertices, dtype=np.float64)
+    cells = np.asarray(cells, dtype=np.int64)
+    for _ in range(iterations):
+        for _ in range(MAX_ROUNDS):
+            n_cells = cells.shape[0]
+            vertices, cells = split_long_edges(vertices, cells, high)
+            if cells.shape[0] == n_cells:
+                break
+        vertices, cells = collapse_short_edges(vertices, cells, low, high)
+        vertices, cells, _ = remove_unused_vertices(vertices, cells)
+        cells = flip_edges(vertices, cells)
+        vertices = relax(vertices, cells, surface)
+
+    return vertices, cells
@@ -0,0 +1,172 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from surface_apps.mesh.adjacency import MeshTopology
+
+
+def umbrella_operator(adjacency: csr_matrix) -> csr_matrix:
+    """
+    Row-normalized adjacency, averaging the neighbours of each vertex.
+
+    :param adjacency: Symmetric vertex adjacency matrix.
+
+    :return: Sparse averaging operator.
+    """
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+
+    return csr_matrix(diags(inverse) @ adjacency)
+
+
+def step_weights(
+    topology: MeshTopology,
+    weights: np.ndarray | None = None,
+    fix_boundary: bool = True,
+) -> np.ndarray:
+    """
+    Per-vertex scaling of the smoothing step.
+
+    :param topology: Connectivity of the surface.
+    :param weights: Feature-preserving weights between 0 (fixed) and 1 (free).
+    :param fix_boundary: Keep vertices on open boundaries in place.
+
+    :return: Array of weights, shape (n_vertices, 1).
+    """
+    n_vertices = topology.n_vertices
+    if weights is None:
+        values = np.ones(n_vertices)
+    else:
+        if weights.shape != (n_vertices,):
+            raise ValueError(
+                f"Weights must be of shape ({n_vertices},). "
+                f"Array of shape {weights.shape} provided."
+            )
+        values = np.clip(np.nan_to_num(weights, nan=0.0), 0.0, 1.0)
+
+    if fix_boundary:
+        values = np.where(topology.boundary_vertices, 0.0, values)
+
+    return values[:, None]
+
+
+def smooth(
+    vertices: np.ndarray,
+    operator: csr_matrix,
+    factors: list[float],
+    iterations: int,
+    weights: np.ndarray,
+) -> np.ndarray:
+    """
+    Apply successive umbrella steps ``v += f * w * (L @ v - v)``.
+
+    Computations stay in float32 for float32 vertices, e.g. offsets of a
+    :class:`~surface_apps.mesh.precision.CompactMesh`.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param operator: Averaging operator from :func:`umbrella_operator`.
+    :param factors: Step factors applied in sequence at every iteration.
+    :param iterations: Number of iterations.
+    :param weights: Per-vertex weights, shape (n_vertices, 1).
+
+    :return: Smoothed vertices.
+    """
+    dtype = np.result_type(vertices.dtype, np.float32)
+    smoothed = np.array(vertices, dtype=dtype)
+    origin = smoothed.mean(axis=0)
+    smoothed -= origin
+    operator = operator.astype(dtype)
+    weights = weights.astype(dtype)
+
+    for _ in range(iterations):
+        for factor in factors:
+            smoothed += (factor * weights) * (operator @ smoothed - smoothed)
+
+    return smoothed + origin
+
+
+def laplacian_smoothing(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    iterations: int = 10,
+    factor: float = 0.5,
+    weights: np.ndarray | None = None,
+    fix_boundary: bool = True,
+) -> np.ndarray:
+    """
+    Laplacian smoothing of a triangulated surface.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param iterations: Number of iterations.
+    :param factor: Step factor between 0 and 1.
+    :param weights: Feature-preserving weights between 0 (fixed) and 1 (free).
+    :param fix_boundary: Keep vertices on open boundaries in place.
+
+    :return: Smoothed vertices.
+    """
+    if not 0 < factor <= 1:
+        raise ValueError("Smoothing factor must be in the interval (0, 1].")
+
+    topology = MeshTopology(cells, vertices.shape[0])
+    operator = umbrella_operator(topology.vertex_adjacency)
+
+    return smooth(
+        vertices,
+        operator,
+        [factor],
+        iterations,
+        step_weights(topology, weights, fix_boundary),
+    )
+
+
+def taubin_smoothing(
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    iterations: int = 10,
+    factor: float = 0.5,
+    pass_band: float = 0.1,
+    weights: np.ndarray | None = None,
+    fix_boundary: bool = True,
+) -> np.ndarray:
+    """
+    Taubin (lambda|mu) smoothing of a triangulated surface, alternating
+    shrinking and inflating steps to avoid the volume loss of Laplacian
+    smoothing.
+
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param iterations: Number of iterations.
+    :param factor: Shrinking step factor (lambda) between 0 and 1.
+    :param pass_band: Pass-band frequency used to derive the inflating factor.
+    :param weights: Feature-preserving weights between 0 (fixed) and 1 (free).
+    :param fix_boundary: Keep vertices on open boundaries in place.
+
+    :return: Smoothed vertices.
+    """
+    if not 0 < factor <= 1:
+        raise ValueError("Smoothing factor must be in the interval (0, 1].")
+
+    if not 0 < pass_band < 1 / factor:
+        raise ValueError(f"Pass band must be in the interval (0, {1 / factor}).")
+
+    inflate = 1.0 / (pass_band - 1.0 / factor)
+    topology = MeshTopology(cells, vertices.shape[0])
+    operator = umbrella_operator(topology.vertex_adjacency)
+
+    return smooth(
+        vertices,
+        operator,
+        [factor, inflate],
+        iterations,
+        step_weights(topology, weights, fix_boundary),
+    )
@@ -0,0 +1,123 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.mesh.decimation import lod_pyramid
+from surface_apps.mesh.precision import CompactMesh
+
+
+def load_surface(
+    surface: Surface, compact: bool = False, tolerance: float = 1e-3
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Arrays of a surface to compute on.
+
+    :param surface: Input surface.
+    :param compact: Return float32 vertices relative to a local origin and
+        cells in the smallest integer type that fits.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+
+    :return: Origin, vertices relative to the origin and cells.
+    """
+    if surface.vertices is None or surface.cells is None:
+        raise ValueError(f"Surface '{surface.name}' has no vertices or cells.")
+
+    if compact:
+        mesh = CompactMesh.from_arrays(surface.vertices, surface.cells, tolerance)
+        return mesh.origin, mesh.offsets, mesh.cells
+
+    return np.zeros(3), surface.vertices, surface.cells
+
+
+def create_surface(  # pylint: disable=too-many-arguments
+    workspace: Workspace,
+    vertices: np.ndarray,
+    cells: np.ndarray,
+    compact: bool = False,
+    tolerance: float = 1e-3,
+    lod: Sequence[float] = (),
+    **kwargs,
+) -> Surface:
+    """
+    Write a surface to a workspace.
+
+    With levels of detail, the surface and its decimated versions are
+    grouped under a container named after the surface, e.g. 'Shell 100%',
+    'Shell 25%' and 'Shell 5%' in the group 'Shell'.
+
+    :param workspace: Target workspace.
+    :param vertices: Array of vertices, shape (n_vertices, 3).
+    :param cells: Array of triangles, shape (n_cells, 3).
+    :param compact: Round the vertices to float32 offsets from a local
+        origin, so that the output matches computations done in compact
+        precision.
+    :param tolerance: Maximum round-trip error allowed for compact vertices.
+    :param lod: Fractions of the triangles kept by the decimated levels of
+        detail, in (0, 1).
+    :param kwargs: Additional attributes of the surface, e.g. name or parent.
+
+    :return: New surface, at full resolution.
+    """
+    if not lod:
+        if compact:
+            vertices = CompactMesh.from_arrays(vertices, cells, tolerance).vertices
+
+        return Surface.create(workspace, vertices=vertices, cells=cells, **kwargs)
+
+    name = kwargs.pop("name", "Surface")
+    group = ContainerGroup.create(
+        workspace, name=name, parent=kwargs.pop("parent", None)
+    )
+    surface = create_surface(
+        workspace,
+        vertices,
+        cells,
+        compact=compact,
+        tolerance=tolerance,
+        name=f"{name} 100%",
+        parent=group,
+        **kwargs,
+    )
+    for fraction, level_vertices, level_cells in lod_pyramid(vertices, cells, lod):
+        create_surface(
+            workspace,
+            level_vertices,
+            level_cells,
+            compact=compact,
+            tolerance=tolerance,
+            name=f"{name} {100 * fraction:g}%",
+            parent=group,
+            **kwargs,
+        )
+
+    return surface
+
+
+def parse_lod(levels: str | None) -> list[float]:
+    """
+    Fractions of the levels of detail from comma-separated percentages.
+
+    :param levels: Percentages of the triangles kept, e.g. '25, 5, 1'; a
+        full-resolution level of 100 is ignored.
+
+    :return: Fractions in (0, 1), empty if no levels are given.
+    """
+    if not levels:
+        return []
+
+    percentages = [float(level) for level in levels.split(",") if level.strip()]
+
+    return [percentage / 100.0 for percentage in percentages if percentage != 100.0]
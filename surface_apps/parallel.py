@@ -0,0 +1,366 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from importlib.util import find_spec
+from queue import Full, Queue
+from typing import Any
+
+import numpy as np
+
+# Environment variables setting the defaults of 0 workers or threads
+WORKERS_VARIABLE = "SURFACE_APPS_WORKERS"
+THREADS_VARIABLE = "SURFACE_APPS_THREADS"
+
+# Thread pools of the BLAS and OpenMP runtimes used by numpy and scipy
+THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _environment_count(variable: str) -> int:
+    """Non-negative count set by an environment variable, 0 if unset."""
+    value = os.environ.get(variable, "").strip()
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise ValueError(f"{variable} must be a non-negative integer. '{value}'")
+
+    return int(value)
+
+
+def resolve_workers(workers: int) -> int:
+    """
+    Number of worker processes to start.
+
+    :param workers: Requested number of processes, 0 for the value of
+        ``SURFACE_APPS_WORKERS``, or one per core if it is not set.
+    """
+    if workers < 0:
+        raise ValueError(f"Number of workers must be positive. {workers} provided.")
+
+    return workers or _environment_count(WORKERS_VARIABLE) or os.cpu_count() or 1
+
+
+def resolve_threads(threads: int, workers: int) -> int:
+    """
+    Number of BLAS and OpenMP threads of each worker process.
+
+    :param threads: Requested number of threads, 0 for the value of
+        ``SURFACE_APPS_THREADS``, or the cores shared evenly between the
+        workers if it is not set.
+    :param workers: Number of worker processes.
+    """
+    if threads < 0:
+        raise ValueError(f"Number of threads must be positive. {threads} provided.")
+
+    workers = resolve_workers(workers)
+    return (
+        threads
+        or _environment_count(THREADS_VARIABLE)
+        or max((os.cpu_count() or 1) // workers, 1)
+    )
+
+
+@contextmanager
+def thread_limits(threads: int) -> Iterator[None]:
+    """
+    Cap the thread pools of the processes started in the context, by
+    setting the environment variables read by the BLAS and OpenMP
+    runtimes when they load.
+
+    The environment of the current process is restored on exit, so the
+    context should only wrap the calls starting processes. Runtimes
+    already loaded, e.g. in forked processes, are also capped when
+    threadpoolctl is installed; see :func:`_initialize_worker`.
+
+    :param threads: Number of threads per process.
+    """
+    previous = {variable: os.environ.get(variable) for variable in THREAD_VARIABLES}
+    os.environ.update({variable: str(threads) for variable in THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for variable, value in previous.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+
+def _initialize_worker(
+    threads: int, initializer: Callable[..., Any] | None, initargs: tuple
+):
+    """
+    Cap the thread pools of a worker process, then run its initializer.
+
+    threadpoolctl is an optional dependency. Without it, only the thread
+    variables of the environment cap the pools, which runtimes read when
+    they load: pools already loaded in the parent before a fork, e.g. on
+    Linux, keep their size in the worker.
+    """
+    os.environ.update({variable: str(threads) for variable in THREAD_VARIABLES})
+    if find_spec("threadpoolctl") is not None:
+        from threadpoolctl import (  # pylint: disable=import-outside-toplevel
+            threadpool_limits,
+        )
+
+        threadpool_limits(limits=threads)
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def runtime_summary(workers: int = 0, threads: int = 0) -> dict[str, Any]:
+    """
+    Threading settings of a run, e.g. to record along with its timings.
+
+    :param workers: Requested number of processes, as for
+        :func:`resolve_workers`.
+    :param threads: Requested number of threads per process, as for
+        :func:`resolve_threads`.
+
+    :return: Number of cores, resolved workers and threads per worker, the
+        thread variables of the environment and, if threadpoolctl is
+        installed, the thread pools loaded in the current process.
+    """
+    summary: dict[str, Any] = {
+        "cpu_count": os.cpu_count() or 1,
+        "workers": resolve_workers(workers),
+        "threads": resolve_threads(threads, workers),
+    }
+    summary.update(
+        {variable: os.environ.get(variable) for variable in THREAD_VARIABLES}
+    )
+    summary["thread_pools"] = None
+    if find_spec("threadpoolctl") is not None:
+        from threadpoolctl import (  # pylint: disable=import-outside-toplevel
+            threadpool_info,
+        )
+
+        summary["thread_pools"] = [
+            f"{pool.get('internal_api')}:{pool.get('num_threads')}"
+            for pool in threadpool_info()
+        ]
+
+    return summary
+
+
+def ordered_map(
+    function: Callable[..., Any],
+    tasks: Iterable[tuple],
+    workers: int = 1,
+    initializer: Callable[..., Any] | None = None,
+    initargs: tuple = (),
+    threads: int = 0,
+) -> Iterator[Any]:
+    """
+    Results of tasks in submission order, computed by a pool of processes.
+
+    Results do not depend on the number of workers nor on the order in
+    which they complete, as long as the tasks themselves do not: split the
+    work into tasks independently of the number of workers. Tasks are
+    submitted lazily, keeping at most two per worker in flight so that
+    their inputs are not all loaded at once. The BLAS and OpenMP thread
+    pools of the workers are capped, so that together they do not start
+    more threads than there are cores.
+
+    :param function: Function applied to the arguments of each task.
+    :param tasks: Arguments of the tasks.
+    :param workers: Number of processes, 0 for one per core, 1 to run in
+        the current process.
+    :param initializer: Function called once per process, e.g. to share
+        read-only state with all its tasks.
+    :param initargs: Arguments of the initializer.
+    :param threads: Number of BLAS and OpenMP threads per process, as for
+        :func:`resolve_threads`; ignored when running in the current
+        process.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for task in tasks:
+            yield function(*task)
+        return
+
+    threads = resolve_threads(threads, workers)
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_initialize_worker,
+        initargs=(threads, initializer, initargs),
+    ) as executor:
+        pending: deque = deque()
+        for task in tasks:
+            # Processes start on submission, the caller's environment is
+            # restored before yielding back to it
+            with thread_limits(threads):
+                pending.append(executor.submit(function, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+class Prefetcher:
+    """
+    Read the inputs of a sequence of items ahead, on a background thread.
+
+    All reads happen on a single reader thread, one item at a time, while
+    the consumer computes on the previous items. Workspace access from the
+    consumer, e.g. to write results, must hold :attr:`lock` so that HDF5
+    calls stay serialized.
+
+    :param read: Function reading the inputs of an item.
+    :param depth: Number of items read ahead of the consumer.
+    """
+
+    def __init__(self, read: Callable[[Any], Any], depth: int = 2):
+        if depth < 1:
+            raise ValueError(f"Prefetch depth must be positive. {depth} provided.")
+
+        self.read = read
+        self.depth = depth
+        self.lock = threading.Lock()
+
+    def __call__(self, items: Iterable[Any]) -> Iterator[tuple[Any, Any]]:
+        """
+        Items and their inputs, in order.
+
+        Errors raised by :attr:`read` are raised to the consumer.
+
+        :param items: Items to read, e.g. entities of a workspace.
+        """
+        queue: Queue = Queue(maxsize=self.depth)
+        stop = threading.Event()
+
+        def put(entry: tuple):
+            while not stop.is_set():
+                try:
+                    queue.put(entry, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def reader():
+            try:
+                for item in items:
+                    if stop.is_set():
+                        return
+                    with self.lock:
+                        inputs = self.read(item)
+                    put((item, inputs, None))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                put((None, None, error))
+            finally:
+                put((None, None, StopIteration()))
+
+        thread = threading.Thread(target=reader, name="prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item, inputs, error = queue.get()
+                if isinstance(error, StopIteration):
+                    return
+                if error is not None:
+                    raise error
+                yield item, inputs
+        finally:
+            stop.set()
+            thread.join()
+
+
+def merge_meshes(
+    meshes: Sequence[tuple[np.ndarray, np.ndarray]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate meshes in the given order, e.g. the task order of
+    :func:`ordered_map`, so that the merged arrays are reproducible.
+
+    :param meshes: Vertices and triangles of each mesh.
+
+    :return: Merged vertices and triangles.
+    """
+    if not meshes:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32)
+
+    offsets = np.cumsum([0] + [vertices.shape[0] for vertices, _ in meshes])
+    vertices = np.vstack([vertices for vertices, _ in meshes])
+    dtype = np.int32 if offsets[-1] <= np.iinfo(np.int32).max else np.int64
+    cells = np.vstack(
+        [
+            cells.astype(dtype) + offset
+            for (_, cells), offset in zip(meshes, offsets[:-1])
+        ]
+    )
+
+    return vertices, cells
+
+
+def tree_sum(
+    parts: Sequence[np.ndarray] | np.ndarray,
+    labels: np.ndarray | None = None,
+    minlength: int = 0,
+) -> np.ndarray:
+    """
+    Sum of partial results by pairs, in a fixed order.
+
+    Floating-point additions are not associative, so partial sums, e.g. of
+    tasks or of the triangles of a mesh merged from them, are combined by
+    pairs of consecutive parts whatever computed them. Summing by pairs
+    also bounds the rounding error to O(log n) instead of O(n) for a
+    running sum.
+
+    :param parts: Partial sums, in task order, stacked along the first axis.
+    :param labels: Non-negative group of each part, to sum the parts of
+        each group separately, in their order, like :func:`numpy.bincount`.
+    :param minlength: Minimum number of groups.
+
+    :return: Sum of the parts, or of the parts of each group, zero for
+        groups without parts.
+    """
+    values = np.asarray(parts, dtype=float)
+    if labels is None:
+        if values.shape[0] == 0:
+            raise ValueError("At least one partial sum must be provided.")
+        return tree_sum(values, np.zeros(values.shape[0], dtype=int))[0]
+
+    order = np.argsort(labels, kind="stable")
+    values, labels = values[order], np.asarray(labels)[order]
+    sums = np.zeros(
+        (max(int(labels.max(initial=-1)) + 1, minlength),) + values.shape[1:]
+    )
+    while values.shape[0] > 0:
+        index = np.arange(values.shape[0])
+        first = np.r_[True, labels[1:] != labels[:-1]]
+        rank = index - np.maximum.accumulate(np.where(first, index, 0))
+        last = np.r_[~first[1:], False]
+        done = first & ~last
+        sums[labels[done]] = values[done]
+
+        # Pairs of consecutive parts within groups, a trailing odd part kept
+        left = ~done & (rank % 2 == 0)
+        paired = left & last
+        combined = values.copy()
+        combined[paired] += values[np.flatnonzero(paired) + 1]
+        values, labels = combined[left], labels[left]
+
+    return sums
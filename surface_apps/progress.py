@@ -0,0 +1,272 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from queue import Empty, Queue
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+POLL_INTERVAL = 100  # milliseconds
+
+
+class JobCancelled(Exception):
+    """Raised in the worker when the user cancels a running job."""
+
+
+class ProgressReporter:
+    """
+    Thread-safe channel between a compute worker and the progress front-end.
+
+    The worker reports progress with :meth:`advance` and polls for
+    cancellation at chunk boundaries with :meth:`check`.
+
+    :param total: Number of steps expected for the whole job.
+    """
+
+    def __init__(self, total: int = 1):
+        self.queue: Queue[tuple[float, str]] = Queue()
+        self.total = total
+        self._count = 0
+        self._cancel = threading.Event()
+
+    @property
+    def total(self) -> int:
+        """Number of steps expected for the whole job."""
+        return self._total
+
+    @total.setter
+    def total(self, value: int):
+        if value < 1:
+            raise ValueError("Total number of steps must be at least 1.")
+        self._total = int(value)
+
+    @property
+    def count(self) -> int:
+        """Number of steps completed so far."""
+        return self._count
+
+    @property
+    def fraction(self) -> float:
+        """Fraction of the job completed, between 0 and 1."""
+        return min(self._count / self.total, 1.0)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self._cancel.is_set()
+
+    def advance(self, steps: int = 1, message: str = ""):
+        """
+        Record completed steps and notify the front-end.
+
+        :param steps: Number of steps completed since the last call.
+        :param message: Status message to display.
+        """
+        self._count += steps
+        self.queue.put((self.fraction, message))
+
+    def cancel(self):
+        """Request cancellation; honoured at the next :meth:`check`."""
+        self._cancel.set()
+
+    def check(self):
+        """
+        Raise :class:`JobCancelled` if cancellation was requested.
+
+        Workers should call this at chunk boundaries only, so that completed
+        chunks are never left half-written.
+        """
+        if self.cancelled:
+            raise JobCancelled("Job cancelled by user.")
+
+    def chunks(self, items: Iterable[T], message: str = "") -> Iterator[T]:
+        """
+        Iterate over chunks of work, checking for cancellation before and
+        reporting progress after each chunk.
+
+        :param items: Chunks of work to process.
+        :param message: Status message, formatted with ``count`` and ``total``.
+        """
+        for item in items:
+            self.check()
+            yield item
+            self.advance(
+                message=message.format(count=self._count + 1, total=self.total)
+            )
+
+    def drain(self) -> tuple[float, str] | None:
+        """Return the latest queued update, discarding older ones."""
+        update = None
+        while True:
+            try:
+                update = self.queue.get_nowait()
+            except Empty:
+                return update
+
+
+class ProgressWorker(threading.Thread):
+    """
+    Daemon thread running a compute function with a :class:`ProgressReporter`.
+
+    :param func: Function called as ``func(reporter, *args, **kwargs)``.
+    :param reporter: Progress channel shared with the front-end.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        reporter: ProgressReporter,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(daemon=True)
+        self.func = func
+        self.reporter = reporter
+        self.args = args
+        self.kwargs = kwargs
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def run(self):
+        try:
+            self.result = self.func(self.reporter, *self.args, **self.kwargs)
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            self.error = error
+
+    def outcome(self) -> Any:
+        """Return the result of the job, or re-raise its error in the caller."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ProgressWindow:  # pragma: no cover
+    """
+    Tkinter window showing a progress bar, a status line and a cancel button.
+
+    The window polls the reporter queue with ``after`` callbacks so that the
+    event loop never blocks on the worker.
+
+    :param worker: Running worker to monitor.
+    :param title: Window title.
+    :param keep_open: Keep the window open once the job completes, until the
+        user closes it.
+    """
+
+    def __init__(self, worker: ProgressWorker, title: str, keep_open=False):
+        import tkinter as tk  # pylint: disable=import-outside-toplevel
+        from tkinter import ttk  # pylint: disable=import-outside-toplevel
+
+        self.worker = worker
+        self.keep_open = keep_open
+        self.root = tk.Tk()
+        self.root.title(title)
+        self.root.geometry("360x120")
+        self.root.resizable(False, False)
+        self.root.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.status = tk.StringVar(value="Starting...")
+        tk.Label(self.root, textvariable=self.status).pack(pady=(10, 5))
+        self.bar = ttk.Progressbar(self.root, length=320, maximum=1.0)
+        self.bar.pack(pady=5)
+        self.button = tk.Button(self.root, text="Cancel", command=self.cancel)
+        self.button.pack(pady=5)
+
+    def cancel(self):
+        """Request cancellation, or close the window if the job is over."""
+        if not self.worker.is_alive():
+            self.root.destroy()
+            return
+
+        self.worker.reporter.cancel()
+        self.status.set("Cancelling at the next checkpoint...")
+        self.button.configure(state="disabled")
+
+    def poll(self):
+        update = self.worker.reporter.drain()
+        if update is not None:
+            self.bar["value"], message = update
+            if message:
+                self.status.set(message)
+
+        if self.worker.is_alive():
+            self.root.after(POLL_INTERVAL, self.poll)
+        elif self.keep_open and self.worker.error is None:
+            self.button.configure(text="Close", state="normal")
+        else:
+            self.root.destroy()
+
+    def show(self):
+        """Run the event loop until the job finishes or is cancelled."""
+        self.root.after(POLL_INTERVAL, self.poll)
+        self.root.mainloop()
+
+
+def _report_to_console(worker: ProgressWorker):
+    """Print progress updates until the worker completes."""
+    alive = True
+    while alive:
+        worker.join(POLL_INTERVAL / 1000)
+        alive = worker.is_alive()
+        update = worker.reporter.drain()
+        if update is not None:
+            fraction, message = update
+            sys.stdout.write(f"[{fraction:6.1%}] {message}\n")
+
+
+def run_with_progress(
+    func: Callable[..., T],
+    *args,
+    title: str = "surface-apps",
+    total: int = 1,
+    gui: bool = True,
+    keep_open: bool = False,
+    **kwargs,
+) -> T:
+    """
+    Run a compute function in a worker thread while reporting its progress.
+
+    The function is called as ``func(reporter, *args, **kwargs)`` and should
+    iterate over its chunks with :meth:`ProgressReporter.chunks`. A tkinter
+    window is shown if a display is available, otherwise progress is printed
+    to the console.
+
+    :param func: Compute function.
+    :param title: Title of the progress window.
+    :param total: Number of chunks expected.
+    :param gui: Show a tkinter window rather than console messages.
+    :param keep_open: Keep the window open once the job completes.
+
+    :return: Result of the compute function.
+
+    :raises JobCancelled: If the user cancelled the job.
+    """
+    worker = ProgressWorker(func, ProgressReporter(total), *args, **kwargs)
+    worker.start()
+
+    window = None
+    if gui:
+        try:
+            window = ProgressWindow(worker, title, keep_open=keep_open)
+        except Exception:  # pylint: disable=broad-exception-caught
+            window = None
+
+    if window is not None:  # pragma: no cover
+        window.show()
+        if worker.is_alive():
+            worker.reporter.cancel()
+    else:
+        _report_to_console(worker)
+
+    worker.join()
+    return worker.outcome()
@@ -0,0 +1,307 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from copy import copy, deepcopy
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar
+
+import geoh5py
+from geoh5py.shared.exceptions import BaseValidationError, JSONParameterValidationError
+from geoh5py.ui_json import InputFile
+from geoh5py.workspace import Workspace
+
+from surface_apps import assets_path
+
+# Form members edited by users; all other members are fixed by the template
+DYNAMIC_MEMBERS = ("value", "enabled", "isValue", "property")
+
+# Bumped whenever the layout of the cached schemas changes
+SCHEMA_FORMAT = 1
+
+
+def template_path(name: str) -> Path:
+    """
+    Path to a ui.json template of the assets.
+
+    :param name: Template name, without the '.ui.json' extension.
+    """
+    file_path = assets_path() / "uijson" / f"{name}.ui.json"
+    if not file_path.is_file():
+        raise ValueError(f"No ui.json template named '{name}' in the assets.")
+
+    return file_path
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache folder, used when the assets are not writable."""
+    root = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    return (Path(root) if root else Path.home() / ".cache") / "surface-apps"
+
+
+def _static_members(form: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in form.items() if key not in DYNAMIC_MEMBERS}
+
+
+@dataclass(slots=True)
+class CompiledSchema:
+    """
+    Template forms already parsed by geoh5py.
+
+    Parsing a form converts every string of its members to None, inf, UUID
+    or Workspace, which dominates the reading time of templates with long
+    choice lists. Only the members fixed by the template are kept, so that
+    the result applies to any ui.json derived from the template.
+
+    :param digest: Hash of the template file content.
+    :param static: Raw fixed members of each form, for comparison.
+    :param forms: Parsed fixed members of each form.
+    """
+
+    digest: str
+    static: dict[str, dict[str, Any]]
+    forms: dict[str, dict[str, Any]]
+
+    @classmethod
+    def compile(cls, ui_json: dict[str, Any], digest: str) -> CompiledSchema:
+        """
+        Parse and validate the forms of a template.
+
+        :param ui_json: Raw content of the template.
+        :param digest: Hash of the template file content.
+        """
+        static = {
+            key: _static_members(form)
+            for key, form in ui_json.items()
+            if isinstance(form, dict)
+        }
+        forms = {}
+        for key, members in static.items():
+            try:
+                InputFile.ui_validation(ui_json[key])
+            except tuple(BaseValidationError.__subclasses__()) as error:
+                raise JSONParameterValidationError(key, error.args[0]) from error
+
+            forms[key] = InputFile.numify(deepcopy(members))
+
+        return cls(digest, static, forms)
+
+    def matches(self, key: str, form: Any) -> bool:
+        """Whether a form only differs from the template by its user values."""
+        return (
+            isinstance(form, dict)
+            and key in self.static
+            and _static_members(form) == self.static[key]
+        )
+
+
+class SchemaCache:
+    """
+    Cache of compiled ui.json templates, in memory and on disk.
+
+    Schemas are pickled next to the assets, or in the user cache folder if
+    the assets are read-only. A cached schema is reused as long as the
+    modification time and size of its template are unchanged, or else if
+    the content hash still matches.
+
+    :param folder: Cache folder, by default next to the assets with the user
+        cache folder as fallback.
+    """
+
+    def __init__(self, folder: str | Path | None = None):
+        self._folder = None if folder is None else Path(folder)
+        self._memory: dict[Path, tuple[tuple[int, int], CompiledSchema]] = {}
+
+    @property
+    def folders(self) -> list[Path]:
+        """Candidate cache folders, by order of preference."""
+        if self._folder is not None:
+            return [self._folder]
+
+        return [assets_path() / ".cache", user_cache_dir()]
+
+    def get(self, file_path: str | Path) -> CompiledSchema:
+        """
+        Compiled schema of a template, compiled once per version of the file.
+
+        :param file_path: Path to the ui.json template.
+        """
+        file_path = Path(file_path).resolve()
+        status = file_path.stat()
+        stamp = (status.st_mtime_ns, status.st_size)
+
+        cached = self._memory.get(file_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        schema = self._read(file_path, stamp)
+        if schema is None:
+            content = file_path.read_bytes()
+            digest = hashlib.sha1(content).hexdigest()
+            schema = self._read(file_path, stamp, digest)
+
+            if schema is None:
+                schema = CompiledSchema.compile(json.loads(content), digest)
+
+            self._write(file_path, stamp, schema)
+
+        self._memory[file_path] = (stamp, schema)
+
+        return schema
+
+    def clear(self):
+        """Delete the cached schemas, in memory and on disk."""
+        self._memory.clear()
+        for folder in self.folders:
+            for file in folder.glob("*.schema.pickle"):
+                file.unlink(missing_ok=True)
+
+    def _cache_file(self, folder: Path, file_path: Path) -> Path:
+        key = hashlib.sha1(str(file_path).encode("utf-8")).hexdigest()[:8]
+        name = file_path.name.removesuffix(".ui.json")
+
+        return folder / f"{name}.{key}.schema.pickle"
+
+    def _read(
+        self, file_path: Path, stamp: tuple[int, int], digest: str | None = None
+    ) -> CompiledSchema | None:
+        """
+        Cached schema matching the file stamp, or the content digest if
+        provided.
+        """
+        for folder in self.folders:
+            try:
+                with open(self._cache_file(folder, file_path), "rb") as file:
+                    entry = pickle.load(file)
+            except Exception:  # pylint: disable=broad-exception-caught
+                continue
+
+            if (
+                entry.get("format") != SCHEMA_FORMAT
+                or entry.get("geoh5py") != geoh5py.__version__
+            ):
+                continue
+
+            schema = entry["schema"]
+            if entry["stamp"] == stamp if digest is None else schema.digest == digest:
+                return schema
+
+        return None
+
+    def _write(self, file_path: Path, stamp: tuple[int, int], schema: CompiledSchema):
+        """Store a schema in the first writable folder, replaced atomically."""
+        try:
+            content = pickle.dumps(
+                {
+                    "format": SCHEMA_FORMAT,
+                    "geoh5py": geoh5py.__version__,
+                    "stamp": stamp,
+                    "schema": schema,
+                }
+            )
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+
+        for folder in self.folders:
+            target = self._cache_file(folder, file_path)
+            temp = target.with_name(target.name + f".{os.getpid()}.tmp")
+            try:
+                folder.mkdir(parents=True, exist_ok=True)
+                temp.write_bytes(content)
+                os.replace(temp, target)
+                return
+            except OSError:
+                temp.unlink(missing_ok=True)
+
+
+SCHEMA_CACHE = SchemaCache()
+
+
+class SchemaInputFile(InputFile):
+    """
+    Input file reusing the parsed forms of a compiled schema.
+
+    Forms that only differ from the template by their user values are
+    assembled from the schema, and only their values are parsed. Other
+    forms go through the full geoh5py parsing.
+
+    The schema is a class attribute, as :meth:`numify` is a classmethod of
+    :class:`geoh5py.ui_json.InputFile`; :meth:`with_schema` makes the input
+    file class of a schema.
+    """
+
+    schema: ClassVar[CompiledSchema | None] = None
+
+    @classmethod
+    def with_schema(cls, schema: CompiledSchema | None) -> type[SchemaInputFile]:
+        """
+        Input file class reusing the forms of a schema.
+
+        :param schema: Compiled schema of the template of the files.
+        """
+        return type(cls.__name__, (cls,), {"schema": schema})
+
+    @classmethod
+    def numify(cls, ui_json: dict[str, Any]) -> dict[str, Any]:
+        if cls.schema is None:
+            return InputFile.numify(ui_json)
+
+        for key, form in ui_json.items():
+            if not cls.schema.matches(key, form):
+                ui_json[key] = InputFile.numify({key: form})[key]
+                continue
+
+            try:
+                cls.ui_validation(form)
+            except tuple(BaseValidationError.__subclasses__()) as error:
+                raise JSONParameterValidationError(key, error.args[0]) from error
+
+            values = InputFile.numify(
+                {member: form[member] for member in DYNAMIC_MEMBERS if member in form}
+            )
+            parsed = cls.schema.forms[key]
+            ui_json[key] = {
+                member: values[member] if member in values else copy(parsed[member])
+                for member in form
+            }
+
+        return ui_json
+
+
+def read_ui_json(file_path: str | Path, name: str | None = None) -> InputFile:
+    """
+    Read a ui.json file, reusing the compiled schema of its template.
+
+    :param file_path: Path to the ui.json file.
+    :param name: Name of the template of the file in the assets, if any.
+
+    :return: Input file with parsed forms, as from
+        :meth:`geoh5py.ui_json.InputFile.read_ui_json`.
+    """
+    file_path = Path(file_path).resolve()
+    if "".join(file_path.suffixes[-2:]) != ".ui.json":
+        raise ValueError("Input file should have the extension .ui.json")
+
+    schema = None if name is None else SCHEMA_CACHE.get(template_path(name))
+    ifile = SchemaInputFile.with_schema(schema)()
+    ifile.path = str(file_path.parent)
+    ifile.name = file_path.name
+
+    with open(file_path, encoding="utf-8") as file:
+        ifile.ui_json = json.load(file)
+
+    if isinstance(ifile.geoh5, Workspace):
+        ifile.geoh5.close()
+
+    return ifile
@@ -0,0 +1,69 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+
+from surface_apps.mesh.adjacency import MeshTopology
+
+from .utils import grid_surface, icosphere
+
+
+def test_topology_closed_surface():
+    _, cells = icosphere(2)
+    topology = MeshTopology(cells)
+
+    assert topology.edges.shape[0] == 3 * cells.shape[0] // 2
+    assert not topology.boundary_vertices.any()
+    assert topology.boundary_loops() == []
+
+    # Twins are opposite half-edges, in pairs
+    twins = topology.twins
+    half = np.arange(3 * cells.shape[0])
+    np.testing.assert_array_equal(twins[twins], half)
+    np.testing.assert_array_equal(
+        cells.ravel()[twins], np.roll(cells, -1, axis=1).ravel()
+    )
+
+    # Both cells of each edge use it
+    edge_cells = topology.edge_cells
+    for side in range(2):
+        assert np.all(
+            (
+                topology.cell_edges[edge_cells[:, side]]
+                == np.arange(len(edge_cells))[:, None]
+            ).any(axis=1)
+        )
+
+    owner, neighbours = topology.neighbours(np.r_[0, 12])
+    np.testing.assert_array_equal(np.bincount(owner), [5, 6])
+    assert np.all(topology.find_edges(np.r_[0, 12][owner], neighbours) >= 0)
+    assert topology.find_edges(np.r_[0], np.r_[0])[0] == -1
+
+    owner, triangles = topology.vertex_cells(np.r_[0])
+    assert triangles.shape[0] == 5
+    assert np.all((cells[triangles] == 0).any(axis=1))
+
+
+def test_topology_boundary_loops():
+    _, cells = grid_surface(6, 6)
+    # Punch a hole through the grid, around vertex 14
+    cells = cells[~(cells == 14).any(axis=1)]
+    topology = MeshTopology(cells, 36)
+
+    loops = topology.boundary_loops()
+    assert sorted(len(loop) for loop in loops) == [6, 20]
+
+    hole = next(loop for loop in loops if len(loop) == 6)
+    np.testing.assert_array_equal(np.sort(hole), [7, 8, 13, 15, 20, 21])
+    outer = next(loop for loop in loops if len(loop) == 20)
+    # Consecutive vertices share a boundary edge
+    edges = topology.find_edges(outer, np.roll(outer, -1))
+    assert np.all(topology.boundary_edges[edges])
+    assert topology.valence[14] == 0
@@ -0,0 +1,92 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.attributes import AttributesDriver
+from surface_apps.mesh.attributes import (
+    curvatures,
+    dip_and_direction,
+    face_normals,
+    vertex_normals,
+)
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def test_sphere_attributes():
+    radius = 5.0
+    vertices, cells = icosphere(4, radius=radius)
+    normals, areas = face_normals(vertices, cells)
+    normal = vertex_normals(vertices, cells, normals, areas)
+    mean, gaussian = curvatures(vertices, cells, normal, areas)
+
+    np.testing.assert_allclose(areas.sum(), 4 * np.pi * radius**2, rtol=0.01)
+    np.testing.assert_allclose(normal, vertices / radius, atol=0.01)
+    np.testing.assert_allclose(np.median(mean), 1 / radius, rtol=0.01)
+    np.testing.assert_allclose(np.median(gaussian), 1 / radius**2, rtol=0.01)
+    assert np.all(np.abs(mean - 1 / radius) < 0.2 / radius)
+
+    # Total curvature of a closed surface of genus 0
+    vertex_areas = np.bincount(cells.ravel(), np.repeat(areas / 3, 3))
+    np.testing.assert_allclose((gaussian * vertex_areas).sum(), 4 * np.pi)
+
+
+def test_plane_orientation():
+    dip, direction = np.radians(30.0), np.radians(120.0)
+    vertices, cells = grid_surface(10, 10)
+    # Descend along the dip direction, clockwise from north
+    down = np.r_[np.sin(direction), np.cos(direction)]
+    vertices[:, 2] = -np.tan(dip) * vertices[:, :2] @ down
+
+    normals, areas = face_normals(vertices, cells)
+    for values in (normals, vertex_normals(vertices, cells, normals, areas)):
+        for orientation in (values, -values):
+            dips, directions = dip_and_direction(orientation)
+            np.testing.assert_allclose(dips, 30.0)
+            np.testing.assert_allclose(directions, 120.0)
+
+    mean, gaussian = curvatures(
+        vertices, cells, vertex_normals(vertices, cells, normals, areas), areas
+    )
+    interior = ~np.isnan(mean)
+    assert np.count_nonzero(interior) == 64
+    np.testing.assert_allclose(mean[interior], 0.0, atol=1e-12)
+    np.testing.assert_allclose(gaussian[interior], 0.0, atol=1e-12)
+
+
+def test_attributes_command(tmp_path):
+    vertices, cells = icosphere(2)
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+
+    file_path = write_ui_json(
+        tmp_path, "attributes", workspace, surface=surface, vertex_orientation=False
+    )
+    AttributesDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        surface = workspace.get_entity(surface.uid)[0]
+        names = set(surface.get_data_list())
+        assert names == {
+            "normal_x",
+            "normal_y",
+            "normal_z",
+            "dip",
+            "dip_direction",
+            "mean_curvature",
+            "gaussian_curvature",
+        }
+        assert surface.get_data("dip")[0].values.shape == (surface.n_cells,)
+        assert surface.get_data("mean_curvature")[0].values.shape == (
+            surface.n_vertices,
+        )
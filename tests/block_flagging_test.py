@@ -0,0 +1,82 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from geoh5py.objects import BlockModel, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.block_flagging import BlockFlaggingDriver
+from surface_apps.mesh.inside import column_parity, inside_grid
+
+from .utils import icosphere, write_ui_json
+
+
+def test_column_parity():
+    inside = column_parity(
+        np.r_[0, 0, 1, 1, 1, 1],
+        np.r_[0.5, 2.5, -1.0, 1.5, 3.5, 2.2],
+        np.r_[3.0, 2.0, 1.0, 0.0],
+        2,
+    )
+    np.testing.assert_array_equal(
+        inside, [[False, True, True, False], [True, False, True, True]]
+    )
+
+
+def test_inside_grid():
+    vertices, cells = icosphere(3, radius=10.0)
+    axis = np.arange(-12.0, 12.5, 1.0)
+    inside = inside_grid(vertices, cells, axis, axis, axis[::-1])
+
+    y_loc, x_loc, z_loc = np.meshgrid(axis, axis, axis[::-1], indexing="ij")
+    radius = np.sqrt(x_loc**2 + y_loc**2 + z_loc**2).reshape(inside.shape)
+    clear = np.abs(radius - 10.0) > 0.3
+
+    np.testing.assert_array_equal(inside[clear], radius[clear] < 10.0)
+
+
+def test_block_flagging_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        vertices, cells = icosphere(3, radius=4.0)
+        small = Surface.create(workspace, vertices=vertices, cells=cells, name="A")
+        vertices, cells = icosphere(3, radius=8.0)
+        large = Surface.create(
+            workspace, vertices=vertices + [1.0, 0.0, 0.0], cells=cells, name="B"
+        )
+        block_model = BlockModel.create(
+            workspace,
+            origin=[-1.16, -17.99, 10.0],
+            rotation=30.0,
+            u_cell_delimiters=np.arange(-10.0, 11.0),
+            v_cell_delimiters=np.arange(-10.0, 11.0) * 1.5,
+            z_cell_delimiters=-np.arange(0.0, 21.0),
+        )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "block_flagging",
+        workspace,
+        block_model=block_model,
+        surfaces=[f"{{{small.uid}}}", f"{{{large.uid}}}"],
+    )
+    BlockFlaggingDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        block_model = workspace.get_entity(block_model.uid)[0]
+        domain = block_model.get_data("domain")[0]
+        centroids = block_model.centroids
+        radius_a = np.linalg.norm(centroids, axis=1)
+        radius_b = np.linalg.norm(centroids - [1.0, 0.0, 0.0], axis=1)
+
+        assert domain.value_map.map[1] == "A"
+        assert np.all(domain.values[radius_a < 3.9] == 1)
+        assert np.all(domain.values[(radius_b < 7.8) & (radius_a > 4.1)] == 2)
+        assert np.all(domain.values[radius_b > 8.0] == 0)
+        assert np.any(domain.values == 1) and np.any(domain.values == 2)
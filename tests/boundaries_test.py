@@ -0,0 +1,111 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.boundaries import BoundariesDriver
+from surface_apps.mesh.adjacency import MeshTopology
+from surface_apps.mesh.components import component_statistics
+from surface_apps.mesh.holes import ear_clipping, fill_holes
+from surface_apps.mesh.precision import CompactMesh
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def punctured_sphere():
+    vertices, cells = icosphere(3)
+    # Remove the triangles around three vertices, leaving three holes
+    return vertices, cells[~np.isin(cells, [0, 5, 100]).any(axis=1)]
+
+
+@pytest.mark.parametrize("method", ["Fan", "Ear clipping"])
+def test_fill_holes(method):
+    vertices, cells = punctured_sphere()
+
+    filled, new_cells, open_loops = fill_holes(vertices, cells, 10, method=method)
+
+    topology = MeshTopology(new_cells, filled.shape[0])
+    assert open_loops == []
+    assert np.all(topology.counts == 2)
+    assert np.all(topology.twins >= 0)
+    volume = component_statistics(filled, new_cells, np.zeros(len(new_cells), int))
+    np.testing.assert_allclose(volume["volume"], 4 / 3 * np.pi, rtol=0.02)
+
+    # Holes larger than the limit are left open
+    _, new_cells, open_loops = fill_holes(vertices, cells, 4, method=method)
+    assert new_cells.shape[0] == cells.shape[0]
+    assert len(open_loops) == 3
+
+
+def test_fill_holes_compact_cells():
+    # 256 vertices fit uint8 cells, the centroid of the fan does not
+    vertices, cells = grid_surface(16, 16)
+    cells = cells[~np.isin(cells, 85).any(axis=1)]
+    mesh = CompactMesh.from_arrays(vertices, cells)
+    assert mesh.cells.dtype == np.uint8
+
+    filled, new_cells, _ = fill_holes(mesh.offsets, mesh.cells, 10)
+    assert filled.shape[0] == 257
+    assert new_cells.dtype == np.uint16
+    assert np.count_nonzero(new_cells == 256) == 6
+    np.testing.assert_array_equal(new_cells[: cells.shape[0]], cells)
+
+
+def test_ear_clipping():
+    # Non-convex "L" polygon
+    points = np.c_[[0, 2, 2, 1, 1, 0], [0, 0, 1, 1, 2, 2], np.zeros(6)]
+    triangles = ear_clipping(points)
+
+    assert triangles.shape == (4, 3)
+    corners = points[triangles]
+    areas = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    np.testing.assert_allclose(areas[:, 2].sum() / 2.0, 3.0)
+    assert np.all(areas[:, 2] > 0)
+
+
+def test_boundaries_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = ContainerGroup.create(workspace, name="Shells")
+        vertices, cells = punctured_sphere()
+        Surface.create(
+            workspace, vertices=vertices, cells=cells, name="sphere", parent=group
+        )
+        vertices, cells = grid_surface(5, 5)
+        Surface.create(
+            workspace, vertices=vertices, cells=cells, name="grid", parent=group
+        )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "boundaries",
+        workspace,
+        group=group,
+        fill=True,
+        max_edges=10,
+        compact=True,
+    )
+    BoundariesDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        group = workspace.get_entity("Shells")[0]
+        children = {child.name: child for child in group.children}
+        assert "sphere_filled" in children
+        assert "grid_filled" not in children
+
+        # Only the outline of the grid is left open
+        curve = children["Boundaries"]
+        assert curve.n_cells == 16
+        surface = curve.get_data("surface")[0]
+        assert {surface.value_map.map[value] for value in surface.values} == {"grid"}
+        np.testing.assert_array_equal(curve.get_data("loop")[0].values, 1)
@@ -0,0 +1,75 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.ui_json import InputFile
+from geoh5py.ui_json.templates import float_parameter
+from geoh5py.workspace import Workspace
+
+from surface_apps.checkpoint import Checkpoint, job_key
+
+
+def get_input_file(tmp_path, value: float, name="test") -> InputFile:
+    workspace = Workspace.create(tmp_path / f"{name}.geoh5")
+    ui_json = {
+        "title": "test",
+        "geoh5": workspace,
+        "run_command": "surface_apps.commands.test",
+        "monitoring_directory": "",
+        "conda_environment": "surface_apps",
+        "workspace_geoh5": None,
+        "level": float_parameter(value=value),
+    }
+    return InputFile(ui_json=ui_json, validate=False)
+
+
+def test_job_key():
+    base = {"level": 1.0, "monitoring_directory": "a"}
+    assert job_key(base) == job_key({**base, "monitoring_directory": "b"})
+    assert job_key(base) != job_key({**base, "level": 2.0})
+    assert job_key({**base, "level": np.float32(1.0)}) == job_key(base)
+
+    with pytest.raises(TypeError, match="Cannot identify a job"):
+        job_key({**base, "level": object()})
+
+
+def test_checkpoint_resume(tmp_path):
+    ifile = get_input_file(tmp_path, 1.0)
+    checkpoint = Checkpoint.from_input_file(ifile)
+
+    assert checkpoint.path.parent == tmp_path
+    assert checkpoint.completed == set()
+
+    checkpoint.save("tile_0", vertices=np.ones((3, 3)), cells=np.arange(3))
+    checkpoint.save("tile_1", vertices=np.zeros((3, 3)), cells=np.arange(3))
+
+    resumed = Checkpoint.from_input_file(ifile)
+    assert resumed.path == checkpoint.path
+    assert "tile_0" in resumed
+    assert resumed.pending([f"tile_{ind}" for ind in range(3)]) == ["tile_2"]
+    np.testing.assert_array_equal(resumed.load("tile_0")["vertices"], 1.0)
+    assert not list(checkpoint.path.glob("*.tmp"))
+
+    other = Checkpoint.from_input_file(get_input_file(tmp_path, 2.0, name="other"))
+    assert other.path != checkpoint.path
+
+    resumed.clear()
+    assert not checkpoint.path.exists()
+
+
+def test_checkpoint_errors(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "job.checkpoint")
+
+    with pytest.raises(ValueError, match="Invalid checkpoint unit"):
+        checkpoint.save("tile/0", values=np.ones(1))
+
+    with pytest.raises(ValueError, match="must have a 'geoh5'"):
+        Checkpoint.from_input_file(InputFile())
@@ -0,0 +1,82 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.components import ComponentsDriver, remove_small_bodies
+from surface_apps.mesh.components import (
+    component_statistics,
+    filter_components,
+    label_components,
+)
+
+from .utils import icosphere, write_ui_json
+
+
+def three_spheres():
+    vertices, cells = [], []
+    for ind, radius in enumerate([1.0, 0.2, 0.5]):
+        sphere, triangles = icosphere(3, radius=radius)
+        cells.append(triangles + sum(len(block) for block in vertices))
+        vertices.append(sphere + [ind * 3.0, 0.0, 0.0])
+
+    return np.vstack(vertices), np.vstack(cells)
+
+
+def test_label_components():
+    vertices, cells = three_spheres()
+    n_components, labels = label_components(cells)
+
+    assert n_components == 3
+    np.testing.assert_array_equal(np.bincount(labels), [1280] * 3)
+
+    stats = component_statistics(vertices, cells, labels)
+    np.testing.assert_allclose(
+        stats["volume"], 4 / 3 * np.pi * np.r_[1.0, 0.2, 0.5] ** 3, rtol=0.02
+    )
+    np.testing.assert_allclose(
+        stats["area"], 4 * np.pi * np.r_[1.0, 0.2, 0.5] ** 2, rtol=0.02
+    )
+
+
+def test_filter_components():
+    vertices, cells = three_spheres()
+
+    keep, _ = filter_components(vertices, cells, min_volume=0.1)
+    assert keep.sum() == 2 * 1280
+    assert not keep[1280:2560].any()
+
+    keep, _ = filter_components(vertices, cells, min_cells=2000)
+    assert not keep.any()
+
+
+def test_components_command(tmp_path):
+    vertices, cells = three_spheres()
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+
+    file_path = write_ui_json(
+        tmp_path, "components", workspace, surface=surface, min_volume=0.1
+    )
+    ComponentsDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        filtered = workspace.get_entity("Filtered")[0]
+        assert filtered.n_cells == 2 * 1280
+        assert filtered.n_vertices == 2 * 642
+        np.testing.assert_array_equal(
+            np.unique(filtered.get_data("component")[0].values), [1, 2]
+        )
+
+        with pytest.raises(ValueError, match="below the thresholds"):
+            remove_small_bodies(filtered, min_volume=10.0)
@@ -0,0 +1,58 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.groups import ContainerGroup
+from geoh5py.workspace import Workspace
+
+from surface_apps.mesh.decimation import cluster_vertices, lod_pyramid
+from surface_apps.output import create_surface, parse_lod
+
+from .utils import icosphere
+
+
+def test_lod_pyramid():
+    vertices, cells = icosphere(5, radius=10.0)
+    levels = list(lod_pyramid(vertices, cells, [0.05, 0.25]))
+
+    assert [fraction for fraction, _, _ in levels] == [0.25, 0.05]
+    for fraction, level_vertices, level_cells in levels:
+        assert abs(level_cells.shape[0] / cells.shape[0] - fraction) < 0.1 * fraction
+        assert np.allclose(np.linalg.norm(level_vertices, axis=1), 10.0, atol=0.5)
+        # Clusters average the vertices, so the shape is preserved
+        corners = level_vertices[level_cells]
+        area = np.linalg.norm(
+            np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]),
+            axis=1,
+        ).sum()
+        assert abs(area / 2.0 - 400.0 * np.pi) < 0.05 * 400.0 * np.pi
+
+    merged, merged_cells = cluster_vertices(vertices, cells, 100.0)
+    assert merged.shape[0] <= 8 and merged_cells.shape[0] == 0
+
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        next(lod_pyramid(vertices, cells, [1.5]))
+
+
+def test_create_surface_lod(tmp_path):
+    vertices, cells = icosphere(4)
+    assert parse_lod("100, 25,5") == [0.25, 0.05]
+    assert not parse_lod(None)
+
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = create_surface(
+            workspace, vertices, cells, lod=parse_lod("25, 5"), name="Shell"
+        )
+        group = surface.parent
+        assert isinstance(group, ContainerGroup) and group.name == "Shell"
+        counts = {child.name: child.n_cells for child in group.children}
+        assert set(counts) == {"Shell 100%", "Shell 25%", "Shell 5%"}
+        assert counts["Shell 100%"] > counts["Shell 25%"] > counts["Shell 5%"]
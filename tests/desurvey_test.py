@@ -0,0 +1,79 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from geoh5py.groups import DrillholeGroup
+from geoh5py.objects import Drillhole
+from geoh5py.workspace import Workspace
+
+from surface_apps.desurvey import Desurvey, desurvey_group, group_surveys
+
+
+def test_minimum_curvature():
+    # Quarter circle of radius 100 from vertical to horizontal east
+    length = 50.0 * np.pi
+    paths = Desurvey.from_surveys(
+        np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 50.0]]),
+        [
+            np.c_[[0.0, length], [90.0, 90.0], [-90.0, 0.0]],
+            np.c_[[10.0, 200.0], [45.0, 45.0], [-60.0, -60.0]],
+        ],
+    )
+
+    locations = paths.locations(
+        np.r_[0, 0, 0, 1, 1], np.r_[length / 2, length, length + 10, 0.0, 100.0]
+    )
+
+    angle = np.pi / 4
+    np.testing.assert_allclose(
+        locations[:3],
+        [
+            [100 - 100 * np.cos(angle), 0.0, -100 * np.sin(angle)],
+            [100.0, 0.0, -100.0],
+            [110.0, 0.0, -100.0],
+        ],
+        atol=1e-9,
+    )
+    # Straight holes start at the collar, surveyed from their first station
+    direction = np.r_[np.sqrt(2) / 4, np.sqrt(2) / 4, -np.sqrt(3) / 2]
+    np.testing.assert_allclose(
+        locations[3:], [[10.0, 0.0, 50.0], np.r_[10.0, 0.0, 50.0] + 100 * direction]
+    )
+
+
+def test_desurvey_cache(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = DrillholeGroup.create(workspace, name="Holes")
+        for index in range(3):
+            Drillhole.create(
+                workspace,
+                collar=np.r_[index * 10.0, 0.0, 0.0],
+                surveys=np.c_[[0.0, 100.0], [0.0, 30.0], [-90.0, -70.0]],
+                parent=group,
+                name=f"hole_{index}",
+            )
+
+        holes, paths = desurvey_group(group)
+        cached = list(tmp_path.glob("*.desurvey.checkpoint/*.npz"))
+        assert len(holes) == 3
+        assert len(cached) == 1
+
+        _, again = desurvey_group(group)
+        np.testing.assert_array_equal(again.positions, paths.positions)
+
+        # Changed surveys invalidate the cache
+        holes[0].surveys = np.c_[[0.0, 100.0], [0.0, 30.0], [-90.0, -50.0]]
+        _, changed = desurvey_group(group)
+        assert not np.allclose(changed.positions[:2], paths.positions[:2])
+        assert len(list(tmp_path.glob("*.desurvey.checkpoint/*.npz"))) == 1
+
+        # Surveys read at once for the group match those of each hole
+        for surveys, hole in zip(group_surveys(group, holes), holes):
+            np.testing.assert_array_equal(surveys, hole.surveys)
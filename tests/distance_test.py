@@ -0,0 +1,168 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from geoh5py.objects import BlockModel, Surface
+from geoh5py.workspace import Workspace
+from scipy.spatial import Delaunay
+
+from surface_apps.commands.distance import DistanceDriver
+from surface_apps.mesh.distance import (
+    EDGE_AB,
+    FACE,
+    VERTEX_C,
+    TriangleTree,
+    closest_point_on_triangles,
+    signed_distance,
+)
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def test_closest_point_on_triangles():
+    corners = np.eye(3)
+    points = np.array([[1.0, 1.0, 1.0], [0.0, 0.0, 2.0], [0.5, 0.5, -1.0]])
+    closest, feature = closest_point_on_triangles(points, *corners)
+
+    np.testing.assert_allclose(closest[0], [1 / 3] * 3)
+    np.testing.assert_allclose(closest[1], [0.0, 0.0, 1.0])
+    np.testing.assert_allclose(closest[2], [0.5, 0.5, 0.0])
+    np.testing.assert_array_equal(feature, [FACE, VERTEX_C, EDGE_AB])
+
+
+def test_signed_distance_brute_force():
+    vertices, cells = icosphere(3)
+    points = np.random.default_rng(0).uniform(-2, 2, (500, 3))
+
+    closest, _ = closest_point_on_triangles(
+        points[:, None],
+        vertices[cells[:, 0]],
+        vertices[cells[:, 1]],
+        vertices[cells[:, 2]],
+    )
+    expected = np.linalg.norm(closest - points[:, None], axis=2).min(axis=1)
+    tree = TriangleTree(vertices, cells)
+    distance = tree.signed_distance(points, chunk_size=128)
+
+    np.testing.assert_allclose(np.abs(distance), expected, atol=1e-12)
+    inside = np.linalg.norm(points, axis=1) < 0.98
+    outside = np.linalg.norm(points, axis=1) > 1.0
+    assert np.all(distance[inside] < 0)
+    assert np.all(distance[outside] > 0)
+
+    # Points next to vertices and edges use pseudo-normals for the sign
+    assert np.all(tree.signed_distance(vertices * 1.001) > 0)
+    assert np.all(tree.signed_distance(vertices * 0.999) < 0)
+
+
+def test_signed_distance_topography():
+    vertices, cells = grid_surface(20, 20)
+    vertices[:, 2] = np.sin(vertices[:, 0] / 5.0)
+    points = np.random.default_rng(1).uniform([2, 2, -2], [17, 17, 2], (200, 3))
+
+    distance = signed_distance(points, vertices, cells)
+    elevation = np.sin(points[:, 0] / 5.0)
+    clear = np.abs(points[:, 2] - elevation) > 0.05
+
+    np.testing.assert_array_equal(
+        distance[clear] > 0, points[clear, 2] > elevation[clear]
+    )
+
+
+def brute_force_distance(points, vertices, cells):
+    distance = np.zeros(points.shape[0])
+    for start in range(0, points.shape[0], 100):
+        batch = points[start : start + 100, None]
+        closest, _ = closest_point_on_triangles(
+            batch, vertices[cells[:, 0]], vertices[cells[:, 1]], vertices[cells[:, 2]]
+        )
+        distance[start : start + 100] = np.linalg.norm(closest - batch, axis=2).min(
+            axis=1
+        )
+
+    return distance
+
+
+def test_query_mixed_triangle_sizes():
+    # A fine grid with one large triangle beside it
+    vertices, cells = grid_surface(101, 101)
+    vertices = np.vstack([vertices, [[120, 0, 0], [400, 0, 0], [120, 300, 0]]])
+    cells = np.vstack(
+        [cells, [[len(vertices) - 3, len(vertices) - 2, len(vertices) - 1]]]
+    )
+    tree = TriangleTree(vertices, cells)
+
+    triangle, closest, _ = tree.query(np.array([[150.0, 10.0, 0.5]]))
+    assert triangle[0] == len(cells) - 1
+    np.testing.assert_allclose(closest[0], [150.0, 10.0, 0.0])
+
+    # Random topography, with slivers along the convex hull
+    rng = np.random.default_rng(2)
+    vertices = np.c_[rng.uniform(0, 1000, (5000, 2)), np.zeros(5000)]
+    vertices[:, 2] = (
+        20.0 * np.sin(vertices[:, 0] / 100.0) * np.cos(vertices[:, 1] / 150.0)
+    )
+    cells = Delaunay(vertices[:, :2]).simplices
+    points = rng.uniform([-100, -100, -50], [1100, 1100, 50], (500, 3))
+
+    distance = TriangleTree(vertices, cells).signed_distance(points)
+    np.testing.assert_allclose(
+        np.abs(distance), brute_force_distance(points, vertices, cells), atol=1e-9
+    )
+
+
+def test_query_far_points():
+    # Away from a sphere most triangles are at about the same distance
+    vertices, cells = icosphere(4)
+    tree = TriangleTree(vertices, cells)
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-4.0, 4.0, (300, 3))
+
+    _, closest, _ = tree.query(points)
+    np.testing.assert_allclose(
+        np.linalg.norm(closest - points, axis=1),
+        brute_force_distance(points, vertices, cells),
+        atol=1e-9,
+    )
+
+
+def test_distance_command(tmp_path):
+    vertices, cells = icosphere(3, radius=5.0)
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+        block_model = BlockModel.create(
+            workspace,
+            origin=[-10.0, -10.0, -10.0],
+            u_cell_delimiters=np.arange(0, 21.0),
+            v_cell_delimiters=np.arange(0, 21.0),
+            z_cell_delimiters=np.arange(0, 21.0),
+        )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "distance",
+        workspace,
+        objects=block_model,
+        surface=surface,
+        compact=True,
+    )
+    DistanceDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        block_model = workspace.get_entity(block_model.uid)[0]
+        distance = block_model.get_data("distance")[0].values
+        flag = block_model.get_data("distance_flag")[0].values
+        radius = np.linalg.norm(block_model.centroids, axis=1)
+
+        assert np.all(flag[radius < 4.8] == 1)
+        assert np.all(flag[radius > 5.0] == 0)
+        np.testing.assert_allclose(
+            distance[radius > 6], radius[radius > 6] - 5, atol=0.1
+        )
@@ -0,0 +1,122 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+from geoh5py.objects import Curve, Points, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.drape import DrapeDriver
+from surface_apps.mesh.drape import TriangleGrid, projection_frame
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def test_projection_frame():
+    direction = np.r_[1.0, -2.0, -0.5]
+    rotation = projection_frame(direction)
+
+    np.testing.assert_allclose(rotation @ rotation.T, np.eye(3), atol=1e-12)
+    np.testing.assert_allclose(np.linalg.det(rotation), 1.0)
+    np.testing.assert_allclose(
+        rotation @ direction, [0.0, 0.0, -np.linalg.norm(direction)], atol=1e-12
+    )
+
+
+def test_locate_plane():
+    vertices, cells = grid_surface(21, 21, spacing=0.5)
+    vertices[:, 2] = 2.0 * vertices[:, 0] - vertices[:, 1] + 3.0
+    points = np.c_[
+        np.random.default_rng(0).uniform(-1.0, 11.0, (2000, 2)), np.zeros(2000)
+    ]
+    grid = TriangleGrid(vertices, cells)
+    triangle, weights = grid.locate(points, chunk_size=128)
+    projected, hit = grid.project(points, chunk_size=128)
+
+    inside = np.all((points[:, :2] >= 0.0) & (points[:, :2] <= 10.0), axis=1)
+    np.testing.assert_array_equal(triangle >= 0, inside)
+    np.testing.assert_array_equal(hit, inside)
+    np.testing.assert_allclose(weights[inside].sum(axis=1), 1.0)
+    np.testing.assert_allclose(
+        projected[hit, 2], 2.0 * points[hit, 0] - points[hit, 1] + 3.0
+    )
+    np.testing.assert_array_equal(projected[~hit], points[~hit])
+    np.testing.assert_allclose(projected[:, :2], points[:, :2])
+
+
+def test_locate_overlapping_along_direction():
+    # Projected sideways, the sphere covers the points twice: the highest hit,
+    # the first met coming from far against the direction, is on the near side
+    vertices, cells = icosphere(3)
+    points = np.c_[
+        np.full(50, -5.0), np.random.default_rng(1).uniform(-0.5, 0.5, (50, 2))
+    ]
+    projected, hit = TriangleGrid(vertices, cells, direction=(1.0, 0.0, 0.0)).project(
+        points
+    )
+
+    assert np.all(hit)
+    assert np.all(projected[:, 0] < 0.0)
+    np.testing.assert_allclose(projected[:, 1:], points[:, 1:])
+    np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, atol=0.05)
+
+
+def test_drape_driver(tmp_path):
+    vertices, cells = grid_surface(11, 11)
+    vertices[:, 2] = 100.0 + vertices[:, 0]
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(
+            workspace, vertices=vertices, cells=cells, name="Topography"
+        )
+        stations = Points.create(
+            workspace, vertices=np.c_[[1.0, 4.5, 20.0], [2.0, 3.0, 5.0], [0, 0, 0]]
+        )
+        stations.add_data({"id": {"values": np.r_[1.0, 2.0, 3.0]}})
+        line = Curve.create(
+            workspace,
+            vertices=np.c_[np.linspace(0.5, 9.5, 10), np.full(10, 5.0), np.zeros(10)],
+            name="Line",
+        )
+        # As many segments as vertices, the flag must stay on the vertices
+        loop = Curve.create(
+            workspace,
+            vertices=np.c_[[2.0, 8.0, 8.0, 2.0], [2.0, 2.0, 8.0, 8.0], np.zeros(4)],
+            cells=np.c_[np.arange(4), np.roll(np.arange(4), -1)],
+            name="Loop",
+        )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "drape",
+        workspace,
+        objects=[f"{{{stations.uid}}}", f"{{{line.uid}}}", f"{{{loop.uid}}}"],
+        surface=surface,
+        offset=30.0,
+        compact=True,
+    )
+    DrapeDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        draped = workspace.get_entity(f"{stations.name}_draped")[0]
+        np.testing.assert_allclose(draped.vertices[:2, 2], [131.0, 134.5])
+        np.testing.assert_allclose(draped.vertices[2], [20.0, 5.0, 0.0])
+        np.testing.assert_array_equal(
+            draped.get_data("draped")[0].values, [True, True, False]
+        )
+        np.testing.assert_allclose(draped.get_data("id")[0].values, [1.0, 2.0, 3.0])
+
+        curve = workspace.get_entity("Line_draped")[0]
+        assert isinstance(curve, Curve)
+        np.testing.assert_allclose(curve.vertices[:, 2], 130.0 + line.vertices[:, 0])
+
+        closed = workspace.get_entity("Loop_draped")[0]
+        np.testing.assert_allclose(closed.vertices[:, 2], 130.0 + loop.vertices[:, 0])
+        flag = closed.get_data("draped")[0]
+        assert flag.association.name == "VERTEX"
+        np.testing.assert_array_equal(flag.values, True)
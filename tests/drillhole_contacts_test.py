@@ -0,0 +1,121 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.groups import DrillholeGroup
+from geoh5py.objects import Drillhole
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.drillhole_contacts import (
+    DrillholeContactsDriver,
+    contact_depths,
+    interval_contacts,
+)
+
+from .utils import write_ui_json
+
+
+def test_interval_contacts():
+    # Unsorted intervals of one hole, an empty hole and a hole without unit
+    offsets = np.r_[0, 5, 5, 7]
+    starts = np.r_[20.0, 0.0, 10.0, 30.0, 45.0, 0.0, 5.0]
+    ends = np.r_[30.0, 10.0, 20.0, 40.0, 50.0, 5.0, 10.0]
+    inside = np.r_[True, False, True, True, True, False, False]
+
+    np.testing.assert_array_equal(
+        interval_contacts(offsets, starts, ends, inside), [10.0, np.nan, np.nan]
+    )
+    # The run stops at the gap between 40 and 45
+    np.testing.assert_array_equal(
+        interval_contacts(offsets, starts, ends, inside, contact="Bottom"),
+        [40.0, np.nan, np.nan],
+    )
+    # Runs end with their hole
+    bottoms = interval_contacts(
+        np.r_[0, 2, 4],
+        np.r_[30.0, 40.0, 0.0, 5.0],
+        np.r_[40.0, 50.0, 5.0, 10.0],
+        np.r_[True, True, True, False],
+        contact="Bottom",
+    )
+    np.testing.assert_array_equal(bottoms, [50.0, 5.0])
+
+
+def test_contact_depths_numeric_data(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        hole = Drillhole.create(
+            workspace,
+            collar=np.r_[0.0, 0.0, 0.0],
+            surveys=np.c_[[0.0, 100.0], [0.0, 0.0], [-90.0, -90.0]],
+            parent=DrillholeGroup.create(workspace),
+        )
+        hole.add_data(
+            {
+                "grade": {
+                    "values": np.r_[0.5, 1.5, 0.5],
+                    "from-to": np.c_[[0.0, 20.0, 60.0], [20.0, 60.0, 100.0]],
+                }
+            }
+        )
+
+        indices, depths = contact_depths([hole], "grade", "1.5", contact="Bottom")
+        np.testing.assert_array_equal(indices, [0])
+        np.testing.assert_array_equal(depths, [60.0])
+
+        with pytest.raises(ValueError, match="unit 'host' must be one of"):
+            contact_depths([hole], "grade", "host")
+
+
+def test_drillhole_contacts_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = DrillholeGroup.create(workspace, name="Holes")
+        for index, (x_loc, y_loc) in enumerate(np.mgrid[0:3, 0:3].reshape((2, -1)).T):
+            hole = Drillhole.create(
+                workspace,
+                collar=np.r_[x_loc * 100.0, y_loc * 100.0, 0.0],
+                surveys=np.c_[[0.0, 200.0], [0.0, 0.0], [-90.0, -90.0]],
+                parent=group,
+                name=f"hole_{index}",
+            )
+            # Contact dipping to the east, from 50 to 90 m deep
+            top = 50.0 + 20.0 * x_loc
+            hole.add_data(
+                {
+                    "lithology": {
+                        "values": np.array([1, 2, 3], dtype=np.int32),
+                        "from-to": np.c_[[0.0, top, 150.0], [top, 150.0, 200.0]],
+                        "type": "referenced",
+                        "value_map": {1: "cover", 2: "host", 3: "basement"},
+                    }
+                }
+            )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "drillhole_contacts",
+        workspace,
+        group=group,
+        data_name="lithology",
+        unit="host",
+    )
+    for _ in range(2):
+        DrillholeContactsDriver.start(file_path)
+
+    assert len(list(tmp_path.glob("*.desurvey.checkpoint/*.npz"))) == 1
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        surfaces = workspace.get_entity("Contact surface")
+        assert len(surfaces) == 2
+        vertices = surfaces[0].vertices
+        assert surfaces[0].n_vertices == 9
+        np.testing.assert_allclose(vertices[:, 2], -50.0 - 0.2 * vertices[:, 0])
+        np.testing.assert_allclose(
+            surfaces[0].get_data("depth")[0].values, -vertices[:, 2]
+        )
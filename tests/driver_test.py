@@ -0,0 +1,125 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.driver import (
+    BaseDriver,
+    get_driver,
+    load_drivers,
+    run,
+    template_names,
+    ui_json_template,
+)
+from surface_apps.schema import read_ui_json
+
+from .utils import icosphere, write_ui_json
+
+
+def test_registry():
+    drivers = load_drivers()
+
+    assert set(template_names()) <= set(drivers)
+    for name, driver in drivers.items():
+        assert issubclass(driver, BaseDriver)
+        assert driver.ui_json == name
+        assert get_driver(ui_json_template(name)["run_command"]) is driver
+
+    with pytest.raises(KeyError, match="No command registered"):
+        get_driver("surface_apps.commands.unknown")
+
+    with pytest.raises(ValueError, match="No ui.json template"):
+        ui_json_template("unknown")
+
+
+def test_template_is_copied():
+    driver = get_driver("smoothing")
+    template = driver.template()
+    template["title"] = "Modified"
+
+    assert driver.template()["title"] != "Modified"
+
+
+def test_params_validation(tmp_path):
+    params_class = get_driver("smoothing").params_class
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(
+            workspace, vertices=np.random.randn(3, 3), cells=np.array([[0, 1, 2]])
+        )
+        params = params_class.build({"geoh5": workspace, "surface": surface})
+        assert params.method == "Taubin"
+        assert not hasattr(params, "__dict__")
+
+        params = params_class.build({"surface": surface, "factor": 1, "other": 1.0})
+        assert isinstance(params.factor, float)
+
+        with pytest.raises(ValueError, match="Missing required parameters"):
+            params_class.build({"geoh5": workspace})
+
+        with pytest.raises(ValueError, match="'surface' is required"):
+            params_class.build({"surface": None})
+
+        with pytest.raises(TypeError, match="'iterations' must be of type int"):
+            params_class.build({"surface": surface, "iterations": "ten"})
+
+        with pytest.raises(TypeError, match="Parameters must be of type"):
+            get_driver("components")(params)
+
+        # Elements of lists are checked
+        drape = get_driver("drape").params_class
+        with pytest.raises(TypeError, match=r"'objects\[1\]' must be of type"):
+            drape.build({"objects": [surface, 1.0], "surface": surface})
+
+
+def test_disabled_optional_form(tmp_path):
+    vertices, cells = icosphere(2)
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+
+    file_path = write_ui_json(tmp_path, "smoothing", workspace, surface=surface)
+    with open(file_path, encoding="utf-8") as file:
+        ui_json = json.load(file)
+    ui_json["iterations"].update({"value": 3, "optional": True, "enabled": False})
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(ui_json, file)
+
+    driver = get_driver("smoothing")
+    ifile = read_ui_json(file_path, driver.ui_json)
+    assert ifile.data["iterations"] is None
+    assert ifile.data["weights"] is None
+
+    # Disabled forms keep the defaults, or None where it is allowed
+    params = driver.params_class.build(ifile.data)
+    assert params.iterations == 10
+    assert params.weights is None
+
+
+def test_run_batch(tmp_path):
+    vertices, cells = icosphere(2)
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    file_paths = [
+        write_ui_json(tmp_path / "a", "smoothing", workspace, surface=surface),
+        write_ui_json(tmp_path / "b", "components", workspace, surface=surface),
+    ]
+    outputs = run(file_paths)
+
+    assert [output.name for output in outputs] == ["Smoothed", "Filtered"]
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        assert workspace.get_entity("Smoothed")[0] is not None
+        assert workspace.get_entity("Filtered")[0] is not None
@@ -0,0 +1,118 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+from geoh5py.objects import Points, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.faulted_horizon import FaultedHorizonDriver
+from surface_apps.mesh.adjacency import edge_table
+from surface_apps.mesh.distance import TriangleTree
+from surface_apps.mesh.faults import fault_blocks, fault_crossings, triangulate_block
+
+from .utils import grid_surface, write_ui_json
+
+
+def vertical_fault(length: float) -> tuple[np.ndarray, np.ndarray]:
+    """Vertical plane through (8, 0) striking along (0.3, 1), in plan view."""
+    vertices, cells = grid_surface(20, 5)
+    strike = np.r_[0.3, 1.0, 0.0] / np.linalg.norm([0.3, 1.0])
+    vertices = (
+        np.r_[8.0, 0.0, 0.0]
+        + vertices[:, [0]] * length / 19 * strike
+        + (vertices[:, [1]] * 10.0 - 20.0) * np.r_[0.0, 0.0, 1.0]
+    )
+
+    return vertices, cells
+
+
+def horizon(throw_extent: float = np.inf) -> tuple[np.ndarray, np.ndarray]:
+    """Random horizon points with a throw on the east side of the fault."""
+    locations = np.random.default_rng(0).uniform(0.0, 20.0, (2000, 2))
+    east = (locations[:, 0] - 0.3 * locations[:, 1] - 8.0 > 0) & (
+        locations[:, 1] < throw_extent
+    )
+    points = np.c_[locations, 0.05 * locations[:, 0] - 3.0 * east]
+
+    return points, east
+
+
+def assert_clipped(vertices: np.ndarray, cells: np.ndarray, fault: TriangleTree):
+    """No edge crosses the fault, other than edges lying on it."""
+    edges, _, _ = edge_table(cells)
+    crossing = ~np.isnan(
+        fault_crossings(fault, vertices[edges[:, 0]], vertices[edges[:, 1]])
+    )
+    distance = np.abs(fault.signed_distance(vertices))
+    assert np.all(distance[edges[crossing]] < 1e-6)
+
+    corners = vertices[cells]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    assert np.all(normals[:, 2] > 0)
+
+
+def test_through_fault():
+    points, east = horizon()
+    fault = TriangleTree(*vertical_fault(25.0))
+    n_blocks, labels = fault_blocks(points, [fault])
+
+    assert n_blocks == 2
+    assert np.all(labels[east] != labels[~east][0])
+    for block in range(n_blocks):
+        vertices, cells = triangulate_block(points[labels == block], [fault])
+        assert_clipped(vertices, cells, fault)
+
+
+def test_fault_tip():
+    points, east = horizon(throw_extent=9.0)
+    fault = TriangleTree(*vertical_fault(10.0))
+    n_blocks, _ = fault_blocks(points, [fault])
+
+    # The blocks connect around the tip, but the surface is torn along the fault
+    assert n_blocks == 1
+    vertices, cells = triangulate_block(points, [fault])
+    assert vertices.shape[0] > points.shape[0]
+    assert_clipped(vertices, cells, fault)
+
+
+def test_faulted_horizon_command(tmp_path, caplog):
+    points, east = horizon()
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        horizon_points = Points.create(workspace, vertices=points, name="horizon")
+        vertices, cells = vertical_fault(25.0)
+        fault = Surface.create(workspace, vertices=vertices, cells=cells, name="fault")
+
+    file_path = write_ui_json(
+        tmp_path,
+        "faulted_horizon",
+        workspace,
+        points=horizon_points,
+        faults=[f"{{{fault.uid}}}"],
+        workers=2,
+    )
+    with caplog.at_level(logging.INFO, logger="surface_apps"):
+        FaultedHorizonDriver.start(file_path)
+    assert "'workers': 2" in caplog.text
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        surface = workspace.get_entity("Faulted horizon")[0]
+        labels = workspace.get_entity(horizon_points.uid)[0].get_data("fault_block")[0]
+        blocks = surface.get_data("fault_block")[0].values
+
+        assert set(np.unique(labels.values)) == {1, 2}
+        assert set(np.unique(blocks)) == {1, 2}
+        east_block = labels.values[east][0]
+        centroids = surface.vertices[surface.cells].mean(axis=1)
+        assert np.all(
+            (centroids[:, 0] - 0.3 * centroids[:, 1] - 8.0 > 0)
+            == (blocks == east_block)
+        )
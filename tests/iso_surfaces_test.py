@@ -0,0 +1,265 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import BlockModel
+from geoh5py.workspace import Workspace
+
+from surface_apps.checkpoint import Checkpoint
+from surface_apps.commands import iso_surfaces
+from surface_apps.commands.iso_surfaces import (
+    IsoSurfacesDriver,
+    output_group,
+    probability_shells,
+    realization_surfaces,
+)
+from surface_apps.mesh.iso_surface import (
+    GridTopology,
+    RangePyramid,
+    contour,
+    contour_batch,
+)
+from surface_apps.output import create_surface
+
+from .utils import write_ui_json
+
+RADII = (3.0, 4.5, 6.0, 7.5)
+
+
+def signed_volume(vertices: np.ndarray, cells: np.ndarray) -> float:
+    corners = vertices[cells]
+    return (
+        np.einsum(
+            "ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2])
+        ).sum()
+        / 6.0
+    )
+
+
+def test_contour():
+    axes = [np.linspace(-10.0, 10.0, 41), np.linspace(-8.0, 8.0, 33), np.r_[-9:9.5:0.5]]
+    topology = GridTopology(tuple(axis.shape[0] for axis in axes))
+    x_loc, y_loc, z_loc = np.meshgrid(*axes, indexing="ij")
+    radius = np.sqrt(x_loc**2 + y_loc**2 + z_loc**2).ravel()
+    values = np.c_[5.0 - radius, 7.0 - radius]
+
+    for (vertices, cells), level in zip(
+        contour_batch(topology, values, axes, 0.0), (5.0, 7.0)
+    ):
+        # Closed, consistently oriented and with outward normals
+        edges = np.stack([cells, np.roll(cells, -1, axis=1)], axis=2).reshape((-1, 2))
+        assert np.unique(edges, axis=0).shape[0] == edges.shape[0]
+        assert np.unique(np.sort(edges, axis=1), axis=0).shape[0] * 2 == edges.shape[0]
+        assert np.allclose(np.linalg.norm(vertices, axis=1), level, atol=0.05)
+        assert np.isclose(
+            signed_volume(vertices, cells), 4 / 3 * np.pi * level**3, 0.01
+        )
+
+    vertices, cells = contour(topology, values[:, 0], axes, 0.0)
+    np.testing.assert_array_equal(
+        contour_batch(topology, values, axes, 0.0)[0][1], cells
+    )
+
+    vertices, cells = contour(topology, values[:, 0], axes, 10.0)
+    assert vertices.shape == (0, 3) and cells.shape == (0, 3)
+
+
+def test_range_pyramid():
+    axes = [np.arange(37.0), np.arange(29.0), np.arange(23.0)]
+    topology = GridTopology(tuple(axis.shape[0] for axis in axes))
+    x_loc, y_loc, z_loc = np.meshgrid(*axes, indexing="ij")
+    values = 4.0 - np.sqrt((x_loc - 10) ** 2 + (y_loc - 9) ** 2 + (z_loc - 7) ** 2)
+    values = values.ravel()
+    values[::101] = np.nan
+
+    pyramid = RangePyramid(topology, values, block_size=4)
+    assert pyramid.levels[-1][0].shape == (1, 1, 1)
+    for threshold in (-30.0, 0.0, 3.5, 10.0):
+        cubes = pyramid.active_cubes(threshold)
+        assert cubes.shape[0] < topology.n_cubes or threshold < -20.0
+        expected = contour(topology, values, axes, threshold)
+        skipped = contour(topology, values, axes, threshold, cubes=cubes)
+        np.testing.assert_array_equal(skipped[1], expected[1])
+        np.testing.assert_allclose(skipped[0], expected[0])
+
+    batch = contour_batch(topology, np.c_[values, values + 1.0], axes, 0.0, 4)
+    np.testing.assert_array_equal(
+        batch[1][1], contour(topology, values + 1.0, axes, 0.0)[1]
+    )
+
+
+def create_realizations(workspace: Workspace) -> BlockModel:
+    block_model = BlockModel.create(
+        workspace,
+        origin=[100.0, 200.0, 50.0],
+        rotation=20.0,
+        u_cell_delimiters=np.arange(-10.0, 10.5, 0.5),
+        v_cell_delimiters=np.arange(-10.0, 10.5, 0.5),
+        z_cell_delimiters=-np.arange(0.0, 20.5, 0.5),
+    )
+    center = block_model.centroids.mean(axis=0)
+    radius = np.linalg.norm(block_model.centroids - center, axis=1)
+    block_model.add_data(
+        {
+            f"realization_{index}": {"values": level - radius, "association": "CELL"}
+            for index, level in enumerate(RADII)
+        }
+    )
+
+    return block_model
+
+
+def test_realization_surfaces(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        block_model = create_realizations(workspace)
+        center = block_model.centroids.mean(axis=0)
+        data = [block_model.get_data(f"realization_{i}")[0] for i in range(4)]
+
+        serial = realization_surfaces(block_model, data, 0.0, workers=1, batch_size=3)
+        assert [surface.name for surface in serial] == [datum.name for datum in data]
+        for surface, level in zip(serial, RADII):
+            radius = np.linalg.norm(surface.vertices - center, axis=1)
+            assert np.allclose(radius, level, atol=0.05)
+            assert signed_volume(surface.vertices - center, surface.cells) > 0
+
+        parallel = realization_surfaces(block_model, data, 0.0, workers=2, batch_size=1)
+        for expected, surface in zip(serial, parallel):
+            np.testing.assert_allclose(surface.vertices, expected.vertices)
+            np.testing.assert_array_equal(surface.cells, expected.cells)
+
+        # Completed realizations are read back from the checkpoint
+        checkpoint = Checkpoint(tmp_path / "job.checkpoint")
+        checkpoint.save(
+            1,
+            vertices=np.eye(3),
+            cells=np.array([[0, 1, 2]]),
+        )
+        resumed = realization_surfaces(block_model, data, 0.0, checkpoint=checkpoint)
+        np.testing.assert_allclose(resumed[1].cells, [[0, 1, 2]])
+        np.testing.assert_allclose(resumed[2].vertices, serial[2].vertices)
+        assert not checkpoint.path.exists()
+
+
+def test_probability_shells(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        block_model = create_realizations(workspace)
+        data = [block_model.get_data(f"realization_{i}")[0] for i in range(4)]
+        levels = [0.25, 0.75, 1.0]
+
+        serial = probability_shells(block_model, data, 0.0, levels, batch_size=4)
+        parallel = probability_shells(
+            block_model, data, 0.0, levels, workers=2, batch_size=1
+        )
+        assert [surface.name for surface in parallel] == ["P0.25", "P0.75", "P1"]
+        for expected, surface in zip(serial, parallel):
+            np.testing.assert_allclose(surface.vertices, expected.vertices)
+            np.testing.assert_array_equal(surface.cells, expected.cells)
+
+        # Counts of the first realizations are read back from the checkpoint,
+        # here as if none of the first three exceeded the threshold
+        checkpoint = Checkpoint(tmp_path / "job.checkpoint")
+        n_nodes = block_model.n_cells
+        checkpoint.save("counts", counts=np.zeros(n_nodes, int), start=np.array(3))
+        resumed = probability_shells(
+            block_model, data, 0.0, levels, batch_size=1, checkpoint=checkpoint
+        )
+        assert [surface.name for surface in resumed] == ["P0.25"]
+        np.testing.assert_allclose(resumed[0].vertices, serial[0].vertices)
+        assert not checkpoint.path.exists()
+
+
+def test_resume_after_write(tmp_path, monkeypatch):
+    # Jobs interrupted while writing their surfaces do not duplicate them
+    created = []
+
+    def interrupted(*args, **kwargs):
+        if len(created) == 2:
+            raise KeyboardInterrupt
+        created.append(create_surface(*args, **kwargs))
+        return created[-1]
+
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        block_model = create_realizations(workspace)
+        data = [block_model.get_data(f"realization_{i}")[0] for i in range(4)]
+        jobs = {
+            "realizations": lambda **kwargs: realization_surfaces(
+                block_model, data, 0.0, **kwargs
+            ),
+            "shells": lambda **kwargs: probability_shells(
+                block_model, data, 0.0, [0.25, 0.5, 0.75], **kwargs
+            ),
+        }
+        for name, job in jobs.items():
+            created.clear()
+            group = ContainerGroup.create(workspace, name=name)
+            checkpoint = Checkpoint(tmp_path / f"{name}.checkpoint")
+            monkeypatch.setattr(iso_surfaces, "create_surface", interrupted)
+            with pytest.raises(KeyboardInterrupt):
+                job(parent=group, checkpoint=checkpoint)
+            assert len(group.children) == 2
+
+            monkeypatch.setattr(iso_surfaces, "create_surface", create_surface)
+            surfaces = job(parent=group, checkpoint=checkpoint)
+            assert surfaces[:2] == created
+            assert len(group.children) == len(surfaces) == 3 + (name == "realizations")
+
+
+def test_output_group(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        checkpoint = Checkpoint(tmp_path / "job.checkpoint")
+        group = output_group(workspace, "Iso-surfaces", checkpoint)
+
+        # A resumed job writes to the group of the interrupted one
+        assert output_group(workspace, "Iso-surfaces", checkpoint) is group
+        assert len(workspace.get_entity("Iso-surfaces")) == 1
+        assert checkpoint.pending(range(2)) == [0, 1]
+
+        # Without a checkpoint, or if the group is missing, a new one is made
+        assert output_group(workspace, "Iso-surfaces") is not group
+        checkpoint.save("group", uid=np.array(str(uuid4())))
+        assert output_group(workspace, "Iso-surfaces", checkpoint) is not group
+
+
+def test_iso_surfaces_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        block_model = create_realizations(workspace)
+        center = block_model.centroids.mean(axis=0)
+        data = [
+            f"{{{block_model.get_data(f'realization_{i}')[0].uid}}}" for i in range(4)
+        ]
+
+    file_path = write_ui_json(
+        tmp_path,
+        "iso_surfaces",
+        workspace,
+        block_model=block_model,
+        data=data,
+        threshold=0.0,
+        output="Probability shells",
+        probabilities="0.25, 0.75, 1",
+        workers=1,
+    )
+    IsoSurfacesDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        group = workspace.get_entity("Iso-surfaces")[0]
+        assert isinstance(group, ContainerGroup)
+        shells = {child.name: child for child in group.children}
+        assert set(shells) == {"P0.25", "P0.75", "P1"}
+
+        # Three of four realizations exceed the threshold within radius 4.5
+        radius = np.linalg.norm(shells["P0.75"].vertices - center, axis=1)
+        assert np.all((radius > 3.0) & (radius < 4.5 + 0.05))
+        radius = np.linalg.norm(shells["P1"].vertices - center, axis=1)
+        assert np.all(radius < 3.0 + 0.05)
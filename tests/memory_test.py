@@ -0,0 +1,103 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from surface_apps import memory
+from surface_apps.memory import (
+    DEFAULT_AVAILABLE,
+    GIB,
+    MemoryBudget,
+    _meminfo_available,
+    _windows_available,
+    available_memory,
+)
+from surface_apps.mesh.drape import TriangleGrid
+
+from .utils import grid_surface
+
+
+def test_available_memory(tmp_path):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text(
+        "MemTotal:       16000000 kB\nMemAvailable:    8000000 kB\n", encoding="utf-8"
+    )
+    assert _meminfo_available(meminfo) == 8_000_000 * 1024
+    assert _meminfo_available(tmp_path / "missing") is None
+    assert available_memory() > 0
+
+
+class FakeKernel32:
+    """Stand-in for kernel32.dll reporting a fixed available memory."""
+
+    def __init__(self, available: int):
+        self.available = available
+
+    def GlobalMemoryStatusEx(self, status):  # pylint: disable=invalid-name
+        status._obj.ullAvailPhys = self.available  # pylint: disable=protected-access
+        return int(self.available > 0)
+
+
+def test_available_memory_windows(monkeypatch):
+    assert _windows_available(FakeKernel32(3 * GIB)) == 3 * GIB
+    assert _windows_available(FakeKernel32(0)) is None
+
+    monkeypatch.setattr(memory, "find_spec", lambda name: None)
+    monkeypatch.setattr(memory.sys, "platform", "win32")
+    monkeypatch.setattr(memory, "_windows_available", lambda: 5 * GIB)
+    assert available_memory() == 5 * GIB
+
+    monkeypatch.setattr(memory, "_windows_available", lambda: None)
+    assert available_memory() == DEFAULT_AVAILABLE
+
+
+def test_memory_budget():
+    budget = MemoryBudget(limit=1.0)
+    assert budget.bytes <= GIB
+    assert budget.chunk_size(GIB / 4) <= 4
+    assert budget.chunk_size(2 * GIB) == 1
+    assert budget.chunk_size(1.0, maximum=10) == 10
+
+    with pytest.raises(ValueError, match="Memory limit"):
+        MemoryBudget(limit=-1.0)
+    with pytest.raises(ValueError, match="Memory fraction"):
+        MemoryBudget(fraction=0.0)
+
+
+def test_process_halves_chunks():
+    calls = []
+    done = np.zeros(100, dtype=int)
+
+    def function(start: int, stop: int):
+        calls.append((start, stop))
+        if stop - start > 16:
+            raise MemoryError
+        done[start:stop] += 1
+
+    MemoryBudget().process(function, 100, 1.0, chunk_size=64)
+    np.testing.assert_array_equal(done, 1)
+    assert calls[:4] == [(0, 64), (0, 32), (0, 16), (16, 32)]
+
+    with pytest.raises(MemoryError):
+        MemoryBudget().process(function, 100, 1.0, chunk_size=64, minimum=32)
+
+
+def test_locate_within_budget():
+    vertices, cells = grid_surface(11, 11)
+    points = np.c_[np.random.default_rng(0).uniform(0, 10, (500, 2)), np.zeros(500)]
+    grid = TriangleGrid(vertices, cells)
+    expected, _ = grid.locate(points)
+
+    # A budget of a few points per batch gives the same triangles
+    budget = MemoryBudget(limit=4096 / GIB)
+    triangle, _ = grid.locate(points, budget=budget)
+    assert budget.chunk_size(1024.0) == 4
+    np.testing.assert_array_equal(triangle, expected)
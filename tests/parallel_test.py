@@ -0,0 +1,186 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import os
+import threading
+from multiprocessing import Manager
+
+import numpy as np
+import pytest
+from geoh5py.objects import Points, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.faulted_horizon import faulted_horizon
+from surface_apps.parallel import (
+    THREAD_VARIABLES,
+    Prefetcher,
+    merge_meshes,
+    ordered_map,
+    resolve_threads,
+    resolve_workers,
+    runtime_summary,
+    tree_sum,
+)
+
+from .faulted_horizon_test import horizon, vertical_fault
+
+_OFFSET = 0
+
+
+def _set_offset(offset: int):
+    global _OFFSET  # pylint: disable=global-statement
+    _OFFSET = offset
+
+
+def _ordered_task(index: int, done: list, events: list | None = None) -> int:
+    # Even tasks wait for the next one, so that it completes first
+    if events is not None and index % 2 == 0:
+        assert events[index + 1].wait(timeout=30), "Task never completed"
+    done.append(index)
+    if events is not None:
+        events[index].set()
+    return index + _OFFSET
+
+
+def test_ordered_map():
+    with Manager() as manager:
+        for workers in (1, 3):
+            done = manager.list()
+            events = [manager.Event() for _ in range(6)] if workers > 1 else None
+            results = ordered_map(
+                _ordered_task,
+                [(index, done, events) for index in range(6)],
+                workers=workers,
+                initializer=_set_offset,
+                initargs=(10,),
+            )
+            assert list(results) == list(range(10, 16))
+
+        # Results come in submission order, not completion order
+        assert list(done) == [1, 0, 3, 2, 5, 4]
+
+    with pytest.raises(ValueError, match="Number of workers"):
+        next(ordered_map(_ordered_task, [], workers=-1))
+
+
+def _thread_variable(variable: str) -> str | None:
+    return os.environ.get(variable)
+
+
+def test_thread_limits(monkeypatch):
+    monkeypatch.setenv("SURFACE_APPS_WORKERS", "3")
+    monkeypatch.setenv("SURFACE_APPS_THREADS", "")
+    monkeypatch.setattr(os, "cpu_count", lambda: 32)
+    assert resolve_workers(0) == 3
+    assert resolve_workers(4) == 4
+    assert resolve_threads(0, 4) == 8
+    assert resolve_threads(0, 64) == 1
+    assert resolve_threads(2, 4) == 2
+
+    monkeypatch.setenv("SURFACE_APPS_THREADS", "5")
+    summary = runtime_summary()
+    assert (summary["cpu_count"], summary["workers"], summary["threads"]) == (32, 3, 5)
+
+    monkeypatch.setenv("SURFACE_APPS_THREADS", "many")
+    with pytest.raises(ValueError, match="SURFACE_APPS_THREADS"):
+        resolve_threads(0, 1)
+    with pytest.raises(ValueError, match="Number of threads"):
+        resolve_threads(-1, 1)
+
+    # Workers run with capped thread pools, the caller keeps its environment,
+    # also while it consumes the results
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    tasks = [(variable,) for variable in THREAD_VARIABLES]
+    results = []
+    for result in ordered_map(_thread_variable, tasks, workers=2, threads=2):
+        assert "OMP_NUM_THREADS" not in os.environ
+        results.append(result)
+    assert results == ["2"] * len(THREAD_VARIABLES)
+
+
+def test_prefetcher():
+    reads = []
+    read_done = [threading.Event() for _ in range(100)]
+
+    def read(item: int) -> int:
+        if item == 3:
+            raise OSError("Unreadable entity")
+        reads.append(item)
+        read_done[item].set()
+        return item * 10
+
+    prefetcher = Prefetcher(read, depth=1)
+    results = []
+    for item, inputs in prefetcher(range(3)):
+        # The next item is read while this one is processed, before the
+        # consumer takes the workspace lock to write its results
+        if item < 2:
+            assert read_done[item + 1].wait(timeout=30), "Reads did not overlap"
+        with prefetcher.lock:
+            results.append((item, inputs))
+    assert results == [(0, 0), (1, 10), (2, 20)]
+
+    # Errors reach the consumer, and stopping early ends the reader
+    with pytest.raises(OSError, match="Unreadable"):
+        list(prefetcher(range(5)))
+    for item, _ in prefetcher(range(100)):
+        if item == 1:
+            break
+    assert len(reads) < 20
+
+    with pytest.raises(ValueError, match="depth"):
+        Prefetcher(read, depth=0)
+
+
+def test_tree_sum():
+    rng = np.random.default_rng(0)
+    parts = rng.standard_normal((9, 4)) * 10.0 ** rng.integers(-8, 8, (9, 1))
+    np.testing.assert_allclose(tree_sum(parts), np.sum(parts, axis=0))
+    # Pairs of consecutive parts, then pairs of pairs
+    expected = ((parts[0] + parts[1]) + (parts[2] + parts[3])) + (
+        (parts[4] + parts[5]) + (parts[6] + parts[7])
+    )
+    np.testing.assert_array_equal(tree_sum(parts), expected + parts[8])
+
+    # Groups are summed separately, in the same order as on their own
+    labels = rng.integers(0, 3, 9)
+    grouped = tree_sum(parts, labels, minlength=5)
+    assert grouped.shape == (5, 4)
+    for label in range(3):
+        np.testing.assert_array_equal(grouped[label], tree_sum(parts[labels == label]))
+    np.testing.assert_array_equal(grouped[3:], 0.0)
+
+    with pytest.raises(ValueError, match="At least one"):
+        tree_sum([])
+
+
+def test_merge_meshes():
+    vertices, cells = merge_meshes(
+        [
+            (np.zeros((3, 3)), np.array([[0, 1, 2]])),
+            (np.ones((4, 3)), np.array([[3, 2, 1]])),
+        ]
+    )
+    assert vertices.shape == (7, 3)
+    np.testing.assert_array_equal(cells, [[0, 1, 2], [6, 5, 4]])
+
+
+def test_faulted_horizon_reproducible(tmp_path):
+    points, _ = horizon()
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        horizon_points = Points.create(workspace, vertices=points, name="horizon")
+        vertices, cells = vertical_fault(25.0)
+        fault = Surface.create(workspace, vertices=vertices, cells=cells)
+
+        serial = faulted_horizon(horizon_points, [fault], workers=1)
+        parallel = faulted_horizon(horizon_points, [fault], workers=3)
+
+        np.testing.assert_array_equal(serial.vertices, parallel.vertices)
+        np.testing.assert_array_equal(serial.cells, parallel.cells)
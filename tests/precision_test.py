@@ -0,0 +1,67 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.mesh.precision import CompactMesh, index_dtype
+from surface_apps.mesh.smoothing import taubin_smoothing
+from surface_apps.output import create_surface, load_surface
+
+from .utils import icosphere
+
+UTM = np.r_[450_000.0, 7_000_000.0, 500.0]
+
+
+def test_index_dtype():
+    assert index_dtype(256) == np.uint8
+    assert index_dtype(257) == np.uint16
+    assert index_dtype(2**16 + 1) == np.uint32
+    assert index_dtype(2**32 + 1) == np.uint64
+
+
+def test_compact_mesh_utm():
+    vertices, cells = icosphere(3, radius=5000.0)
+    vertices += UTM
+    mesh = CompactMesh.from_arrays(vertices, cells, tolerance=1e-3)
+
+    assert mesh.offsets.dtype == np.float32
+    assert mesh.cells.dtype == np.uint16
+    assert mesh.nbytes < (vertices.nbytes + cells.nbytes) / 2
+    assert mesh.round_trip_error(vertices) < 1e-3
+
+    # Plain float32 coordinates lose the sub-meter precision
+    assert np.abs(vertices.astype(np.float32) - vertices).max() > 0.1
+
+    with pytest.raises(ValueError, match="exceeds the tolerance"):
+        CompactMesh.from_arrays(vertices * 1e4, cells, tolerance=1e-3)
+
+
+def test_compact_surface_round_trip(tmp_path):
+    vertices, cells = icosphere(3, radius=100.0)
+    vertices += UTM
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+        origin, offsets, compact_cells = load_surface(surface, compact=True)
+        smoothed = taubin_smoothing(offsets, compact_cells, iterations=5)
+
+        assert smoothed.dtype == np.float32
+
+        output = create_surface(
+            workspace, origin + smoothed.astype(np.float64), cells, compact=True
+        )
+        np.testing.assert_array_equal(
+            output.vertices, origin + smoothed.astype(np.float64)
+        )
+        np.testing.assert_allclose(
+            output.vertices, taubin_smoothing(vertices, cells, iterations=5), atol=1e-3
+        )
@@ -0,0 +1,79 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from surface_apps.progress import JobCancelled, ProgressReporter, run_with_progress
+
+
+def test_reporter_advance():
+    reporter = ProgressReporter(total=4)
+    processed = list(reporter.chunks(range(4), message="{count}/{total}"))
+
+    assert processed == [0, 1, 2, 3]
+    assert reporter.fraction == 1.0
+    assert reporter.drain() == (1.0, "4/4")
+    assert reporter.drain() is None
+
+    with pytest.raises(ValueError, match="at least 1"):
+        ProgressReporter(total=0)
+
+
+def test_reporter_cancel_at_chunk_boundary():
+    reporter = ProgressReporter(total=10)
+    processed = []
+    with pytest.raises(JobCancelled):
+        for chunk in reporter.chunks(range(10)):
+            processed.append(chunk)
+            if chunk == 2:
+                reporter.cancel()
+
+    assert processed == [0, 1, 2]
+    assert reporter.count == 3
+
+
+def test_run_with_progress_console(capsys):
+    def work(reporter, values):
+        return sum(reporter.chunks(values, message="chunk {count}"))
+
+    assert run_with_progress(work, [1, 2, 3], total=3, gui=False) == 6
+    assert "chunk" in capsys.readouterr().out
+
+
+def test_run_with_progress_cancelled():
+    started = threading.Event()
+
+    def work(reporter):
+        for _ in reporter.chunks(iter(int, 1)):
+            started.set()
+
+    def cancel_when_started(reporter_holder):
+        started.wait()
+        reporter_holder[0].cancel()
+
+    holder: list[ProgressReporter] = []
+
+    def wrapped(reporter):
+        holder.append(reporter)
+        threading.Thread(target=cancel_when_started, args=(holder,)).start()
+        return work(reporter)
+
+    with pytest.raises(JobCancelled):
+        run_with_progress(wrapped, gui=False)
+
+
+def test_run_with_progress_error():
+    def work(_):
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        run_with_progress(work, gui=False)
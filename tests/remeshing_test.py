@@ -0,0 +1,129 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.remeshing import RemeshingDriver
+from surface_apps.mesh.adjacency import boundary_vertices, edge_table
+from surface_apps.mesh.attributes import face_normals, triangle_quality
+from surface_apps.mesh.distance import TriangleTree, closest_point_on_triangles
+from surface_apps.mesh.faults import delaunay_2d
+from surface_apps.mesh.remeshing import independent_operations, relax, remesh
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def test_independent_operations():
+    # Operations 0 and 2 share item 1, operation 1 shares item 3 with 2
+    owners = np.r_[0, 0, 1, 1, 2, 2]
+    items = np.r_[0, 1, 3, 4, 1, 3]
+
+    np.testing.assert_array_equal(
+        independent_operations(owners, items, 5), [True, True, False]
+    )
+
+
+def test_remesh_random_triangulation():
+    rng = np.random.default_rng(0)
+    points = np.r_[rng.random((500, 2)) * 5.0, [[0, 0], [5, 0], [0, 5], [5, 5]]]
+    vertices = np.c_[points, np.sin(points[:, 0])]
+    cells = delaunay_2d(vertices)
+
+    remeshed, new_cells = remesh(vertices, cells, 0.3)
+
+    quality = triangle_quality(remeshed, new_cells)
+    assert np.mean(quality < 0.5) < np.mean(triangle_quality(vertices, cells) < 0.5)
+    assert np.median(quality) > 0.9
+
+    edges, _, counts = edge_table(new_cells)
+    lengths = np.linalg.norm(remeshed[edges[:, 0]] - remeshed[edges[:, 1]], axis=1)
+    assert counts.max() == 2
+    assert abs(np.median(lengths) - 0.3) < 0.05
+
+    # Interior vertices stay on the input surface, boundaries on the square
+    interior = ~boundary_vertices(new_cells, remeshed.shape[0])
+    _, closest, _ = TriangleTree(vertices, cells).query(remeshed[interior])
+    np.testing.assert_allclose(closest, remeshed[interior], atol=1e-6)
+    on_square = np.isclose(remeshed[~interior, :2], 0) | np.isclose(
+        remeshed[~interior, :2], 5
+    )
+    assert on_square.any(axis=1).all()
+
+    with pytest.raises(ValueError, match="Target edge length"):
+        remesh(vertices, cells, 0.0)
+
+
+def test_relax_on_slivers():
+    # Rows of points far apart give long slivers between them
+    rng = np.random.default_rng(3)
+    points = np.c_[
+        rng.uniform(0, 100, 400), rng.choice([0.0, 0.3, 30.0, 30.3, 100.0], 400)
+    ]
+    points = np.r_[points, rng.uniform(40, 60, (400, 2))]
+    surface = np.c_[points, 5.0 * np.sin(points[:, 0] / 7.0)]
+    cells = delaunay_2d(surface)
+
+    vertices, grid = grid_surface(21, 21)
+    vertices[:, :2] *= 5.0
+    vertices[:, 2] = rng.uniform(-5, 5, vertices.shape[0])
+    relaxed = relax(vertices, grid, TriangleTree(surface, cells))
+
+    # Same projections as a search over all triangles
+    class BruteForce:  # pylint: disable=too-few-public-methods
+        @staticmethod
+        def query(points):
+            closest, feature = closest_point_on_triangles(
+                points[:, None], *surface[cells].transpose(1, 0, 2)[:, None]
+            )
+            nearest = np.linalg.norm(closest - points[:, None], axis=2).argmin(axis=1)
+            rows = np.arange(points.shape[0])
+            return nearest, closest[rows, nearest], feature[rows, nearest]
+
+    expected = relax(vertices, grid, BruteForce())
+    assert (expected != vertices).any(axis=1).sum() > 300
+    np.testing.assert_allclose(relaxed, expected, atol=1e-9)
+
+
+def test_remesh_closed_surface():
+    vertices, cells = icosphere(3, 10.0)
+
+    remeshed, new_cells = remesh(vertices, cells, 3.0)
+
+    _, _, counts = edge_table(new_cells)
+    assert np.all(counts == 2)
+    assert new_cells.shape[0] < cells.shape[0]
+    assert triangle_quality(remeshed, new_cells).min() > 0.5
+    np.testing.assert_allclose(np.linalg.norm(remeshed, axis=1), 10.0, atol=0.1)
+
+    # Outward normals are preserved
+    normals, _ = face_normals(remeshed, new_cells)
+    centers = remeshed[new_cells].mean(axis=1)
+    assert np.all(np.einsum("ij,ij->i", normals, centers) > 0)
+
+
+def test_remeshing_command(tmp_path):
+    vertices, cells = icosphere(3, 10.0)
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+
+    file_path = write_ui_json(
+        tmp_path, "remeshing", workspace, surface=surface, target_length=3.0
+    )
+    RemeshingDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        remeshed = workspace.get_entity("Remeshed")[0]
+        assert 0 < remeshed.n_cells < cells.shape[0]
+        np.testing.assert_allclose(
+            np.linalg.norm(remeshed.vertices, axis=1), 10.0, atol=0.1
+        )
@@ -0,0 +1,99 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import BlockModel, Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.report import ReportDriver, surface_report
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def create_surfaces(workspace: Workspace) -> ContainerGroup:
+    group = ContainerGroup.create(workspace, name="Wireframes")
+    vertices, cells = icosphere(3, radius=3.0)
+    Surface.create(
+        workspace,
+        vertices=np.r_[vertices, vertices + 10.0],
+        cells=np.r_[cells, cells + vertices.shape[0]],
+        name="pods",
+        parent=group,
+    )
+    vertices, cells = grid_surface(5, 5)
+    Surface.create(
+        workspace,
+        vertices=vertices.astype(float),
+        cells=cells,
+        name="plane",
+        parent=group,
+    )
+
+    return group
+
+
+def test_surface_report(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = create_surfaces(workspace)
+        block_model = BlockModel.create(
+            workspace,
+            origin=[-5.0, -5.0, -5.0],
+            u_cell_delimiters=np.arange(0.0, 21.0),
+            v_cell_delimiters=np.arange(0.0, 21.0),
+            z_cell_delimiters=np.arange(0.0, 21.0),
+        )
+        grade = block_model.add_data(
+            {
+                "grade": {
+                    "values": block_model.centroids[:, 0],
+                    "association": "CELL",
+                }
+            }
+        )
+        surfaces = sorted(group.children, key=lambda child: child.name)
+        table, components = surface_report(surfaces, block_model, [grade])
+
+    plane, pods = table.iloc[0], table.iloc[1]
+    assert plane["name"] == "plane" and not plane["closed"]
+    assert np.isnan(plane["volume"]) and np.isnan(plane["blocks"])
+    assert plane["area"] == 16.0 and plane["n_cells"] == 32
+    assert plane["quality_0.8_1.0"] == 32
+
+    assert pods["closed"] and pods["n_components"] == 2
+    np.testing.assert_allclose(pods["volume"], 2 * 4 / 3 * np.pi * 27, rtol=0.02)
+    np.testing.assert_allclose([pods["x_min"], pods["x_max"]], [-3.0, 13.0])
+    # Blocks centered at -2.5 to 12.5 along x, symmetric about each pod
+    np.testing.assert_allclose(pods["grade_mean"], 5.0)
+    assert pods["grade_count"] == pods["blocks"] > 0
+
+    assert components["name"].tolist() == ["plane", "pods", "pods"]
+    assert components["component"].tolist() == [0, 0, 1]
+    np.testing.assert_allclose(components["volume"].iloc[1:], pods["volume"] / 2)
+
+
+def test_report_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = create_surfaces(workspace)
+
+    file_path = write_ui_json(
+        tmp_path, "report", workspace, group=group, export_as="Monthly"
+    )
+    ReportDriver.start(file_path)
+
+    table = pd.read_csv(tmp_path / "Monthly_surfaces.csv")
+    assert set(table["name"]) == {"pods", "plane"}
+    assert (tmp_path / "Monthly_components.csv").exists()
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        group = workspace.get_entity("Wireframes")[0]
+        names = {child.name for child in group.children}
+        assert {"Monthly_surfaces.csv", "Monthly_components.csv"} <= names
@@ -0,0 +1,109 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import json
+import os
+from copy import deepcopy
+
+import numpy as np
+import pytest
+from geoh5py.objects import Surface
+from geoh5py.shared.exceptions import (
+    JSONParameterValidationError,
+    ValueValidationError,
+)
+from geoh5py.ui_json import InputFile
+from geoh5py.workspace import Workspace
+
+from surface_apps.driver import ui_json_template
+from surface_apps.schema import CompiledSchema, SchemaCache, SchemaInputFile
+from surface_apps.schema import read_ui_json as read_with_schema
+
+from .utils import icosphere, write_ui_json
+
+
+def test_schema_cache(tmp_path, monkeypatch):
+    template = tmp_path / "smoothing.ui.json"
+    template.write_text(json.dumps(ui_json_template("smoothing")), encoding="utf-8")
+
+    compiled = []
+    original = CompiledSchema.compile.__func__
+
+    def counting(cls, ui_json, digest):
+        compiled.append(digest)
+        return original(cls, ui_json, digest)
+
+    monkeypatch.setattr(CompiledSchema, "compile", classmethod(counting))
+
+    schema = SchemaCache(tmp_path / "cache").get(template)
+    assert len(list((tmp_path / "cache").glob("*.schema.pickle"))) == 1
+    assert SchemaCache(tmp_path / "cache").get(template) == schema
+    assert len(compiled) == 1
+
+    # Same content with a new modification time, found by hash
+    os.utime(template, ns=(0, 0))
+    assert SchemaCache(tmp_path / "cache").get(template) == schema
+    assert len(compiled) == 1
+
+    content = deepcopy(ui_json_template("smoothing"))
+    content["method"]["choiceList"].append("Other")
+    template.write_text(json.dumps(content), encoding="utf-8")
+    cache = SchemaCache(tmp_path / "cache")
+    assert cache.get(template).static["method"]["choiceList"][-1] == "Other"
+    assert len(compiled) == 2
+
+    cache.clear()
+    assert not list((tmp_path / "cache").glob("*.schema.pickle"))
+
+
+def test_read_with_schema(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        vertices, cells = icosphere(2)
+        surface = Surface.create(
+            workspace, vertices=vertices, cells=cells, name="sphere"
+        )
+
+    file_path = write_ui_json(
+        tmp_path,
+        "smoothing",
+        workspace,
+        surface=surface,
+        method="Laplacian",
+    )
+    expected = InputFile.read_ui_json(file_path)
+    ifile = read_with_schema(file_path, "smoothing")
+
+    assert isinstance(ifile, SchemaInputFile)
+    assert type(ifile).schema is not None and SchemaInputFile.schema is None
+    assert ifile.ui_json.keys() == expected.ui_json.keys()
+    for key, form in expected.ui_json.items():
+        if isinstance(form, dict) and key != "surface":
+            assert ifile.ui_json[key] == form
+            assert list(ifile.ui_json[key]) == list(form)
+
+    assert ifile.data["surface"].uid == surface.uid
+    assert ifile.data["method"] == "Laplacian"
+    assert np.isclose(ifile.data["factor"], expected.data["factor"])
+
+    # Forms modified by the user are parsed and validated in full
+    content = json.loads(file_path.read_text(encoding="utf-8"))
+    content["method"]["choiceList"] = ["Laplacian"]
+    content["method"]["value"] = "Taubin"
+    file_path.write_text(json.dumps(content), encoding="utf-8")
+
+    with pytest.raises(ValueValidationError, match="Taubin"):
+        _ = read_with_schema(file_path, "smoothing").data
+
+    # User values of unchanged forms are still validated
+    content["method"] = ui_json_template("smoothing")["method"] | {"enabled": "yes"}
+    file_path.write_text(json.dumps(content), encoding="utf-8")
+
+    with pytest.raises(JSONParameterValidationError, match="method"):
+        read_with_schema(file_path, "smoothing")
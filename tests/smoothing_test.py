@@ -0,0 +1,122 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geoh5py.groups import ContainerGroup
+from geoh5py.objects import Surface
+from geoh5py.workspace import Workspace
+
+from surface_apps.commands.batch_smoothing import BatchSmoothingDriver
+from surface_apps.commands.smoothing import SmoothingDriver, smooth_surface
+from surface_apps.mesh.smoothing import laplacian_smoothing, taubin_smoothing
+
+from .utils import grid_surface, icosphere, write_ui_json
+
+
+def noisy_sphere(seed: int = 0):
+    vertices, cells = icosphere(3)
+    rng = np.random.default_rng(seed)
+    vertices *= 1 + 0.05 * rng.standard_normal((vertices.shape[0], 1))
+    return vertices, cells
+
+
+def test_smoothing_reduces_noise():
+    vertices, cells = noisy_sphere()
+    noise = np.linalg.norm(vertices, axis=1).std()
+
+    laplacian = laplacian_smoothing(vertices, cells, iterations=10)
+    taubin = taubin_smoothing(vertices, cells, iterations=10)
+
+    assert np.linalg.norm(laplacian, axis=1).std() < noise / 2
+    assert np.linalg.norm(taubin, axis=1).std() < noise / 2
+
+    # Taubin smoothing does not shrink the shell
+    radius = np.linalg.norm(vertices, axis=1).mean()
+    assert abs(np.linalg.norm(taubin, axis=1).mean() - radius) < 0.01
+    assert np.linalg.norm(laplacian, axis=1).mean() < radius - 0.02
+
+
+def test_smoothing_weights_and_boundary():
+    vertices, cells = grid_surface(10, 10)
+    vertices[:, 2] = np.random.default_rng(0).random(vertices.shape[0])
+    weights = np.ones(vertices.shape[0])
+    weights[55] = 0.0
+
+    smoothed = laplacian_smoothing(vertices, cells, iterations=5, weights=weights)
+
+    boundary = (
+        (vertices[:, 0] == 0)
+        | (vertices[:, 0] == 9)
+        | (vertices[:, 1] == 0)
+        | (vertices[:, 1] == 9)
+    )
+    np.testing.assert_array_equal(smoothed[boundary], vertices[boundary])
+    np.testing.assert_array_equal(smoothed[55], vertices[55])
+    assert smoothed[~boundary, 2].std() < vertices[~boundary, 2].std()
+
+    with pytest.raises(ValueError, match="Weights must be of shape"):
+        laplacian_smoothing(vertices, cells, weights=np.ones(3))
+
+    with pytest.raises(ValueError, match="Smoothing factor"):
+        taubin_smoothing(vertices, cells, factor=2.0)
+
+    with pytest.raises(ValueError, match="Pass band"):
+        taubin_smoothing(vertices, cells, pass_band=3.0)
+
+
+def test_smoothing_command(tmp_path):
+    vertices, cells = noisy_sphere()
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        surface = Surface.create(workspace, vertices=vertices, cells=cells)
+        surface.add_data({"values": {"values": np.arange(vertices.shape[0])}})
+
+    file_path = write_ui_json(
+        tmp_path, "smoothing", workspace, surface=surface, export_as="Smooth"
+    )
+    SmoothingDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        smoothed = workspace.get_entity("Smooth")[0]
+        assert smoothed.n_cells == cells.shape[0]
+        assert smoothed.get_data("values")
+        assert (
+            np.linalg.norm(smoothed.vertices, axis=1).std()
+            < np.linalg.norm(vertices, axis=1).std()
+        )
+
+
+def test_batch_smoothing_command(tmp_path):
+    with Workspace.create(tmp_path / "test.geoh5") as workspace:
+        group = ContainerGroup.create(workspace, name="Shells")
+        for seed in range(4):
+            vertices, cells = noisy_sphere(seed)
+            Surface.create(
+                workspace,
+                vertices=vertices + 10.0 * seed,
+                cells=cells,
+                name=f"shell_{seed}",
+                parent=group,
+            )
+
+    file_path = write_ui_json(
+        tmp_path, "batch_smoothing", workspace, group=group, workers=2, prefetch=1
+    )
+    BatchSmoothingDriver.start(file_path)
+
+    with Workspace(tmp_path / "test.geoh5") as workspace:
+        group = workspace.get_entity("Shells")[0]
+        children = {child.name: child for child in group.children}
+        assert len(children) == 8
+        for seed in range(4):
+            expected = smooth_surface(children[f"shell_{seed}"])
+            np.testing.assert_allclose(
+                children[f"shell_{seed}_smoothed"].vertices, expected.vertices
+            )
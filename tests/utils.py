@@ -0,0 +1,127 @@
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+#  Copyright (c) 2024 Mira Geoscience Ltd.                                     '
+#                                                                              '
+#  This file is part of surface-apps package.                                        '
+#                                                                              '
+#  All rights reserved.                                                        '
+# ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+from geoh5py.shared import Entity
+from geoh5py.workspace import Workspace
+
+from surface_apps import assets_path
+
+
+def icosphere(
+    subdivisions: int = 2, radius: float = 1.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Closed triangulated sphere with outward normals."""
+    phi = (1 + 5**0.5) / 2
+    vertices = np.array(
+        [
+            [-1, phi, 0],
+            [1, phi, 0],
+            [-1, -phi, 0],
+            [1, -phi, 0],
+            [0, -1, phi],
+            [0, 1, phi],
+            [0, -1, -phi],
+            [0, 1, -phi],
+            [phi, 0, -1],
+            [phi, 0, 1],
+            [-phi, 0, -1],
+            [-phi, 0, 1],
+        ],
+        dtype=float,
+    )
+    cells = np.array(
+        [
+            [0, 11, 5],
+            [0, 5, 1],
+            [0, 1, 7],
+            [0, 7, 10],
+            [0, 10, 11],
+            [1, 5, 9],
+            [5, 11, 4],
+            [11, 10, 2],
+            [10, 7, 6],
+            [7, 1, 8],
+            [3, 9, 4],
+            [3, 4, 2],
+            [3, 2, 6],
+            [3, 6, 8],
+            [3, 8, 9],
+            [4, 9, 5],
+            [2, 4, 11],
+            [6, 2, 10],
+            [8, 6, 7],
+            [9, 8, 1],
+        ]
+    )
+    for _ in range(subdivisions):
+        edges = np.sort(
+            np.stack([cells, np.roll(cells, -1, axis=1)], axis=2).reshape((-1, 2)),
+            axis=1,
+        )
+        unique, inverse = np.unique(edges, axis=0, return_inverse=True)
+        mid = vertices.shape[0] + inverse.reshape((-1, 3))
+        vertices = np.r_[vertices, vertices[unique].mean(axis=1)]
+        cells = np.r_[
+            np.c_[cells[:, 0], mid[:, 0], mid[:, 2]],
+            np.c_[cells[:, 1], mid[:, 1], mid[:, 0]],
+            np.c_[cells[:, 2], mid[:, 2], mid[:, 1]],
+            mid,
+        ]
+
+    vertices *= radius / np.linalg.norm(vertices, axis=1)[:, None]
+
+    return vertices, cells
+
+
+def grid_surface(
+    n_x: int = 10, n_y: int = 10, spacing: float = 1.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Flat triangulated grid in the x-y plane with upward normals."""
+    x_loc, y_loc = np.meshgrid(np.arange(n_x) * spacing, np.arange(n_y) * spacing)
+    vertices = np.c_[x_loc.ravel(), y_loc.ravel(), np.zeros(n_x * n_y)]
+    corner = (np.arange(n_y - 1)[:, None] * n_x + np.arange(n_x - 1)).ravel()
+    cells = np.r_[
+        np.c_[corner, corner + 1, corner + n_x + 1],
+        np.c_[corner, corner + n_x + 1, corner + n_x],
+    ]
+
+    return vertices, cells
+
+
+def write_ui_json(path: Path, template: str, workspace: Workspace, **values) -> Path:
+    """Copy a ui.json template from the assets with updated values."""
+    with open(
+        assets_path() / "uijson" / f"{template}.ui.json", encoding="utf-8"
+    ) as file:
+        ui_json = json.load(file)
+
+    ui_json["geoh5"] = str(workspace.h5file)
+    for key, value in values.items():
+        if isinstance(value, Entity):
+            value = value.uid
+        if isinstance(value, UUID):
+            value = f"{{{value}}}"
+        if isinstance(ui_json[key], dict):
+            ui_json[key]["value"] = value
+            if "enabled" in ui_json[key]:
+                ui_json[key]["enabled"] = True
+        else:
+            ui_json[key] = value
+
+    file_path = path / f"{template}.ui.json"
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(ui_json, file, indent=4)
+
+    return file_path